@@ -0,0 +1,99 @@
+"""
+First-request latency of pydantic v2 models in fresh processes: schemas generated
+on demand, looked up in a persistent plan cache, or inherited from the master
+process warmed up before forking.
+
+Usage: python benchmarks/cold_start.py [--models 100] [--repeat 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from typing import Optional
+
+_MODEL = """
+class Item{i}(BaseModel):
+    id: int
+    name: str
+    tags: List[str] = []
+    meta: Optional[Dict[str, float]] = None
+
+
+class Model{i}(BaseModel):
+    id: int
+    items: List[Item{i}]
+    parent: Optional[Item{i}] = None
+"""
+
+_SCRIPT = """
+import os
+import sys
+import time
+
+sys.path.insert(0, {path!r})
+
+from simdjson_schemaful import PlanCache
+from simdjson_schemaful.pydantic import v2
+
+import models
+
+if {cache!r} is not None:
+    v2.set_plan_cache(PlanCache({cache!r}))
+if {fork!r}:
+    v2.warmup()
+    pid = os.fork()
+    if pid:
+        os.waitpid(pid, 0)
+        sys.exit()
+
+data = b'{{"id": 0, "items": [{{"id": 1, "name": "a"}}], "other": [1, 2, 3]}}'
+start = time.perf_counter()
+for i in range({models}):
+    getattr(models, f"Model{{i}}").model_validate_simdjson(data)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def _run(path: str, models: int, cache: Optional[str], fork: bool) -> float:
+    script = _SCRIPT.format(path=path, models=models, cache=cache, fork=fork)
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        with open(os.path.join(path, "models.py"), "w") as f:
+            f.write("from typing import Dict, List, Optional\n\n")
+            f.write("from simdjson_schemaful.pydantic.v2 import BaseModel\n")
+            for i in range(args.models):
+                f.write(textwrap.dedent(_MODEL.format(i=i)))
+        cache = os.path.join(path, "plans")
+        # Populates the cache and the bytecode of the models
+        _run(path, args.models, cache, False)
+
+        print(f"{args.models} models, first validation of each in a fresh process")
+        for name, cache_path, fork in (
+            ("on demand", None, False),
+            ("plan cache", cache, False),
+            ("forked", None, True),
+        ):
+            timing = min(
+                _run(path, args.models, cache_path, fork) for _ in range(args.repeat)
+            )
+            print(f"{name:<16}{timing:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
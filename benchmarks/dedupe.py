@@ -0,0 +1,79 @@
+"""
+Items referencing a few distinct nested objects: loads/validation with and without
+deduplication of identical subtrees, the time and the memory held by the result
+(pydantic v2).
+
+Usage: python benchmarks/dedupe.py [--items 50000] [--unique 100]
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+from typing import Any, Callable, List
+
+from simdjson_schemaful import loads
+from simdjson_schemaful.pydantic.v2 import BaseModel, TypeAdapter
+
+
+class Author(BaseModel):
+    name: str
+    country: str
+    tags: List[str]
+
+
+class Book(BaseModel):
+    id: int
+    title: str
+    author: Author
+
+
+def _generate(items: int, unique: int) -> bytes:
+    authors = [
+        {"name": f"author {i}", "country": "xx", "tags": ["a", "b", "c"]}
+        for i in range(unique)
+    ]
+    return json.dumps(
+        [
+            {"id": i, "title": f"title {i}", "author": authors[i % unique]}
+            for i in range(items)
+        ]
+    ).encode()
+
+
+def _held(func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    res = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del res
+    return size / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--unique", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[Book])
+    schema = adapter._get_schema()
+    data = _generate(args.items, args.unique)
+    print(f"{args.items} items, {args.unique} distinct authors")
+    print(f"{'':<20}{'time':>12}{'held':>14}")
+
+    for name, func in (
+        ("loads", lambda: loads(data, schema=schema)),
+        ("loads dedupe", lambda: loads(data, schema=schema, dedupe=["/*/author"])),
+        ("validate", lambda: adapter.validate_simdjson(data)),
+        (
+            "validate dedupe",
+            lambda: adapter.validate_simdjson(data, dedupe=["/*/author"]),
+        ),
+    ):
+        timing = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<20}{timing * 1000:>9.1f} ms{_held(func):>10.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Items with large JSON documents embedded into string fields (Json[Model]), of
+which a few fields are needed: pydantic vs the documents passed to pydantic as
+whole strings vs trimmed to the selected fields (pydantic v2).
+
+Usage: python benchmarks/embedded.py [--items 10000] [--fields 50]
+"""
+import argparse
+import copy
+import json
+import timeit
+from typing import Any, Dict, List
+
+from pydantic import Json
+
+from simdjson_schemaful import loads
+from simdjson_schemaful.pydantic.v2 import BaseModel, TypeAdapter
+
+
+class Document(BaseModel):
+    id: int
+    name: str
+
+
+class Item(BaseModel):
+    id: int
+    document: Json[Document]
+
+
+def _generate(items: int, fields: int) -> bytes:
+    document: Dict[str, Any] = {
+        f"field_{i}": [i, {"x": "y" * 16}] for i in range(fields)
+    }
+    return json.dumps(
+        [
+            {"id": i, "document": json.dumps({**document, "id": i, "name": f"n{i}"})}
+            for i in range(items)
+        ]
+    ).encode()
+
+
+def _strip(schema: Any) -> Any:
+    # As if the fields were plain strings
+    if isinstance(schema, dict):
+        schema.pop("contentMediaType", None)
+        for value in schema.values():
+            _strip(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            _strip(value)
+    return schema
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--fields", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[Item])
+    whole = _strip(copy.deepcopy(adapter._get_schema()))
+    validate = adapter.pydantic_type_adapter.validate_python
+    data = _generate(args.items, args.fields)
+    print(f"{args.items} items, {len(data) / 2**20:.1f} MiB")
+
+    for name, func in (
+        ("pydantic", lambda: adapter.pydantic_type_adapter.validate_json(data)),
+        ("whole strings", lambda: validate(loads(data, schema=whole))),
+        ("trimmed", lambda: adapter.validate_simdjson(data)),
+    ):
+        timing = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<20}{timing * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Polled arrays with a few changed items: full loads/validation of each poll vs an
+incremental session re-processing the changed items only (pydantic v2).
+
+Usage: python benchmarks/incremental.py [--items 50000] [--changed 0.01]
+"""
+import argparse
+import json
+import random
+import timeit
+from typing import Any, Dict, List
+
+from simdjson_schemaful import IncrementalSession, loads
+from simdjson_schemaful.pydantic.v2 import BaseModel, TypeAdapter
+from simdjson_schemaful.pydantic.v2 import IncrementalSession as ValidatingSession
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: List[str]
+    meta: Dict[str, float]
+
+
+def _generate(items: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "name": f"name {i}",
+            "tags": ["a", "b", "c"],
+            "meta": {"x": 1.0, "y": 2.0},
+            "other": {"payload": "y" * 128},
+        }
+        for i in range(items)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--changed", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[Item])
+    schema = adapter._get_schema()
+    items = _generate(args.items)
+    polls = []
+    for version in range(args.repeat + 1):
+        for i in random.sample(range(args.items), int(args.items * args.changed)):
+            items[i] = {**items[i], "name": f"name {i} v{version}"}
+        polls.append(json.dumps(items).encode())
+
+    session = IncrementalSession(schema=schema)
+    validating = ValidatingSession(adapter)
+    session.loads(polls[0])
+    validating.validate_simdjson(polls[0])
+    print(f"{args.items} items, {args.changed:.0%} changed between the polls")
+
+    for name, func in (
+        ("loads", lambda data: loads(data, schema=schema)),
+        ("session", session.loads),
+        ("validate", adapter.validate_simdjson),
+        ("validate session", validating.validate_simdjson),
+    ):
+        polls_iter = iter(polls[1:] * 2)
+        timing = min(
+            timeit.repeat(lambda: func(next(polls_iter)), number=1, repeat=args.repeat)
+        )
+        print(f"{name:<20}{timing * 1000:>10.1f} ms")
+    print(f"reuse ratio {validating.cache_info().reuse_ratio:.2f}")
+
+
+if __name__ == "__main__":
+    main()
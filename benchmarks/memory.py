@@ -0,0 +1,81 @@
+"""
+Peak and retained python heap when loading large arrays of objects.
+
+Usage: python benchmarks/memory.py [--items 100000] [--fields 10]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+from unittest import mock
+
+import simdjson
+
+from simdjson_schemaful import loads
+
+
+def _generate(items: int, fields: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "id": i,
+                "values": {f"field_{j}": j for j in range(fields)},
+                "other": "x" * 16,
+            }
+            for i in range(items)
+        ]
+    ).encode()
+
+
+def _measure(func: Callable[[], Any]) -> Tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    res = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del res
+    return peak, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--fields", type=int, default=10)
+    args = parser.parse_args()
+
+    data = _generate(args.items, args.fields)
+    schema: Dict[str, Any] = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "values": {
+                    "type": "object",
+                    "additionalProperties": {"type": "integer"},
+                },
+            },
+        },
+    }
+
+    def without_interning() -> Any:
+        with mock.patch("simdjson_schemaful.parser.intern", new=str):
+            return loads(data, schema=schema)
+
+    cases = {
+        "json.loads": lambda: json.loads(data),
+        "simdjson.loads": lambda: simdjson.loads(data),
+        "loads (keys not interned)": without_interning,
+        "loads": lambda: loads(data, schema=schema),
+    }
+
+    print(f"{len(data) / 2**20:.1f} MiB, {args.items} items, {args.fields} fields")
+    print(f"{'case':<28}{'peak, MiB':>12}{'retained, MiB':>16}")
+    for name, func in cases.items():
+        peak, retained = _measure(func)
+        print(f"{name:<28}{peak / 2**20:>12.1f}{retained / 2**20:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
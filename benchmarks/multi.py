@@ -0,0 +1,68 @@
+"""
+Several schemas over the same document: separate loads vs a single loads_multi.
+
+Usage: python benchmarks/multi.py [--items 100000] [--repeat 3]
+"""
+import argparse
+import json
+import timeit
+from typing import Any, Dict
+
+from simdjson import Parser
+
+from simdjson_schemaful import loads, loads_multi
+
+
+def _object(**properties: Any) -> Dict[str, Any]:
+    return {"type": "object", "properties": properties}
+
+
+def _array(items: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "array", "items": items}
+
+
+SCHEMAS = {
+    "ids": _array(_object(id={"type": "integer"})),
+    "names": _array(_object(id={"type": "integer"}, name={"type": "string"})),
+    "metas": _array(_object(name={"type": "string"}, meta={"type": "object"})),
+}
+
+
+def _generate(items: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "id": i,
+                "name": f"name {i}",
+                "meta": {"values": list(range(10)), "value": "x" * 32},
+                "other": {"payload": "y" * 256},
+            }
+            for i in range(items)
+        ]
+    ).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = _generate(args.items)
+    simdjson_parser = Parser()
+    print(f"{len(data) / 2**20:.1f} MiB, {args.items} items, {len(SCHEMAS)} schemas")
+
+    def separate() -> None:
+        for schema in SCHEMAS.values():
+            loads(data, schema=schema, parser=simdjson_parser)
+
+    def multi() -> None:
+        loads_multi(data, schemas=SCHEMAS, parser=simdjson_parser)
+
+    for name, func in (("loads", separate), ("loads_multi", multi)):
+        timing = min(timeit.repeat(func, number=1, repeat=args.repeat)) * 1000
+        print(f"{name:<16}{timing:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
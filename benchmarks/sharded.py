@@ -0,0 +1,92 @@
+"""
+A single large top-level array: loads vs loads_sharded with different numbers of
+workers, the time and the peak resident memory of the main and worker processes.
+
+Usage: python benchmarks/sharded.py [--items 500000] [--workers 1 2 4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_SCRIPT = """
+import resource
+import time
+
+from simdjson_schemaful import loads
+from simdjson_schemaful.shards import loads_sharded
+
+schema = {schema!r}
+with open({path!r}, "rb") as f:
+    data = f.read()
+start = time.perf_counter()
+if {workers!r} is None:
+    loads(data, schema=schema)
+else:
+    loads_sharded(data, schema=schema, workers={workers!r}, max_shard_size=2**24)
+elapsed = time.perf_counter() - start
+main = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+print(elapsed * 1000, main / 1024, children / 1024)
+"""
+
+SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+    },
+}
+
+
+def _generate(path: str, items: int) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            [
+                {
+                    "id": i,
+                    "tags": ["a", "b"],
+                    "meta": {"values": list(range(10)), "nested": [{"id": i}]},
+                    "payload": "y" * 256,
+                }
+                for i in range(items)
+            ],
+            f,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        _generate(path, args.items)
+        size = os.path.getsize(path) / 2**20
+        print(f"{size:.1f} MiB, {args.items} items, {os.cpu_count()} CPUs")
+        print(f"{'':<16}{'time':>12}{'main peak':>14}{'worker peak':>14}")
+        for workers in (None, *args.workers):
+            script = _SCRIPT.format(schema=SCHEMA, path=path, workers=workers)
+            out = subprocess.run(
+                [sys.executable, "-c", script],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            elapsed, main_peak, worker_peak = map(float, out.split())
+            name = "loads" if workers is None else f"sharded, {workers}"
+            print(
+                f"{name:<16}{elapsed:>9.1f} ms{main_peak:>10.1f} MiB"
+                f"{worker_peak:>10.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
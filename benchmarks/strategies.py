@@ -0,0 +1,70 @@
+"""
+Pydantic v2 strategies: python objects (validate_python) vs projected JSON
+bytes (validate_json) for different shares of the selected fields.
+
+Usage: python benchmarks/strategies.py [--items 10000] [--repeat 5]
+"""
+import argparse
+import json
+import timeit
+from typing import Any, List
+
+from simdjson_schemaful.pydantic.v2 import BaseModel, TypeAdapter
+
+
+class Small(BaseModel):
+    id: int
+
+
+class Large(BaseModel):
+    id: int
+    name: str
+    price: float
+    tags: List[str]
+    extra: Any
+
+
+def _generate(items: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "id": i,
+                "name": f"name {i}",
+                "price": i / 3,
+                "tags": ["a", "b", "c"],
+                "extra": {"nested": [1, 2, 3], "value": "x" * 32},
+                "other": {"payload": "y" * 256, "values": list(range(16))},
+            }
+            for i in range(items)
+        ]
+    ).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = _generate(args.items)
+    print(f"{len(data) / 2**20:.1f} MiB, {args.items} items")
+    print(f"{'case':<32}{'python, ms':>12}{'json, ms':>12}")
+    for model in (Small, Large):
+        adapter = TypeAdapter(List[model])  # type: ignore[valid-type]
+        timings = []
+        for strategy in ("python", "json"):
+            timer = timeit.Timer(
+                lambda: adapter.validate_simdjson(data, strategy=strategy),
+            )
+            timings.append(min(timer.repeat(args.repeat, number=1)) * 1000)
+        name = f"List[{model.__name__}]"
+        print(f"{name:<32}{timings[0]:>12.1f}{timings[1]:>12.1f}")
+
+    adapter = TypeAdapter(List[Large])
+    timer = timeit.Timer(lambda: adapter.pydantic_type_adapter.validate_json(data))
+    native = min(timer.repeat(args.repeat, number=1)) * 1000
+    print(f"{'List[Large] (validate_json)':<32}{native:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
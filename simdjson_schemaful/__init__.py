@@ -1,4 +1,39 @@
 from .__version__ import __version__
-from .parser import loads
+from .aggregate import Aggregate, Count, GroupCount, Max, Min, Sum, aggregate
+from .cache import CacheInfo, ResultCache
+from .incremental import IncrementalSession, SessionInfo
+from .multi import loads_multi
+from .parser import SchemaValidationError, iter_loads, loads, loads_json
+from .plans import PlanCache, PlanCacheInfo
+from .project import project, project_bytes
+from .rows import MISSING, Record
+from .shards import loads_sharded
+from .typed import loads_as
 
-__all__ = ("loads", "__version__")
+__all__ = (
+    "MISSING",
+    "Aggregate",
+    "CacheInfo",
+    "Count",
+    "GroupCount",
+    "IncrementalSession",
+    "Max",
+    "Min",
+    "PlanCache",
+    "PlanCacheInfo",
+    "Record",
+    "ResultCache",
+    "SchemaValidationError",
+    "SessionInfo",
+    "Sum",
+    "aggregate",
+    "iter_loads",
+    "loads",
+    "loads_as",
+    "loads_json",
+    "loads_multi",
+    "loads_sharded",
+    "project",
+    "project_bytes",
+    "__version__",
+)
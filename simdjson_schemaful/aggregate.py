@@ -0,0 +1,195 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import simdjson
+from simdjson import Parser
+
+from .filters import FilterSpec, compile_filter, compile_getter
+from .paths import WILDCARD, Pattern, compile_pointer
+from .rows import MISSING
+
+
+class Aggregate(ABC):
+    # Key of the items (or JSON pointer relative to the items, "" for the items
+    # themselves) to aggregate values of
+    __slots__ = ("key", "_get")
+
+    def __init__(self, key: Optional[str] = "") -> None:
+        self.key = key
+        self._get = compile_getter(key or "")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.key!r})"
+
+    @abstractmethod
+    def initial(self) -> Any:
+        ...
+
+    @abstractmethod
+    def update(self, state: Any, value: Any) -> Any:
+        ...
+
+    def result(self, state: Any) -> Any:
+        return state
+
+
+class Count(Aggregate):
+    # Number of the items, or of the non-null values of the key if given
+    __slots__ = ()
+
+    def __init__(self, key: Optional[str] = None) -> None:
+        super().__init__(key)
+
+    def initial(self) -> int:
+        return 0
+
+    def update(self, state: int, value: Any) -> int:
+        if self.key is None or (value is not MISSING and value is not None):
+            return state + 1
+        return state
+
+
+class Sum(Aggregate):
+    __slots__ = ()
+
+    def initial(self) -> Union[int, float]:
+        return 0
+
+    def update(self, state: Union[int, float], value: Any) -> Union[int, float]:
+        if value is MISSING or value is None:
+            return state
+        if value.__class__ not in (int, float):
+            raise ValueError(f"Can not sum {value!r} of '{self.key}', expected number")
+        return state + value
+
+
+class _Extremum(Aggregate):
+    __slots__ = ()
+
+    def initial(self) -> Any:
+        return MISSING
+
+    def _check(self, state: Any, value: Any) -> None:
+        if value.__class__ not in (int, float, str) or (
+            state is not MISSING
+            and (value.__class__ is str) != (state.__class__ is str)
+        ):
+            raise ValueError(
+                f"Can not compare {value!r} of '{self.key}', "
+                f"expected numbers or strings"
+            )
+
+    def result(self, state: Any) -> Any:
+        return None if state is MISSING else state
+
+
+class Min(_Extremum):
+    __slots__ = ()
+
+    def update(self, state: Any, value: Any) -> Any:
+        if value is MISSING or value is None:
+            return state
+        self._check(state, value)
+        return value if state is MISSING or value < state else state
+
+
+class Max(_Extremum):
+    __slots__ = ()
+
+    def update(self, state: Any, value: Any) -> Any:
+        if value is MISSING or value is None:
+            return state
+        self._check(state, value)
+        return value if state is MISSING or value > state else state
+
+
+class GroupCount(Aggregate):
+    # Numbers of the items by the values of the key (null included), as pairs
+    # of the values and the numbers in the order of appearance. Booleans are
+    # grouped apart from the equal numbers (true and 1), which can not be told
+    # apart as keys of a dict, equal numbers together (1 and 1.0) under the
+    # value seen first
+    __slots__ = ()
+
+    def initial(self) -> Dict[Tuple[bool, Any], List[Any]]:
+        return {}
+
+    def update(
+        self,
+        state: Dict[Tuple[bool, Any], List[Any]],
+        value: Any,
+    ) -> Dict[Tuple[bool, Any], List[Any]]:
+        if value is MISSING:
+            return state
+        if isinstance(value, (simdjson.Object, simdjson.Array)):
+            raise ValueError(f"Can not group by {value!r} of '{self.key}'")
+        group = state.get(key := (value.__class__ is bool, value))
+        if group is None:
+            state[key] = [value, 1]
+        else:
+            group[1] += 1
+        return state
+
+    def result(
+        self,
+        state: Dict[Tuple[bool, Any], List[Any]],
+    ) -> List[Tuple[Any, int]]:
+        return [(value, count) for value, count in state.values()]
+
+
+def _iter_children(node: Any, part: str) -> Iterator[Any]:
+    if isinstance(node, simdjson.Object):
+        if part == WILDCARD:
+            for key in node.keys():
+                yield node[key]
+        elif (child := node.get(part, MISSING)) is not MISSING:
+            yield child
+    elif isinstance(node, simdjson.Array):
+        if part == WILDCARD:
+            yield from node
+        elif part.isdigit() and int(part) < len(node):
+            yield node[int(part)]
+
+
+def _iter_items(node: Any, pattern: Pattern) -> Iterator[Any]:
+    if pattern:
+        for child in _iter_children(node, pattern[0]):
+            yield from _iter_items(child, pattern[1:])
+        return
+
+    if node is None:
+        return
+    if not isinstance(node, simdjson.Array):
+        raise ValueError(
+            f"Supposed to be an array, but in reality is a {node.__class__}",
+        )
+    yield from node
+
+
+def aggregate(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    aggregates: Dict[str, Aggregate],
+    path: str = "",
+    where: Optional[FilterSpec] = None,
+    parser: Optional[Parser] = None,
+) -> Dict[str, Any]:
+    # Computes the aggregates over the items of the array(s) at the path (JSON
+    # pointer with "*" wildcards) in a single pass, reading only the keys used
+    pattern = compile_pointer(path)
+    predicate = compile_filter(where) if where is not None else None
+    aggs = list(aggregates.values())
+    states = [agg.initial() for agg in aggs]
+
+    if isinstance(data, str):
+        data = data.encode()
+    parser = parser or Parser()
+    for item in _iter_items(parser.parse(data), pattern):
+        if predicate is not None and not predicate(item):
+            continue
+        for i, agg in enumerate(aggs):
+            states[i] = agg.update(states[i], agg._get(item))
+
+    return {
+        name: agg.result(state) for name, agg, state in zip(aggregates, aggs, states)
+    }
@@ -0,0 +1,148 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple, Union
+
+_Key = Tuple[Hashable, ...]
+
+
+def _freeze(value: Any) -> Hashable:
+    # Call options (e.g., dicts of slices) as a part of the key
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, slice):
+        return (slice, value.start, value.stop, value.step)
+    return value
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    maxbytes: Optional[int]
+    currsize: int
+    currbytes: int
+
+
+class _Entry(NamedTuple):
+    namespace: Any
+    value: Any
+    nbytes: int
+    expires: float
+
+
+class ResultCache:
+    # Results are keyed by the digest of the input bytes and the identity of the
+    # namespace (schema, model or adapter) they were loaded with. The namespace
+    # is referenced by the entry, so its id can not be re-used while cached.
+    # With copy=False the cached objects are shared and must not be mutated.
+
+    __slots__ = (
+        "_maxsize",
+        "_maxbytes",
+        "_ttl",
+        "_copy",
+        "_entries",
+        "_nbytes",
+        "_lock",
+        "_hits",
+        "_misses",
+    )
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        *,
+        maxbytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        copy: bool = True,
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("maxbytes must be non-negative")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._ttl = ttl
+        self._copy = copy
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_load(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        namespace: Any,
+        load: Callable[[], Any],
+        *extra: Any,
+    ) -> Any:
+        key = (
+            hashlib.blake2b(data, digest_size=16).digest(),
+            id(namespace),
+            *map(_freeze, extra),
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.namespace is namespace:
+                if entry.expires >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return self._return(entry.value)
+                self._remove(key)
+            self._misses += 1
+
+        value = load()
+
+        nbytes = len(data) if not isinstance(data, memoryview) else data.nbytes
+        if self._maxbytes is None or nbytes <= self._maxbytes:
+            expires = (
+                float("inf") if self._ttl is None else time.monotonic() + self._ttl
+            )
+            with self._lock:
+                self._store(key, _Entry(namespace, value, nbytes, expires))
+        return self._return(value)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                maxbytes=self._maxbytes,
+                currsize=len(self._entries),
+                currbytes=self._nbytes,
+            )
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def _return(self, value: Any) -> Any:
+        return deepcopy(value) if self._copy else value
+
+    def _remove(self, key: _Key) -> None:
+        self._nbytes -= self._entries.pop(key).nbytes
+
+    def _store(self, key: _Key, entry: _Entry) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._nbytes += entry.nbytes
+        while (self._maxsize is not None and len(self._entries) > self._maxsize) or (
+            self._maxbytes is not None and self._nbytes > self._maxbytes
+        ):
+            self._remove(next(iter(self._entries)))
@@ -0,0 +1,369 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import (
+    Any,
+    BinaryIO,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from simdjson import Parser
+
+from .parser import Schema, _to_raw, loads_json
+
+_SUFFIXES = (".json", ".ndjson", ".jsonl")
+_NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+_ON_ERROR = ("fail", "skip", "keep")
+
+
+class _Task(NamedTuple):
+    source: str
+    documents: List[Tuple[int, bytes]]  # line numbers (0 for whole files)
+
+
+class _Result(NamedTuple):
+    outputs: List[bytes]
+    documents: int
+    size: int
+    skipped: int
+    fallbacks: int
+    error: Optional[str]
+
+
+class _Worker:
+    __slots__ = ("schema", "fail_fast", "on_error", "parser")
+
+    def __init__(self, schema: Schema, fail_fast: bool, on_error: str) -> None:
+        self.schema = schema
+        self.fail_fast = fail_fast
+        self.on_error = on_error
+        self.parser = Parser()
+
+    def _minify(self, document: bytes) -> bytes:
+        # Kept documents are written out as minified JSON as well, so that these
+        # do not break the lines of the output (or the array)
+        return _to_raw(self.parser.parse(document))
+
+    def __call__(self, task: _Task) -> _Result:
+        outputs = []
+        size = skipped = fallbacks = 0
+        for i, (line, document) in enumerate(task.documents):
+            size += len(document)
+            try:
+                output = loads_json(
+                    document,
+                    schema=self.schema,
+                    parser=self.parser,
+                    fail_fast=self.fail_fast,
+                )
+            except (ValueError, TypeError, UnicodeDecodeError) as e:
+                where = f"{task.source}:{line}" if line else task.source
+                error = f"{where}: {e}"
+            else:
+                outputs.append(output)
+                continue
+
+            if self.on_error == "fail":
+                # The documents before the failed one are processed
+                return _Result(outputs, i, size, skipped, fallbacks, error)
+            if self.on_error == "keep":
+                try:
+                    output = self._minify(document)
+                except ValueError as e:
+                    # Invalid JSON can not be kept, so that it is skipped
+                    sys.stderr.write(f"warning: {where}: not kept, {e}\n")
+                else:
+                    outputs.append(output)
+                    fallbacks += 1
+                    continue
+            skipped += 1
+        documents = len(task.documents)
+        return _Result(outputs, documents, size, skipped, fallbacks, None)
+
+
+# Set in each of the worker processes (or in the main one without workers)
+_WORKER: Optional[_Worker] = None
+
+
+def _init_worker(schema: Schema, fail_fast: bool, on_error: str) -> None:
+    global _WORKER
+    _WORKER = _Worker(schema, fail_fast, on_error)
+
+
+def _run_task(task: _Task) -> _Result:
+    assert _WORKER is not None
+    return _WORKER(task)
+
+
+def _import(path: str) -> Any:
+    # Both "package.module:Model" and "package.module.Model"
+    module_name, sep, name = path.partition(":")
+    if not sep:
+        module_name, _, name = path.rpartition(".")
+    obj = importlib.import_module(module_name)
+    for part in name.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _get_model_schema(type_: Any) -> Schema:
+    try:
+        import pydantic
+    except ImportError:
+        raise ValueError("Loading models requires pydantic") from None
+    if pydantic.VERSION.startswith("1."):
+        if isinstance(type_, type) and issubclass(type_, pydantic.BaseModel):
+            return type_.schema()
+        return pydantic.schema_of(type_)
+    return pydantic.TypeAdapter(type_).json_schema()
+
+
+def _load_schema(args: argparse.Namespace) -> Schema:
+    if args.schema is not None:
+        with open(args.schema, "rb") as f:
+            schema = json.load(f)
+        if not isinstance(schema, dict):
+            raise ValueError(f"{args.schema}: expected a JSON Schema object")
+        return schema
+    return _get_model_schema(_import(args.model))
+
+
+def _iter_sources(inputs: Sequence[str]) -> Iterator[str]:
+    for path in inputs:
+        if path == "-" or not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(_SUFFIXES):
+                    yield os.path.join(root, name)
+
+
+def _iter_lines(
+    f: BinaryIO,
+    source: str,
+    batch_size: int,
+) -> Iterator[_Task]:
+    documents = []
+    for line, document in enumerate(f, 1):
+        if not document.strip():
+            continue
+        documents.append((line, document))
+        if len(documents) == batch_size:
+            yield _Task(source, documents)
+            documents = []
+    if documents:
+        yield _Task(source, documents)
+
+
+def _iter_tasks(
+    inputs: Sequence[str],
+    *,
+    ndjson: bool,
+    batch_size: int,
+) -> Iterator[_Task]:
+    for path in _iter_sources(inputs):
+        is_stdin = path == "-"
+        source = "<stdin>" if is_stdin else path
+        is_ndjson = ndjson or path.endswith(_NDJSON_SUFFIXES)
+        f = sys.stdin.buffer if is_stdin else open(path, "rb")
+        try:
+            if is_ndjson:
+                yield from _iter_lines(f, source, batch_size)
+            else:
+                yield _Task(source, [(0, f.read())])
+        finally:
+            if not is_stdin:
+                f.close()
+
+
+def _pop(pending: Deque["Future[_Result]"], ordered: bool) -> Iterator[_Result]:
+    if ordered:
+        yield pending.popleft().result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield future.result()
+
+
+def _iter_results(
+    tasks: Iterable[_Task],
+    *,
+    init_args: Tuple[Schema, bool, str],
+    workers: int,
+    ordered: bool,
+) -> Iterator[_Result]:
+    if workers == 1:
+        _init_worker(*init_args)
+        yield from map(_run_task, tasks)
+        return
+    # Only a few tasks per worker are submitted at a time, so that the inputs
+    # are read as the outputs are written
+    limit = 2 * workers
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_init_worker,
+        initargs=init_args,
+    ) as executor:
+        pending: Deque["Future[_Result]"] = deque()
+        for task in tasks:
+            pending.append(executor.submit(_run_task, task))
+            if len(pending) >= limit:
+                yield from _pop(pending, ordered)
+        while pending:
+            yield from _pop(pending, ordered)
+
+
+class _Writer:
+    __slots__ = ("out", "array", "count", "size")
+
+    def __init__(self, out: BinaryIO, array: bool) -> None:
+        self.out = out
+        self.array = array
+        self.count = 0
+        self.size = 0
+
+    def write(self, outputs: List[bytes]) -> None:
+        for output in outputs:
+            if self.array:
+                chunk = (b"," if self.count else b"[") + output
+            else:
+                chunk = output + b"\n"
+            self.out.write(chunk)
+            self.count += 1
+            self.size += len(chunk)
+
+    def close(self) -> None:
+        if self.array:
+            self.out.write(b"]\n" if self.count else b"[]\n")
+        self.out.flush()
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m simdjson_schemaful",
+        description=(
+            "Extracts the values selected by a JSON Schema (or by a pydantic model) "
+            "from JSON documents and writes them out as minified JSON."
+        ),
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        help=(
+            "files or directories (with *.json, *.ndjson and *.jsonl files) to read,"
+            " - for stdin (default)"
+        ),
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-s", "--schema", help="JSON Schema file")
+    source.add_argument("-m", "--model", help="importable model, e.g., module:Model")
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="read all the inputs as newline-delimited JSON (by suffix otherwise)",
+    )
+    parser.add_argument("-o", "--output", default="-", help="output file")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("ndjson", "json"),
+        default="ndjson",
+        help="a document per line (default) or a JSON array of the documents",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write the documents as soon as they are processed by the workers",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="newline-delimited documents per task",
+    )
+    parser.add_argument("--fail-fast", action="store_true")
+    parser.add_argument(
+        "--on-error",
+        choices=_ON_ERROR,
+        default="fail",
+        help="stop, skip the document, or keep it as it is",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print throughput and error counts to stderr",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = _get_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be positive")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+
+    start = time.perf_counter()
+    try:
+        schema = _load_schema(args)
+    except (OSError, ValueError, ImportError, AttributeError) as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 1
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    writer = _Writer(out, args.format == "json")
+    documents = size = skipped = fallbacks = 0
+    error = None
+    try:
+        tasks = _iter_tasks(args.inputs, ndjson=args.ndjson, batch_size=args.batch_size)
+        results = _iter_results(
+            tasks,
+            init_args=(schema, args.fail_fast, args.on_error),
+            workers=args.workers,
+            ordered=not args.unordered,
+        )
+        for result in results:
+            writer.write(result.outputs)
+            documents += result.documents
+            size += result.size
+            skipped += result.skipped
+            fallbacks += result.fallbacks
+            if result.error is not None:
+                error = result.error
+                break
+    except OSError as e:
+        error = str(e)
+    finally:
+        writer.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    if error is not None:
+        sys.stderr.write(f"error: {error}\n")
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        sys.stderr.write(
+            f"documents: {documents}, skipped: {skipped}, kept: {fallbacks}\n"
+            f"read: {size / 2**20:.1f} MiB, written: {writer.size / 2**20:.1f} MiB\n"
+            f"elapsed: {elapsed:.3f} s, {size / 2**20 / elapsed:.1f} MiB/s, "
+            f"{documents / elapsed:.0f} documents/s\n"
+        )
+    return 0 if error is None else 1
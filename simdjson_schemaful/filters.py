@@ -0,0 +1,134 @@
+import operator
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+import simdjson
+
+from .memo import IdentityMemo
+from .rows import MISSING
+
+FILTER_KEY = "x-simdjson-filter"
+_HAS_AT_POINTER = hasattr(simdjson.Object, "at_pointer")
+
+Predicate = Callable[[Any], bool]
+FilterSpec = Dict[str, Any]
+
+_RANGES = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+OPERATORS = ("eq", "in", "exists", *_RANGES)
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or value.__class__ in (bool, int, float, str)
+
+
+def _key(value: Any) -> Tuple[bool, Any]:
+    # JSON booleans are not numbers, whereas True == 1 in python
+    return value.__class__ is bool, value
+
+
+def _is_number(value: Any) -> bool:
+    return value.__class__ in (int, float)
+
+
+def compile_getter(key: str) -> Callable[[Any], Any]:
+    if key == "":
+        return lambda item: item
+
+    if key.startswith("/"):
+        # Pointers are relative (without the leading slash) in pysimdjson 2
+        pointer = key if _HAS_AT_POINTER else key[1:]
+
+        def get_pointer(item: Any) -> Any:
+            if not isinstance(item, (simdjson.Object, simdjson.Array)):
+                return MISSING
+            try:
+                if _HAS_AT_POINTER:
+                    return item.at_pointer(pointer)
+                return item.at(pointer)  # type: ignore[union-attr]
+            except (LookupError, ValueError, TypeError):
+                # Missing keys, indexes out of range or values of other types
+                return MISSING
+
+        return get_pointer
+
+    def get_key(item: Any) -> Any:
+        if not isinstance(item, simdjson.Object):
+            return MISSING
+        return item.get(key, MISSING)
+
+    return get_key
+
+
+def _compile_range(op: str, bound: Any) -> Predicate:
+    compare = _RANGES[op]
+    if _is_number(bound):
+        return lambda value: _is_number(value) and compare(value, bound)
+    if bound.__class__ is str:
+        return lambda value: value.__class__ is str and compare(value, bound)
+    raise ValueError(f"Invalid filter bound {bound!r}, expected number or string")
+
+
+def _compile_test(op: str, arg: Any) -> Predicate:
+    if op == "exists":
+        if arg.__class__ is not bool:
+            raise ValueError(f"Invalid filter {op!r}, expected boolean")
+        return lambda value: (value is not MISSING) is arg
+
+    if op == "eq":
+        if not _is_scalar(arg):
+            raise ValueError(f"Invalid filter value {arg!r}, expected scalar")
+        expected = _key(arg)
+        return lambda value: _is_scalar(value) and _key(value) == expected
+
+    if op == "in":
+        if not isinstance(arg, (list, tuple, set, frozenset)) or not all(
+            map(_is_scalar, arg)
+        ):
+            raise ValueError(f"Invalid filter {op!r}, expected array of scalars")
+        options = frozenset(map(_key, arg))
+        return lambda value: _is_scalar(value) and _key(value) in options
+
+    if op in _RANGES:
+        return _compile_range(op, arg)
+
+    raise ValueError(f"Invalid filter operator {op!r}, expected one of {OPERATORS}")
+
+
+def _compile_condition(condition: Any) -> List[Predicate]:
+    if not isinstance(condition, dict):
+        return [_compile_test("eq", condition)]
+    return [_compile_test(op, arg) for op, arg in condition.items()]
+
+
+def compile_filter(spec: FilterSpec) -> Predicate:
+    # Spec maps keys of the items (or JSON pointers relative to the items, ""
+    # for the items themselves) to values or operators, e.g.,
+    # {"status": "active", "region": {"in": ["eu", "us"]}, "/meta/score": {"gte": 1}}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Invalid filter {spec!r}, expected object")
+
+    conditions = [
+        (compile_getter(key), test)
+        for key, condition in spec.items()
+        for test in _compile_condition(condition)
+    ]
+
+    def predicate(item: Any) -> bool:
+        for get, test in conditions:
+            if not test(get(item)):
+                return False
+        return True
+
+    return predicate
+
+
+_COMPILED: IdentityMemo[Predicate] = IdentityMemo()
+
+
+def get_filter(spec: FilterSpec) -> Predicate:
+    return _COMPILED.get_or_create((spec,), partial(compile_filter, spec))
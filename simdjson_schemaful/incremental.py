@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from simdjson import Parser
+
+from .filters import FilterSpec
+from .parser import (
+    Schema,
+    _check_rows,
+    _compile_filters,
+    _compile_slices,
+    _Context,
+    _extract,
+    _get_definition,
+    _iter_items,
+    _to_raw,
+)
+from .paths import WILDCARD, compile_patterns
+from .rows import MISSING
+from .slices import SliceLike
+
+Transform = Callable[[Any, int], Any]
+
+
+class SessionInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    maxbytes: Optional[int]
+    currsize: int
+    currbytes: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class IncrementalSession:
+    # Loads top-level arrays re-extracting only the items which are new or
+    # changed since the previous calls, keyed by their minified JSON. The items
+    # are optionally transformed (e.g., validated) before being cached. The
+    # unchanged items are the same objects as before and must not be mutated.
+
+    __slots__ = (
+        "_schema",
+        "_full_schema",
+        "_items",
+        "_transform",
+        "_maxsize",
+        "_maxbytes",
+        "_parser",
+        "_fail_fast",
+        "_strict",
+        "_rows",
+        "_slices",
+        "_filters",
+        "_entries",
+        "_nbytes",
+        "_lock",
+        "_hits",
+        "_misses",
+    )
+
+    def __init__(
+        self,
+        *,
+        schema: Schema,
+        transform: Optional[Transform] = None,
+        maxsize: Optional[int] = 100_000,
+        maxbytes: Optional[int] = None,
+        parser: Optional[Parser] = None,
+        fail_fast: bool = False,
+        strict: bool = True,
+        rows: Optional[str] = None,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("maxbytes must be non-negative")
+        _check_rows(rows)
+        # Selections of the specific items would depend on their positions
+        for pattern, _ in compile_patterns(slices) + compile_patterns(filters):
+            if pattern and pattern[0] != WILDCARD:
+                raise ValueError(
+                    f"Invalid path {'/'.join(('', *pattern))!r}, "
+                    "expected the same selection for all the items"
+                )
+
+        definitions = schema.get("definitions", {}) or schema.get("$defs", {})
+        root = _get_definition(definitions, schema) if "$ref" in schema else schema
+        if root.get("type") != "array":
+            raise ValueError(f"Invalid schema type {root.get('type')}, expected array")
+
+        self._schema = root
+        self._full_schema = schema
+        self._items = _get_definition(definitions, root.get("items", {}))
+        self._transform = transform
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._parser = parser
+        self._fail_fast = fail_fast
+        self._strict = strict
+        self._rows = rows
+        self._slices = _compile_slices(slices)
+        self._filters = _compile_filters(filters)
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def loads(self, data: Union[str, bytes, bytearray, memoryview]) -> List[Any]:
+        if isinstance(data, str):
+            data = data.encode()
+        parser = self._parser or Parser()  # Default for thread safety
+        ctx = _Context(
+            schema=self._full_schema,
+            fail_fast=self._fail_fast,
+            rows=self._rows,
+            slices=self._slices,
+            filters=self._filters,
+            strict=self._strict,
+        )
+        entries = self._entries
+        res: List[Any] = []
+        with self._lock:
+            items = _iter_items(parser.parse(data), schema=self._schema, ctx=ctx)
+            for i, value in items:
+                key = _to_raw(value)
+                item = entries.get(key, MISSING)
+                if item is not MISSING:
+                    entries.move_to_end(key)
+                    self._hits += 1
+                    res.append(item)
+                    continue
+                self._misses += 1
+                item = _extract(value, prop_data=self._items, index=i, ctx=ctx)
+                if self._transform is not None:
+                    item = self._transform(item, len(res))
+                self._store(key, item)
+                res.append(item)
+        return res
+
+    def cache_info(self) -> SessionInfo:
+        with self._lock:
+            return SessionInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                maxbytes=self._maxbytes,
+                currsize=len(self._entries),
+                currbytes=self._nbytes,
+            )
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def _store(self, key: bytes, item: Any) -> None:
+        if self._maxbytes is not None and len(key) > self._maxbytes:
+            return
+        self._entries[key] = item
+        self._nbytes += len(key)
+        # The least recently seen items (e.g., gone from the polled payloads)
+        # are evicted first
+        while (self._maxsize is not None and len(self._entries) > self._maxsize) or (
+            self._maxbytes is not None and self._nbytes > self._maxbytes
+        ):
+            self._nbytes -= len(self._entries.popitem(last=False)[0])
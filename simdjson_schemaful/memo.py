@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IdentityMemo(Generic[T]):
+    # State compiled from unhashable objects (e.g., schemas), keyed by their ids.
+    # Entries reference the objects, so that their ids can not be re-used while
+    # cached, and the least recently used ones are evicted (e.g., for schemas
+    # built anew on every call).
+
+    __slots__ = ("_maxsize", "_entries", "_lock")
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[Any, ...], T]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_create(
+        self,
+        objs: Tuple[Any, ...],
+        create: Callable[[], T],
+        extra: Hashable = None,
+    ) -> T:
+        key = (tuple(map(id, objs)), extra)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and all(a is b for a, b in zip(entry[0], objs)):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = create()
+        with self._lock:
+            self._entries[key] = (objs, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,419 @@
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from simdjson import Parser
+
+from .filters import FILTER_KEY, FilterSpec
+from .memo import IdentityMemo
+from .parser import (
+    RAW_KEY,
+    JsonType,
+    Schema,
+    _check_rows,
+    _compile_filters,
+    _compile_slices,
+    _Context,
+    _get_additional,
+    _get_definition,
+    _is_selective,
+    _load,
+)
+from .rows import MISSING, RowLayout, get_row_layout
+from .slices import SLICE_KEY, SliceLike
+
+# Schema with the definitions its references are resolved against
+_Node = Tuple[Schema, Schema]
+_Projector = Callable[[Any], Any]
+_SELECTIONS = (SLICE_KEY, FILTER_KEY, RAW_KEY)
+
+
+class _Conflict(Exception):
+    pass
+
+
+def _get_definitions(schema: Schema) -> Schema:
+    return schema.get("definitions", {}) or schema.get("$defs", {})
+
+
+def _resolve(node: _Node) -> _Node:
+    schema, definitions = node
+    if schema.get("$ref"):
+        schema = _get_definition(definitions, schema)
+    return schema, definitions
+
+
+def _has_selections(node: _Node, seen: Set[int]) -> bool:
+    # Whether the values differ from the ones materialized as a whole
+    schema, definitions = _resolve(node)
+    if id(schema) in seen:
+        return False
+    seen.add(id(schema))
+    if any(key in schema for key in _SELECTIONS):
+        return True
+    children = [*schema.get("properties", {}).values()]
+    if additional := _get_additional(schema):
+        children.append(additional)
+    if items := schema.get("items"):
+        children.append(items)
+    return any(_has_selections((child, definitions), seen) for child in children)
+
+
+def _merge_selective(nodes: List[_Node], stack: Set[Tuple[int, ...]]) -> Schema:
+    types = [schema.get("type") for schema, _ in nodes]
+    type_ = types[0] if all(t == types[0] for t in types) else None
+
+    if type_ == "array":
+        merged: Schema = {"type": "array"}
+        for key in (SLICE_KEY, FILTER_KEY):
+            values = [schema.get(key) for schema, _ in nodes]
+            if any(value != values[0] for value in values):
+                raise _Conflict
+            if values[0] is not None:
+                merged[key] = values[0]
+        merged["items"] = _merge(
+            [(schema.get("items", {}), definitions) for schema, definitions in nodes],
+            stack,
+        )
+        return merged
+
+    if type_ != "object":
+        raise _Conflict
+
+    properties: List[Any] = [schema.get("properties") for schema, _ in nodes]
+    if all(properties):
+        names = dict.fromkeys(name for props in properties for name in props)
+        return {
+            "type": "object",
+            "properties": {
+                name: _merge(
+                    [
+                        (props[name], definitions)
+                        for props, (_, definitions) in zip(properties, nodes)
+                        if name in props
+                    ],
+                    stack,
+                )
+                for name in names
+            },
+        }
+    if any(properties):
+        raise _Conflict
+    return {
+        "type": "object",
+        "additionalProperties": _merge(
+            [(_get_additional(schema), definitions) for schema, definitions in nodes],
+            stack,
+        ),
+    }
+
+
+def _merge(nodes: List[_Node], stack: Set[Tuple[int, ...]]) -> Schema:
+    # Plan (without references) for the values needed by any of the schemas
+    nodes = [_resolve(node) for node in nodes]
+    key = tuple(id(schema) for schema, _ in nodes)
+    if key in stack:
+        # Recursive schemas
+        raise _Conflict
+
+    raws = [bool(schema.get(RAW_KEY)) for schema, _ in nodes]
+    if any(raws):
+        if not all(raws):
+            raise _Conflict
+        return {RAW_KEY: True}
+
+    selective = [node for node in nodes if _is_selective(node[0])]
+    if len(selective) < len(nodes):
+        # Materialized as a whole, the selective ones are projected from it
+        if any(_has_selections(node, set()) for node in selective):
+            raise _Conflict
+        # The type is checked during the traversal, if the same for all
+        types = [schema.get("type") for schema, _ in nodes]
+        if selective or any(t != types[0] for t in types) or not types[0]:
+            return {}
+        return {"type": types[0]}
+
+    stack.add(key)
+    try:
+        return _merge_selective(nodes, stack)
+    finally:
+        stack.discard(key)
+
+
+class _Plan:
+    __slots__ = ("schema", "names", "projectors")
+
+    def __init__(self, schemas: Dict[str, Schema]) -> None:
+        # Schemas are merged one by one, while these are compatible
+        self.schema: Schema = {}
+        self.names: List[str] = []
+        nodes: List[_Node] = []
+        for name, schema in schemas.items():
+            node = _resolve((schema, _get_definitions(schema)))
+            if node[0].get("type") not in ("object", "array"):
+                continue
+            try:
+                merged = _merge([*nodes, node], set())
+            except _Conflict:
+                continue
+            self.schema = merged
+            self.names.append(name)
+            nodes.append(node)
+        self.projectors: Dict[Tuple[str, Optional[str]], Optional[_Projector]] = {}
+
+    def get_projector(
+        self, name: str, schema: Schema, rows: Optional[str]
+    ) -> Optional[_Projector]:
+        key = (name, rows)
+        if key not in self.projectors:
+            definitions = _get_definitions(schema)
+            self.projectors[key] = _compile(schema, definitions, self.schema, rows)
+        return self.projectors[key]
+
+
+_PLANS: IdentityMemo[_Plan] = IdentityMemo()
+
+
+def _get_plan(schemas: Dict[str, Schema]) -> _Plan:
+    return _PLANS.get_or_create(
+        tuple(schemas.values()), partial(_Plan, dict(schemas)), tuple(schemas)
+    )
+
+
+def _project(  # noqa: C901
+    schema: Schema,
+    definitions: Schema,
+    value: Any,
+    rows: Optional[str],
+) -> Any:
+    # Values of the schema out of the ones materialized as a whole
+    if schema.get("$ref"):
+        schema = _get_definition(definitions, schema)
+    if value is None or schema.get(RAW_KEY):
+        return value
+
+    type_ = schema.get("type")
+    if type_ == "object":
+        if not isinstance(value, dict):
+            raise ValueError(
+                f"Supposed to be an object, but in reality is a {value.__class__}",
+            )
+        if properties := schema.get("properties"):
+            res = {
+                name: _project(prop, definitions, value[name], rows)
+                for name, prop in properties.items()
+                if name in value
+            }
+            if rows is None:
+                return res
+            layout = get_row_layout(schema, rows)
+            row = [MISSING] * layout.size
+            for name, item in res.items():
+                row[layout.indices[name]] = item
+            return layout.factory(row)
+        if additional := _get_additional(schema):
+            return {
+                key: _project(additional, definitions, item, rows)
+                for key, item in value.items()
+            }
+        return value
+
+    if type_ == "array":
+        if not isinstance(value, list):
+            raise ValueError(
+                f"Supposed to be an array, but in reality is a {value.__class__}",
+            )
+        items = schema.get("items", {})
+        if _is_selective(items):
+            return [_project(items, definitions, item, rows) for item in value]
+        return value
+
+    if (type_ or "enum" in schema or "const" in schema) and isinstance(
+        value, (dict, list)
+    ):
+        raise ValueError(
+            f"Supposed to be anything but object/array, "
+            f"but in reality is {value.__class__}",
+        )
+    return value
+
+
+def _is_checked(schema: Schema, merged: Schema) -> bool:
+    # Whether the traversal of the merged plan checks the values of the schema
+    if schema.get("type"):
+        return bool(schema["type"] == merged.get("type"))
+    return "enum" not in schema and "const" not in schema
+
+
+def _project_dict(children: List[Tuple[str, Any]], value: Any) -> Any:
+    res = {}
+    for name, child in children:
+        item = value.get(name, MISSING)
+        if item is not MISSING:
+            res[name] = item if child is None or item is None else child(item)
+    return res
+
+
+def _project_row(layout: RowLayout, children: List[Tuple[str, Any]], value: Any) -> Any:
+    row = [MISSING] * layout.size
+    for i, (name, child) in enumerate(children):
+        item = value.get(name, MISSING)
+        if item is not MISSING:
+            row[i] = item if child is None or item is None else child(item)
+    return layout.factory(row)
+
+
+def _project_list(child: _Projector, value: Any) -> Any:
+    return [None if item is None else child(item) for item in value]
+
+
+def _project_map(child: _Projector, value: Any) -> Any:
+    return {key: None if item is None else child(item) for key, item in value.items()}
+
+
+def _compile(
+    schema: Schema,
+    definitions: Schema,
+    merged: Schema,
+    rows: Optional[str],
+) -> Optional[_Projector]:
+    # Projector of the values of the schema out of the merged ones, None if these
+    # are the same (walks the merged plan, which is not recursive)
+    if schema.get("$ref"):
+        schema = _get_definition(definitions, schema)
+    if schema.get(RAW_KEY):
+        return None
+
+    if not _is_selective(merged):
+        if not _is_selective(schema) and _is_checked(schema, merged):
+            return None
+        return partial(_project, schema, definitions, rows=rows)
+
+    if merged["type"] == "array":
+        items = _compile(schema.get("items", {}), definitions, merged["items"], rows)
+        return list if items is None else partial(_project_list, items)
+
+    if properties := merged.get("properties"):
+        children = [
+            (name, _compile(prop, definitions, properties[name], rows))
+            for name, prop in schema["properties"].items()
+        ]
+        if rows is None:
+            return partial(_project_dict, children)
+        return partial(_project_row, get_row_layout(schema, rows), children)
+
+    additional = _compile(
+        _get_additional(schema),
+        definitions,
+        merged["additionalProperties"],
+        rows,
+    )
+    return dict if additional is None else partial(_project_map, additional)
+
+
+class _MultiLoader:
+    # Loads for several schemas from a single parse of the data. Compatible
+    # schemas are merged into a single plan and traversed once, each result is
+    # projected out of the merged one. Whole subtrees (e.g., of Any or
+    # Dict[str, Any]) are materialized once and shared between the results.
+    __slots__ = (
+        "_parser",
+        "_source",
+        "_schemas",
+        "_fail_fast",
+        "_strict",
+        "_rows",
+        "_slices",
+        "_filters",
+        "_shared",
+        "_plan",
+        "_merged",
+    )
+
+    def __init__(
+        self,
+        data: Union[str, bytes, bytearray, memoryview],
+        *,
+        schemas: Dict[str, Schema],
+        parser: Optional[Parser] = None,
+        fail_fast: bool = False,
+        strict: bool = True,
+        rows: Optional[str] = None,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+    ) -> None:
+        _check_rows(rows)
+        self._schemas = schemas
+        self._fail_fast = fail_fast
+        self._strict = strict
+        self._rows = rows
+        self._slices = _compile_slices(slices)
+        self._filters = _compile_filters(filters)
+        if isinstance(data, str):
+            data = data.encode()
+        # Documents of older pysimdjson versions do not keep their parsers alive
+        self._parser = parser or Parser()
+        self._source = self._parser.parse(data)
+        self._shared: Dict[Any, Any] = {}
+        # Locations of the fail-fast errors and the call-time selections refer
+        # to the input, so these are applied for each schema separately
+        self._plan: Optional[_Plan] = None
+        if not (fail_fast or self._slices or self._filters) and len(schemas) > 1:
+            self._plan = _get_plan(schemas)
+        self._merged: Any = None
+
+    def _load(self, schema: Schema, *, rows: Optional[str]) -> JsonType:
+        ctx = _Context(
+            schema=schema,
+            fail_fast=self._fail_fast,
+            rows=rows,
+            slices=self._slices,
+            filters=self._filters,
+            shared=self._shared,
+            strict=self._strict,
+        )
+        return _load(self._source, schema=schema, ctx=ctx)
+
+    def _get_merged(self, plan: _Plan) -> Any:
+        if self._merged is None:
+            try:
+                self._merged = self._load(plan.schema, rows=None)
+            except (ValueError, TypeError):
+                # The schemas are loaded one by one to report the errors
+                self._merged = MISSING
+        return self._merged
+
+    def load(self, name: str) -> JsonType:
+        schema = self._schemas[name]
+        plan = self._plan
+        if plan is not None and len(plan.names) > 1 and name in plan.names:
+            merged = self._get_merged(plan)
+            if merged is not MISSING:
+                projector = plan.get_projector(name, schema, self._rows)
+                return merged if projector is None else projector(merged)
+        return self._load(schema, rows=self._rows)
+
+
+def loads_multi(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    schemas: Dict[str, Schema],
+    parser: Optional[Parser] = None,
+    fail_fast: bool = False,
+    strict: bool = True,
+    rows: Optional[str] = None,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+    **_: Any,
+) -> Dict[str, JsonType]:
+    # Results may share the whole subtrees, copy these before modifying
+    loader = _MultiLoader(
+        data,
+        schemas=schemas,
+        parser=parser,
+        fail_fast=fail_fast,
+        strict=strict,
+        rows=rows,
+        slices=slices,
+        filters=filters,
+    )
+    return {name: loader.load(name) for name in schemas}
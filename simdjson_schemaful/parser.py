@@ -1,24 +1,296 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+from functools import lru_cache, partial
+from json.encoder import encode_basestring
+from sys import intern
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import simdjson
 from simdjson import Parser
 
-JsonType = Union[Dict[Any, Any], List[Any], str, int, float, bool]
+from .cache import ResultCache
+from .filters import FILTER_KEY, FilterSpec, Predicate, compile_filter, get_filter
+from .memo import IdentityMemo
+from .paths import Pattern, compile_patterns, compile_pointer, find, match, match_prefix
+from .rows import MISSING, ROW_MODES, RowLayout, get_row_layout
+from .slices import SLICE_KEY, SliceLike, iter_slice, to_slice
+
+JsonType = Union[Dict[Any, Any], List[Any], str, int, float, bool, bytes]
 Schema = Dict[Any, Any]
 _Dict = Dict[Any, Any]
 _List = List[Any]
 _FuncSet = Callable[..., None]
+_Loc = Tuple[Union[str, int], ...]
+_Slices = List[Tuple[Pattern, slice]]
+_Filters = List[Tuple[Pattern, Predicate]]
+Canonicalize = Callable[[Schema, Any], Any]
+
+# Values are kept as their minified JSON bytes, e.g., for opaque blobs
+RAW_KEY = "x-simdjson-raw"
+# Strings holding JSON documents (e.g., pydantic Json[...] fields), which are
+# trimmed to the part selected by their contentSchema
+EMBEDDED_MEDIA_TYPE = "application/json"
 
 
 # TODO: handle anyOf?
 
 
+class SchemaValidationError(ValueError):
+    # Keeps everything in args to stay picklable (and out of pydantic v1 ctx)
+    def __init__(self, msg: str, kind: str, loc: _Loc, input_: Any = None) -> None:
+        super().__init__(msg, kind, loc, input_)
+
+    def __str__(self) -> str:
+        return f"{self.msg} at '{self.pointer}'"
+
+    @property
+    def msg(self) -> str:
+        return self.args[0]
+
+    @property
+    def kind(self) -> str:
+        return self.args[1]
+
+    @property
+    def loc(self) -> _Loc:
+        return self.args[2]
+
+    @property
+    def input(self) -> Any:
+        # The offending value (the parent object of the missing keys), if known
+        return self.args[3]
+
+    @property
+    def pointer(self) -> str:
+        return "".join(
+            "/" + str(part).replace("~", "~0").replace("/", "~1") for part in self.loc
+        )
+
+
+class _ParserPool:
+    # Parsers of the embedded documents, as the ones of the outer documents are
+    # busy until these are extracted
+    __slots__ = ("_parsers",)
+
+    def __init__(self) -> None:
+        self._parsers: List[Parser] = []
+
+    def take(self) -> Parser:
+        try:
+            return self._parsers.pop()
+        except IndexError:
+            return Parser()
+
+    def give(self, parser: Parser) -> None:
+        self._parsers.append(parser)
+
+
+_PARSERS = _ParserPool()
+
+
+class _Dedupe:
+    # Subtrees extracted once per their schema, minified JSON and the call-time
+    # selections within, shared between all the occurrences within a call
+    __slots__ = ("patterns", "canonicalize", "entries")
+
+    def __init__(
+        self,
+        *,
+        patterns: Optional[List[Pattern]],
+        canonicalize: Optional[Canonicalize],
+    ) -> None:
+        # None to deduplicate all the nested subtrees
+        self.patterns = patterns
+        self.canonicalize = canonicalize
+        self.entries: _Dict = {}
+
+    def applies(self, loc: _Loc) -> bool:
+        if self.patterns is None:
+            return True
+        return any(match(pattern, loc) for pattern in self.patterns)
+
+
+# Kinds of the schema nodes, i.e., how their values are extracted
+_SCALAR = 0
+_RAW = 1
+_ANY = 2
+_WHOLE_OBJECT = 3
+_WHOLE_ARRAY = 4
+_OBJECT = 5
+_MAPPING = 6
+_ARRAY = 7
+_CONTAINERS = (_WHOLE_OBJECT, _WHOLE_ARRAY, _OBJECT, _MAPPING, _ARRAY)
+
+
+class _Node:
+    # Schema (with the references resolved) along with the decisions taken once
+    # per schema instead of once per value
+    __slots__ = (
+        "schema",
+        "kind",
+        "properties",
+        "additional",
+        "items",
+        "content",
+        "selection",
+    )
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.kind = _ANY
+        self.properties: Tuple[Tuple[str, _Node], ...] = ()
+        self.additional: Optional[_Node] = None
+        self.items: Optional[_Node] = None
+        # Schema of the embedded documents, if these are extracted selectively
+        self.content: Optional[_Node] = None
+        self.selection = SLICE_KEY in schema or FILTER_KEY in schema
+
+
+class _Plan:
+    # Nodes of the schemas within a root one, by the ids of these schemas
+    __slots__ = ("schema", "definitions", "nodes")
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.definitions = schema.get("definitions", {}) or schema.get("$defs", {})
+        self.nodes: Dict[int, _Node] = {}
+
+    def get(self, schema: Schema) -> _Node:
+        if schema.get("$ref"):
+            schema = _get_definition(self.definitions, schema)
+        node = self.nodes.get(id(schema))
+        if node is None:
+            # Published once complete, as plans are shared between threads
+            nodes = dict(self.nodes)
+            node = _compile_node(schema, self.definitions, nodes)
+            self.nodes = nodes
+        return node
+
+
+_PLANS: IdentityMemo[_Plan] = IdentityMemo()
+
+
+def _get_plan(schema: Schema) -> _Plan:
+    return _PLANS.get_or_create((schema,), partial(_Plan, schema))
+
+
+class _Context:
+    __slots__ = (
+        "plan",
+        "fail_fast",
+        "rows",
+        "slices",
+        "filters",
+        "shared",
+        "dedupe",
+        "strict",
+        "track",
+        "finalize",
+    )
+
+    def __init__(
+        self,
+        *,
+        schema: Schema,
+        fail_fast: bool,
+        rows: Optional[str],
+        slices: _Slices,
+        filters: _Filters,
+        shared: Optional[_Dict] = None,
+        dedupe: Optional[_Dedupe] = None,
+        strict: bool = True,
+    ) -> None:
+        # Plan of the root schema, i.e., the one with the definitions
+        self.plan = _get_plan(schema)
+        self.fail_fast = fail_fast
+        self.rows = rows
+        self.slices = slices
+        self.filters = filters
+        # Whole subtrees by their locations, shared between several schemas
+        self.shared = shared
+        self.dedupe = dedupe
+        # Whether the fail-fast checks reject the scalars of other types
+        self.strict = strict
+        # Locations are only needed for errors and the location-based features
+        self.track = bool(
+            fail_fast or slices or filters or shared is not None or dedupe is not None
+        )
+        # Rows to be converted once filled: (func_set, target, prop, row)
+        self.finalize: _List = []
+
+
+class _RowBuilder(list):  # type: ignore[type-arg]
+    __slots__ = ("layout",)
+
+    def __init__(self, layout: RowLayout) -> None:
+        super().__init__([MISSING] * layout.size)
+        self.layout = layout
+
+
 def _get_definition(definitions: Dict[str, Schema], schema: Schema) -> Schema:
     if ref := schema.get("$ref"):
         return definitions[ref.split("/")[-1]]
     return schema
 
 
+def _get_additional(schema: Schema) -> Schema:
+    # Only the schemas restrict the values, booleans allow any
+    additional = schema.get("additionalProperties")
+    return additional if isinstance(additional, dict) else {}
+
+
+def _compile_node(
+    schema: Schema,
+    definitions: Dict[str, Schema],
+    nodes: Dict[int, _Node],
+) -> _Node:
+    if schema.get("$ref"):
+        schema = _get_definition(definitions, schema)
+    node = nodes.get(id(schema))
+    if node is not None:
+        return node
+    # Registered before the children, as the schemas may be recursive
+    node = nodes[id(schema)] = _Node(schema)
+
+    if _is_embedded(schema):
+        node.content = _compile_node(schema["contentSchema"], definitions, nodes)
+
+    type_ = schema.get("type")
+    if schema.get(RAW_KEY):
+        node.kind = _RAW
+    elif type_ == "array":
+        items = schema.get("items", {})
+        node.items = _compile_node(items, definitions, nodes)
+        node.kind = _ARRAY if _is_selective(items) else _WHOLE_ARRAY
+    elif type_ not in (None, "object") or (
+        not type_ and ("enum" in schema or "const" in schema)
+    ):
+        node.kind = _SCALAR
+    elif not type_:
+        # Untyped values (e.g., Any) may be of any kind
+        node.kind = _ANY
+    elif properties := schema.get("properties"):
+        node.kind = _OBJECT
+        node.properties = tuple(
+            (name, _compile_node(prop, definitions, nodes))
+            for name, prop in properties.items()
+        )
+    elif additional := _get_additional(schema):
+        node.kind = _MAPPING
+        node.additional = _compile_node(additional, definitions, nodes)
+    else:
+        node.kind = _WHOLE_OBJECT
+    return node
+
+
 def _set_dict(target: _Dict, key: str, value: Any) -> None:
     target[key] = value
 
@@ -29,156 +301,531 @@ def _set_list(target: _List, index: int, value: Any) -> None:
     target[index] = value
 
 
-def _process_prop(
+def _set_row(target: _RowBuilder, key: str, value: Any) -> None:
+    target[target.layout.indices[key]] = value
+
+
+def _new_target(node: _Node, ctx: _Context) -> Union[_Dict, _List]:
+    if node.items is not None:
+        return []
+    if ctx.rows is None or node.kind != _OBJECT:
+        return {}
+    return _RowBuilder(get_row_layout(node.schema, ctx.rows))
+
+
+def _finalize(ctx: _Context) -> None:
+    # Nested rows are registered after their parents, so are converted first
+    for func_set, target, prop, row in reversed(ctx.finalize):
+        func_set(target, prop, row.layout.factory(row))
+    ctx.finalize.clear()
+
+
+def _get_slice(schema: Schema, loc: _Loc, ctx: _Context) -> Optional[slice]:
+    # Call-time slices take precedence over the schema ones
+    if ctx.slices and (slc := find(ctx.slices, loc)) is not None:
+        return slc
+    if (value := schema.get(SLICE_KEY)) is not None:
+        return to_slice(value)
+    return None
+
+
+def _get_predicate(schema: Schema, loc: _Loc, ctx: _Context) -> Optional[Predicate]:
+    if ctx.filters and (predicate := find(ctx.filters, loc)) is not None:
+        return predicate
+    if (spec := schema.get(FILTER_KEY)) is not None:
+        return get_filter(spec)
+    return None
+
+
+def _select(
+    schema: Schema,
+    array: simdjson.Array,
+    loc: _Loc,
+    ctx: _Context,
+) -> Optional[Iterator[Tuple[int, Any]]]:
+    # Items (with their indices) left after slicing and filtering, None if all.
+    # Slices select positions in the input, filters are applied to them.
+    slc = _get_slice(schema, loc, ctx)
+    predicate = _get_predicate(schema, loc, ctx)
+    if slc is None and predicate is None:
+        return None
+
+    selected: Iterator[Tuple[int, Any]]
+    if slc is None:
+        selected = enumerate(array)
+    else:
+        selected = iter_slice(array, range(len(array))[slc])
+    if predicate is not None:
+        selected = (item for item in selected if predicate(item[1]))
+    return selected
+
+
+def _has_selection(node: _Node, ctx: _Context) -> bool:
+    return bool(node.selection or ctx.slices or ctx.filters)
+
+
+def _materialize(value: Any) -> Any:
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def _materialize_at(value: Any, path: _Loc, key: Any, ctx: _Context) -> Any:
+    if ctx.shared is None:
+        return _materialize(value)
+    loc = (*path, key)
+    res = ctx.shared.get(loc, MISSING)
+    if res is MISSING:
+        res = ctx.shared[loc] = _materialize(value)
+    return res
+
+
+def _is_selective(schema: Schema) -> bool:
+    # Whether only a part of the values is extracted, otherwise these are
+    # materialized as is
+    if schema.get("$ref") or schema.get("properties") or schema.get(RAW_KEY):
+        return True
+    if _get_additional(schema) or _is_embedded(schema):
+        return True
+    if schema.get("type") == "array":
+        return (
+            SLICE_KEY in schema
+            or FILTER_KEY in schema
+            or _is_selective(schema.get("items", {}))
+        )
+    return False
+
+
+def _is_embedded(schema: Schema) -> bool:
+    # Documents without any selection are kept as is
+    return schema.get("contentMediaType") == EMBEDDED_MEDIA_TYPE and _is_selective(
+        schema.get("contentSchema") or {}
+    )
+
+
+def _get_json_types(value: Any) -> Tuple[str, ...]:
+    if isinstance(value, bool):
+        return ("boolean",)
+    if isinstance(value, int):
+        return ("integer", "number")
+    if isinstance(value, float):
+        return ("number", "integer") if value.is_integer() else ("number",)
+    if isinstance(value, str):
+        return ("string",)
+    return ()
+
+
+def _check_value(schema: Schema, value: Any, loc: _Loc, strict: bool) -> None:
+    # Nullability is not checked: pydantic v1 does not reflect it in schemas
+    if value is None:
+        return
+
+    if type_ := schema.get("type"):
+        types = (type_,) if isinstance(type_, str) else type_
+        if not any(t in types for t in _get_json_types(value)):
+            if not strict:
+                # Left to the validation, which may coerce it (e.g., "1" to 1)
+                return
+            raise SchemaValidationError(
+                f"Input should be of type {' or '.join(types)}",
+                kind="type",
+                loc=loc,
+                input_=value,
+            )
+
+    if "const" in schema and value != schema["const"]:
+        raise SchemaValidationError(
+            f"Input should be {schema['const']!r}",
+            kind="const",
+            loc=loc,
+            input_=value,
+        )
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise SchemaValidationError(
+            f"Input should be one of {', '.join(map(repr, schema['enum']))}",
+            kind="enum",
+            loc=loc,
+            input_=value,
+        )
+
+
+def _get_input(value: Any) -> Any:
+    # Only the count of the items is known for some of the selected ones
+    return None if isinstance(value, range) else _materialize(value)
+
+
+def _check_array(
+    schema: Schema,
+    value: Any,
+    loc: _Loc,
     *,
-    prop_data: _Dict,
+    check_items: bool = False,
+    strict: bool = True,
+) -> None:
+    if "minItems" in schema and len(value) < schema["minItems"]:
+        raise SchemaValidationError(
+            f"Array should have at least {schema['minItems']} items",
+            kind="min_items",
+            loc=loc,
+            input_=_get_input(value),
+        )
+    if "maxItems" in schema and len(value) > schema["maxItems"]:
+        raise SchemaValidationError(
+            f"Array should have at most {schema['maxItems']} items",
+            kind="max_items",
+            loc=loc,
+            input_=_get_input(value),
+        )
+
+    # Items of the already materialized scalar arrays, e.g., List[int]
+    items = schema.get("items", {})
+    if check_items and (
+        items.get("type") not in (None, "array", "object")
+        or ("enum" in items or "const" in items)
+    ):
+        for i, item in enumerate(value):
+            _check_value(items, item, (*loc, i), strict)
+
+
+def _check_object(schema: Schema, value: Any, loc: _Loc) -> None:
+    for key in schema.get("required", ()):
+        if key not in value:
+            raise SchemaValidationError(
+                "Field required",
+                kind="missing",
+                loc=(*loc, key),
+                input_=_materialize(value),
+            )
+
+
+def _process_prop(  # noqa: C901
+    node: _Node,
     prop: Union[str, int],
     value: Any,
     target: Union[_Dict, _List],
     func_set: _FuncSet,
-    definitions: Schema,
+    ctx: _Context,
     queue: _List,
+    path: _Loc,
+    key: Union[str, int],
+    dedupe: bool = True,
 ) -> None:
+    # The key of the value in the source differs from prop for sliced arrays.
+    # Positional, as called once per value.
     if value is None:
-        target[prop] = value  # type: ignore
+        func_set(target, prop, value)
         return
 
-    type_ = prop_data.get("type")
-    items = prop_data.get("items", {})
+    kind = node.kind
+    if kind == _SCALAR and (node.content is None or value.__class__ is not str):
+        if isinstance(value, (simdjson.Object, simdjson.Array)):
+            raise ValueError(
+                f"Supposed to be anything but object/array, "
+                f"but in reality is {value.__class__}",
+            )
+        if ctx.fail_fast:
+            _check_value(node.schema, value, (*path, key), ctx.strict)
+        func_set(target, prop, value)
+        return
+
+    if kind == _RAW:
+        func_set(target, prop, _to_raw(value))
+        return
+
+    if node.content is not None and value.__class__ is str:
+        loc = (*path, key)
+        if ctx.fail_fast:
+            _check_value(node.schema, value, loc, ctx.strict)
+        func_set(target, prop, _dump_embedded(node, value, loc, ctx))
+        return
 
-    if type_ == "array" and not items.get("$ref") and not items.get("properties"):
+    if (
+        dedupe
+        and ctx.dedupe is not None
+        and isinstance(value, (simdjson.Object, simdjson.Array))
+        and ctx.dedupe.applies((*path, key))
+    ):
+        func_set(target, prop, _dedupe(node, value, path, key, ctx))
+        return
+
+    if kind == _WHOLE_ARRAY:
         if not isinstance(value, simdjson.Array):
             raise ValueError(
                 f"Supposed to be an array, but in reality is a {value.__class__}",
             )
-        func_set(target, prop, value.as_list())
+        selected = None
+        if _has_selection(node, ctx):
+            selected = _select(node.schema, value, (*path, key), ctx)
+        if selected is None:
+            values = _materialize_at(value, path, key, ctx)
+        else:
+            values = [_materialize(item) for _, item in selected]
+        if ctx.fail_fast:
+            _check_array(
+                node.schema, values, (*path, key), check_items=True, strict=ctx.strict
+            )
+        func_set(target, prop, values)
         return
 
-    if (not type_ and not prop_data.get("$ref")) or (
-        type_ == "object"
-        and not prop_data.get("properties")
-        and not prop_data.get("additionalProperties")
-    ):
+    if kind == _ANY:
+        if ctx.fail_fast and isinstance(value, simdjson.Object):
+            _check_object(node.schema, value, (*path, key))
+        func_set(target, prop, _materialize_at(value, path, key, ctx))
+        return
+
+    if kind == _WHOLE_OBJECT:
         if not isinstance(value, simdjson.Object):
             raise ValueError(
                 f"Supposed to be an object, but in reality is a {value.__class__}",
             )
-        func_set(target, prop, value.as_dict())
+        if ctx.fail_fast:
+            _check_object(node.schema, value, (*path, key))
+        func_set(target, prop, _materialize_at(value, path, key, ctx))
         return
 
-    if type_ not in (None, "array", "object"):
-        if isinstance(value, (simdjson.Object, simdjson.Array)):
-            raise ValueError(
-                f"Supposed to be anything but object/array, "
-                f"but in reality is {value.__class__}",
-            )
-        func_set(target, prop, value)
-        return
+    container = _new_target(node, ctx)
+    func_set(target, prop, container)
+    if container.__class__ is _RowBuilder:
+        ctx.finalize.append((func_set, target, prop, container))
+    queue.append((node, value, container, (*path, key) if ctx.track else path))
 
-    if type_ == "array":
-        definition = prop_data
-        func_set(target, prop, [])
-    elif type_ == "object" or prop_data.get("$ref"):
-        definition = _get_definition(definitions, prop_data)
-        func_set(target, prop, {})
-    else:
-        raise ValueError(f"invalid type {type_} for prop data {prop_data}")
 
-    queue.append((definition, value, target[prop]))  # type: ignore
+def _dedupe(
+    node: _Node,
+    value: Any,
+    path: _Loc,
+    key: Union[str, int],
+    ctx: _Context,
+) -> Any:
+    assert ctx.dedupe is not None
+    loc = (*path, key)
+    # Call-time selections depend on the location, the schema ones do not
+    selections = tuple(
+        i
+        for i, (pattern, _) in enumerate((*ctx.slices, *ctx.filters))
+        if match_prefix(pattern, loc)
+    )
+    entry_key = (id(node.schema), selections, _to_raw(value))
+    res = ctx.dedupe.entries.get(entry_key, MISSING)
+    if res is not MISSING:
+        return res
+
+    # Extracted right away (with its own rows converted), so that the result
+    # can be shared
+    pending, ctx.finalize = ctx.finalize, []
+    holder: _Dict = {}
+    queue: _List = []
+    _process_prop(node, key, value, holder, _set_dict, ctx, queue, path, key, False)
+    _traverse(queue, ctx=ctx)
+    _finalize(ctx)
+    ctx.finalize = pending
 
+    res = holder[key]
+    if ctx.dedupe.canonicalize is not None:
+        res = ctx.dedupe.canonicalize(node.schema, res)
+    ctx.dedupe.entries[entry_key] = res
+    return res
 
-def _loads(  # noqa: C901
+
+def _loads(
     data: Union[bytes, bytearray, memoryview],
     *,
     schema: Schema,
     parser: Parser,
+    fail_fast: bool,
+    strict: bool,
+    rows: Optional[str],
+    slices: _Slices,
+    filters: _Filters,
+    dedupe: Optional[_Dedupe] = None,
 ) -> JsonType:
-    definitions = schema.get("definitions", {}) or schema.get("$defs", {})
+    ctx = _Context(
+        schema=schema,
+        fail_fast=fail_fast,
+        rows=rows,
+        slices=slices,
+        filters=filters,
+        dedupe=dedupe,
+        strict=strict,
+    )
+    return _load(parser.parse(data), schema=schema, ctx=ctx)
 
-    if "$ref" in schema:
-        schema = _get_definition(definitions, schema)
 
-    type_ = schema.get("type")
-    if type_ not in ["object", "array"]:
-        return simdjson.loads(data)  # type: ignore
+def _load(source: Any, *, schema: Schema, ctx: _Context) -> JsonType:
+    node = ctx.plan.get(schema)
+    if node.kind == _RAW:
+        return _to_raw(source)
+    if node.kind not in _CONTAINERS:
+        return _materialize(source)
+
+    res = _new_target(node, ctx)
+    holder = {"": res}
+    if res.__class__ is _RowBuilder:
+        ctx.finalize.append((_set_dict, holder, "", res))
 
-    res: Union[_List, _Dict] = {} if type_ == "object" else []
+    _traverse([(node, source, res, ())], ctx=ctx)
+    _finalize(ctx)
+    return holder[""]
 
-    source = parser.parse(data)
-    target = res
-    queue = [(schema, source, target)]
+
+def _traverse(queue: _List, *, ctx: _Context) -> None:  # noqa: C901
+    fail_fast = ctx.fail_fast
 
     while queue:
-        schema, source, target = queue.pop()
-        type_ = schema["type"]
+        node, source, target, path = queue.pop()
 
-        if type_ == "object":
-            if not isinstance(source, simdjson.Object):
+        if node.items is not None:
+            if not isinstance(source, simdjson.Array):
                 raise ValueError(
-                    f"Supposed to be an object, but in reality is a {source.__class__}",
+                    f"Supposed to be an array, but in reality is a {source.__class__}"
                 )
 
-            properties = schema.get("properties", {})
-
-            if properties:
-                for prop_name, prop_data in properties.items():
-                    value = None
-                    try:
-                        value = source[prop_name]
-                    except KeyError:
-                        continue
+            items = node.items
+            selected = None
+            if _has_selection(node, ctx):
+                selected = _select(node.schema, source, path, ctx)
 
+            if selected is None:
+                if fail_fast:
+                    _check_array(node.schema, source, path)
+                for i, value in enumerate(source):
                     _process_prop(
-                        prop_data=prop_data,
-                        prop=prop_name,
-                        value=value,
-                        target=target,
-                        func_set=_set_dict,
-                        definitions=definitions,
-                        queue=queue,
+                        items, i, value, target, _set_list, ctx, queue, path, i
                     )
                 continue
 
-            additional_properties = _get_definition(
-                definitions=definitions,
-                schema=schema.get("additionalProperties", {}),
+            for j, (i, value) in enumerate(selected):
+                _process_prop(items, j, value, target, _set_list, ctx, queue, path, i)
+            # Bounds are checked against the selected items
+            if fail_fast:
+                _check_array(node.schema, target, path)
+            continue
+
+        if not isinstance(source, simdjson.Object):
+            raise ValueError(
+                f"Supposed to be an object, but in reality is a {source.__class__}",
             )
-            if additional_properties:
-                for prop_name in source.keys():
-                    value = source.get(prop_name)
-                    _process_prop(
-                        prop_data=additional_properties,
-                        prop=prop_name,
-                        value=value,
-                        target=target,
-                        func_set=_set_dict,
-                        definitions=definitions,
-                        queue=queue,
-                    )
-                continue
 
-            target.update(source.as_dict())  # type: ignore
+        if fail_fast:
+            _check_object(node.schema, source, path)
 
-        elif type_ == "array":
-            if not isinstance(source, simdjson.Array):
-                raise ValueError(
-                    f"Supposed to be an array, but in reality is a {source.__class__}"
+        if node.kind == _OBJECT:
+            func_set = _set_row if target.__class__ is _RowBuilder else _set_dict
+            for prop_name, prop_node in node.properties:
+                try:
+                    value = source[prop_name]
+                except KeyError:
+                    continue
+                _process_prop(
+                    prop_node,
+                    prop_name,
+                    value,
+                    target,
+                    func_set,
+                    ctx,
+                    queue,
+                    path,
+                    prop_name,
                 )
-
-            for i, value in enumerate(source):
+        elif node.kind == _MAPPING:
+            additional = node.additional
+            for prop_name in source.keys():
+                # Keys of the mappings tend to repeat between items
+                prop_name = intern(prop_name)
                 _process_prop(
-                    prop_data=_get_definition(definitions, schema["items"]),
-                    prop=i,
-                    value=value,
-                    target=target,
-                    func_set=_set_list,
-                    definitions=definitions,
-                    queue=queue,
+                    additional,
+                    prop_name,
+                    source.get(prop_name),
+                    target,
+                    _set_dict,
+                    ctx,
+                    queue,
+                    path,
+                    prop_name,
                 )
         else:
-            raise ValueError(f"Invalid schema type {type_}, expected object or array")
+            target.update(source.as_dict())
 
-    return res
+
+def _extract(value: Any, *, prop_data: Schema, index: int, ctx: _Context) -> Any:
+    node = ctx.plan.get(prop_data)
+    if node.kind == _ANY and node.content is None:
+        # Untyped items (e.g., List[Any]) may be of any kind
+        return _materialize(value)
+
+    holder: _Dict = {}
+    queue: _List = []
+    _process_prop(node, index, value, holder, _set_dict, ctx, queue, (), index)
+    _traverse(queue, ctx=ctx)
+    _finalize(ctx)
+    return holder[index]
+
+
+def _iter_items(source: Any, *, schema: Schema, ctx: _Context) -> Iterator[Any]:
+    # Items of the top-level array (with their indices) left after selection
+    if not isinstance(source, simdjson.Array):
+        raise ValueError(
+            f"Supposed to be an array, but in reality is a {source.__class__}",
+        )
+
+    selected = _select(schema, source, (), ctx)
+    if selected is None:
+        if ctx.fail_fast:
+            _check_array(schema, source, ())
+        yield from enumerate(source)
+        return
+
+    # Bounds are checked against the selected items, once all of them are known
+    count = 0
+    for item in selected:
+        yield item
+        count += 1
+    if ctx.fail_fast:
+        _check_array(schema, range(count), ())
+
+
+def _iter_loads(
+    data: Union[bytes, bytearray, memoryview],
+    *,
+    schema: Schema,
+    parser: Parser,
+    ctx: _Context,
+) -> Iterator[Any]:
+    prop_data = schema.get("items", {})
+    for i, value in _iter_items(parser.parse(data), schema=schema, ctx=ctx):
+        yield _extract(value, prop_data=prop_data, index=i, ctx=ctx)
+
+
+def _check_rows(rows: Optional[str]) -> None:
+    if rows is not None and rows not in ROW_MODES:
+        raise ValueError(f"Invalid rows mode {rows}, expected one of {ROW_MODES}")
+
+
+def _compile_slices(slices: Optional[Dict[str, SliceLike]]) -> _Slices:
+    return [(pattern, to_slice(slc)) for pattern, slc in compile_patterns(slices)]
+
+
+def _compile_filters(filters: Optional[Dict[str, FilterSpec]]) -> _Filters:
+    return [
+        (pattern, compile_filter(spec)) for pattern, spec in compile_patterns(filters)
+    ]
+
+
+def _compile_dedupe(
+    dedupe: Union[bool, Sequence[str]],
+    canonicalize: Optional[Canonicalize],
+) -> Optional[_Dedupe]:
+    if not dedupe:
+        if canonicalize is not None:
+            raise ValueError("canonicalize requires dedupe")
+        return None
+    if isinstance(dedupe, str):
+        raise ValueError(f"Invalid dedupe {dedupe!r}, expected a list of paths")
+    patterns = None if dedupe is True else [compile_pointer(p) for p in dedupe]
+    return _Dedupe(patterns=patterns, canonicalize=canonicalize)
 
 
 def loads(
@@ -186,9 +833,286 @@ def loads(
     *,
     schema: Schema,
     parser: Optional[Parser] = None,
+    cache: Optional[ResultCache] = None,
+    fail_fast: bool = False,
+    strict: bool = True,
+    rows: Optional[str] = None,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+    dedupe: Union[bool, Sequence[str]] = False,
+    canonicalize: Optional[Canonicalize] = None,
     **_: Any,
 ) -> JsonType:
+    _check_rows(rows)
+    compiled_slices = _compile_slices(slices)
+    compiled_filters = _compile_filters(filters)
+    compiled_dedupe = _compile_dedupe(dedupe, canonicalize)
     if isinstance(data, str):
         data = data.encode()
     parser = parser or Parser()  # Default for thread safety
-    return _loads(data, schema=schema, parser=parser)
+    load = partial(
+        _loads,
+        data,
+        schema=schema,
+        parser=parser,
+        fail_fast=fail_fast,
+        strict=strict,
+        rows=rows,
+        slices=compiled_slices,
+        filters=compiled_filters,
+        dedupe=compiled_dedupe,
+    )
+    if cache is not None:
+        return cache.get_or_load(
+            data,
+            schema,
+            load,
+            fail_fast,
+            strict,
+            rows,
+            slices,
+            filters,
+            dedupe,
+            canonicalize,
+        )
+    return load()
+
+
+def iter_loads(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    schema: Schema,
+    parser: Optional[Parser] = None,
+    fail_fast: bool = False,
+    strict: bool = True,
+    rows: Optional[str] = None,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+    dedupe: Union[bool, Sequence[str]] = False,
+    canonicalize: Optional[Canonicalize] = None,
+    **_: Any,
+) -> Iterator[Any]:
+    # Yields items of the top-level array one by one, so that only a single item
+    # is materialized at a time. The parser is busy until the iterator is done.
+    _check_rows(rows)
+    compiled_slices = _compile_slices(slices)
+    compiled_filters = _compile_filters(filters)
+    compiled_dedupe = _compile_dedupe(dedupe, canonicalize)
+    ctx = _Context(
+        schema=schema,
+        fail_fast=fail_fast,
+        rows=rows,
+        slices=compiled_slices,
+        filters=compiled_filters,
+        dedupe=compiled_dedupe,
+        strict=strict,
+    )
+
+    if "$ref" in schema:
+        schema = _get_definition(ctx.plan.definitions, schema)
+
+    if schema.get("type") != "array":
+        raise ValueError(f"Invalid schema type {schema.get('type')}, expected array")
+
+    if isinstance(data, str):
+        data = data.encode()
+    parser = parser or Parser()
+    return _iter_loads(data, schema=schema, parser=parser, ctx=ctx)
+
+
+@lru_cache(maxsize=4096)
+def _encode_key(key: str) -> bytes:
+    return encode_basestring(key).encode() + b":"
+
+
+def _mini(value: Union[simdjson.Object, simdjson.Array]) -> bytes:
+    # Bytes since pysimdjson 4, str before
+    mini: Union[str, bytes] = value.mini
+    return mini.encode() if isinstance(mini, str) else mini
+
+
+def _encode_scalar(value: Any) -> bytes:
+    if value.__class__ is str:
+        return encode_basestring(value).encode()
+    if value is None:
+        return b"null"
+    if value is True:
+        return b"true"
+    if value is False:
+        return b"false"
+    return repr(value).encode()
+
+
+def _to_raw(value: Any) -> bytes:
+    if isinstance(value, (simdjson.Object, simdjson.Array)):
+        return _mini(value)
+    return _encode_scalar(value)
+
+
+def _dump_object(
+    node: _Node,
+    value: Any,
+    out: bytearray,
+    loc: _Loc,
+    ctx: _Context,
+) -> None:
+    if not isinstance(value, simdjson.Object):
+        raise ValueError(
+            f"Supposed to be an object, but in reality is a {value.__class__}",
+        )
+    if ctx.fail_fast:
+        _check_object(node.schema, value, loc)
+
+    if node.kind == _OBJECT:
+        props = [(key, prop_node) for key, prop_node in node.properties if key in value]
+    elif node.additional is not None:
+        props = [(key, node.additional) for key in value.keys()]
+    else:
+        out += _mini(value)
+        return
+
+    out += b"{"
+    first = True
+    for key, prop_node in props:
+        if not first:
+            out += b","
+        first = False
+        out += _encode_key(key)
+        _dump(prop_node, value[key], out, (*loc, key), ctx)
+    out += b"}"
+
+
+def _dump_array(
+    node: _Node,
+    value: Any,
+    out: bytearray,
+    loc: _Loc,
+    ctx: _Context,
+) -> None:
+    if not isinstance(value, simdjson.Array):
+        raise ValueError(
+            f"Supposed to be an array, but in reality is a {value.__class__}",
+        )
+
+    selected = None
+    if _has_selection(node, ctx):
+        selected = _select(node.schema, value, loc, ctx)
+    if selected is None:
+        if ctx.fail_fast:
+            _check_array(
+                node.schema,
+                value,
+                loc,
+                check_items=node.kind == _WHOLE_ARRAY,
+                strict=ctx.strict,
+            )
+        if node.kind == _WHOLE_ARRAY:
+            out += _mini(value)
+            return
+        selected = enumerate(value)
+
+    items = node.items
+    assert items is not None
+    out += b"["
+    count = 0
+    for i, item in selected:
+        if count:
+            out += b","
+        count += 1
+        _dump(items, item, out, (*loc, i), ctx)
+    out += b"]"
+    # Bounds are checked against the selected items
+    if ctx.fail_fast:
+        _check_array(node.schema, range(count), loc)
+
+
+def _dump(node: _Node, value: Any, out: bytearray, loc: _Loc, ctx: _Context) -> None:
+    # Recursive, as the output is written in order (depth is limited by simdjson)
+    if value is None:
+        out += b"null"
+        return
+
+    kind = node.kind
+    if kind == _RAW:
+        # Written as a string, as loads returns the raw values as bytes
+        out += encode_basestring(_to_raw(value).decode()).encode()
+    elif node.items is not None:
+        _dump_array(node, value, out, loc, ctx)
+    elif kind in _CONTAINERS:
+        _dump_object(node, value, out, loc, ctx)
+    elif isinstance(value, (simdjson.Object, simdjson.Array)):
+        if kind == _SCALAR:
+            raise ValueError(
+                f"Supposed to be anything but object/array, "
+                f"but in reality is {value.__class__}",
+            )
+        # Untyped values (e.g., Any) are written as is
+        if ctx.fail_fast and isinstance(value, simdjson.Object):
+            _check_object(node.schema, value, loc)
+        out += _mini(value)
+    else:
+        _dump_scalar(node, value, out, loc, ctx)
+
+
+def _dump_scalar(
+    node: _Node,
+    value: Any,
+    out: bytearray,
+    loc: _Loc,
+    ctx: _Context,
+) -> None:
+    if ctx.fail_fast:
+        _check_value(node.schema, value, loc, ctx.strict)
+    if node.content is not None and value.__class__ is str:
+        out += encode_basestring(_dump_embedded(node, value, loc, ctx)).encode()
+    else:
+        out += _encode_scalar(value)
+
+
+def _dump_embedded(node: _Node, value: str, loc: _Loc, ctx: _Context) -> str:
+    # Still a JSON string (e.g., for pydantic to parse), with the locations and
+    # the call-time selections continuing into the document. Invalid documents
+    # are left as is to be reported downstream.
+    assert node.content is not None
+    parser = _PARSERS.take()
+    try:
+        document = parser.parse(value.encode())
+    except ValueError:
+        _PARSERS.give(parser)
+        return value
+    out = bytearray()
+    _dump(node.content, document, out, loc, ctx)
+    # Not returned on errors, as their tracebacks may reference the documents
+    del document
+    _PARSERS.give(parser)
+    return out.decode()
+
+
+def loads_json(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    schema: Schema,
+    parser: Optional[Parser] = None,
+    fail_fast: bool = False,
+    strict: bool = True,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+    **_: Any,
+) -> bytes:
+    # Same selection as in loads, but written out as minified JSON, so that
+    # only the scalars are converted to python objects (and keys)
+    ctx = _Context(
+        schema=schema,
+        fail_fast=fail_fast,
+        rows=None,
+        slices=_compile_slices(slices),
+        filters=_compile_filters(filters),
+        strict=strict,
+    )
+    if isinstance(data, str):
+        data = data.encode()
+    parser = parser or Parser()
+
+    out = bytearray()
+    _dump(ctx.plan.get(schema), parser.parse(data), out, (), ctx)
+    return bytes(out)
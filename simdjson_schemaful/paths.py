@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+Loc = Tuple[Union[str, int], ...]
+Pattern = Tuple[str, ...]
+
+WILDCARD = "*"
+
+
+def compile_pointer(pointer: str) -> Pattern:
+    # JSON pointer, where "*" matches any key or array index, e.g., "/items/*/tags"
+    if pointer == "":
+        return ()
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid path {pointer!r}, expected a JSON pointer")
+    return tuple(
+        part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")
+    )
+
+
+def compile_patterns(options: Optional[Dict[str, T]]) -> List[Tuple[Pattern, T]]:
+    if not options:
+        return []
+    return [(compile_pointer(pointer), value) for pointer, value in options.items()]
+
+
+def match(pattern: Pattern, loc: Loc) -> bool:
+    if len(pattern) != len(loc):
+        return False
+    for part, key in zip(pattern, loc):
+        if part != WILDCARD and part != str(key):
+            return False
+    return True
+
+
+def match_prefix(pattern: Pattern, loc: Loc) -> bool:
+    # Whether the pattern may match the location or any of its descendants
+    return len(pattern) >= len(loc) and match(pattern[: len(loc)], loc)
+
+
+def find(patterns: List[Tuple[Pattern, T]], loc: Loc) -> Optional[T]:
+    # The first matching pattern wins
+    for pattern, value in patterns:
+        if match(pattern, loc):
+            return value
+    return None
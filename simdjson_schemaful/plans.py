@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, NamedTuple, Union
+
+from .__version__ import __version__
+from .parser import Schema
+
+_SUFFIX = ".json"
+
+
+class PlanCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    errors: int
+
+
+class PlanCache:
+    # On-disk cache of the schemas the values are extracted with (e.g., the ones
+    # generated from pydantic models), so that fresh processes do not generate
+    # them again. Entries are keyed by the version of the package and the
+    # fingerprint of the source (including the versions it depends on), which is
+    # stored and compared as well, so that changed sources are never reused.
+    # Unreadable entries are regenerated, unwritable directories are tolerated.
+
+    __slots__ = ("_path", "_lock", "_hits", "_misses", "_errors")
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self._path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _get_file(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return os.path.join(self._path, digest + _SUFFIX)
+
+    def get_or_create(self, fingerprint: str, create: Callable[[], Schema]) -> Schema:
+        key = f"{__version__}\0{fingerprint}"
+        file = self._get_file(key)
+        try:
+            with open(file, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError):
+            entry = None
+            self._count_error()
+
+        if isinstance(entry, dict) and entry.get("key") == key:
+            with self._lock:
+                self._hits += 1
+            return entry["schema"]
+
+        with self._lock:
+            self._misses += 1
+        schema = create()
+        self._write(file, {"key": key, "schema": schema})
+        return schema
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def _write(self, file: str, entry: Schema) -> None:
+        # Replaced atomically, as the directory may be shared between processes
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._path, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entry, f)
+                os.replace(tmp, file)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except (OSError, TypeError, ValueError):
+            # E.g., read-only file systems or schemas which are not JSON
+            self._count_error()
+
+    def cache_info(self) -> PlanCacheInfo:
+        with self._lock:
+            return PlanCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                errors=self._errors,
+            )
+
+    def cache_clear(self) -> None:
+        try:
+            names = os.listdir(self._path)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if name.endswith(_SUFFIX) and len(name) == 32 + len(_SUFFIX):
+                try:
+                    os.unlink(os.path.join(self._path, name))
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._errors = 0
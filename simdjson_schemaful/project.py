@@ -0,0 +1,214 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from simdjson import Parser
+
+from .parser import Schema, loads, loads_json
+from .slices import SLICE_KEY
+
+# Steps of a selector: ("key", name), ("keys", None) for any key of an object,
+# ("items", None) for any item of an array and ("item", index)
+_Step = Tuple[str, Any]
+
+_STEP_RE = re.compile(
+    r"""
+    \[\*\]
+    | \[(?P<index>-?\d+)\]
+    | \[(?P<quoted>"(?:[^"\\]|\\.)*")\]
+    | (?:^|\.)(?P<key>[^.\[\]]+)
+    """,
+    re.VERBOSE,
+)
+
+
+def _parse_selector(selector: str) -> Tuple[_Step, ...]:
+    # E.g., "data.items[*].id", "data.*.name", "[0]", 'data["a.b"]'
+    if selector.startswith("$"):
+        selector = selector[1:]
+    steps: List[_Step] = []
+    pos = 0
+    while pos < len(selector):
+        match = _STEP_RE.match(selector, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Invalid selector {selector!r} at position {pos}")
+        pos = match.end()
+        if match["index"] is not None:
+            steps.append(("item", int(match["index"])))
+        elif match["quoted"] is not None:
+            steps.append(("key", json.loads(match["quoted"])))
+        elif match["key"] is not None:
+            key = match["key"]
+            steps.append(("keys", None) if key == "*" else ("key", key))
+        else:
+            steps.append(("items", None))
+    return tuple(steps)
+
+
+class _Node:
+    __slots__ = ("kind", "children", "index")
+
+    def __init__(self) -> None:
+        # "leaf" for the whole value, "object" or "array" (None until known)
+        self.kind: Optional[str] = None
+        self.children: Dict[Any, _Node] = {}
+        self.index: Optional[int] = None
+
+
+def _add(node: _Node, steps: Tuple[_Step, ...], selector: str) -> None:
+    if not steps:
+        # The whole value is selected, which covers any other selectors
+        node.kind = "leaf"
+        node.children.clear()
+        return
+    if node.kind == "leaf":
+        return
+
+    (op, arg), rest = steps[0], steps[1:]
+    if op in ("key", "keys"):
+        # Either explicit keys or any key of an object
+        kind, child_key = "object", (None if op == "keys" else arg)
+        conflicts = node.children and (None in node.children) != (child_key is None)
+    else:
+        # Either all items or a single item of an array
+        kind, child_key = "array", None
+        index = arg if op == "item" else None
+        conflicts = node.children and node.index != index
+        node.index = index
+    if conflicts or node.kind not in (None, kind):
+        # The items of an array are projected by a single schema, so these can
+        # not be selected by several indices, nor by an index and the wildcard
+        reason = " (only one index of an array can be selected)" * (
+            node.kind == kind == "array"
+        )
+        raise ValueError(f"Selector {selector!r} conflicts with the others{reason}")
+
+    node.kind = kind
+    child = node.children.get(child_key)
+    if child is None:
+        child = node.children[child_key] = _Node()
+    _add(child, rest, selector)
+
+
+def _to_schema(node: _Node) -> Schema:
+    if node.kind == "leaf":
+        return {}
+    if node.kind == "object":
+        if None in node.children:
+            return {
+                "type": "object",
+                "additionalProperties": _to_schema(node.children[None]),
+            }
+        return {
+            "type": "object",
+            "properties": {k: _to_schema(v) for k, v in node.children.items()},
+        }
+    schema = {"type": "array", "items": _to_schema(node.children[None])}
+    if node.index is not None:
+        stop = node.index + 1 or None
+        schema[SLICE_KEY] = [node.index, stop]
+    return schema
+
+
+def _get_flat_prefix(steps: Sequence[Tuple[_Step, ...]]) -> int:
+    # Flat rows are made of the items at the common prefix (up to the last
+    # wildcard), whereas the rest of the selectors must be plain keys
+    prefixes = []
+    for s in steps:
+        ends = [i + 1 for i, (op, _) in enumerate(s) if op in ("keys", "items")]
+        prefixes.append(ends[-1] if ends else 0)
+    prefix = max(prefixes)
+    if any(s[:prefix] != steps[0][:prefix] for s in steps) or any(
+        op in ("keys", "items") for s in steps for op, _ in s[prefix:]
+    ):
+        raise ValueError("Selectors must share the wildcards to be flattened")
+    return prefix
+
+
+class _Projection:
+    __slots__ = ("schema", "steps", "prefix")
+
+    def __init__(self, selectors: Tuple[str, ...], flat: bool) -> None:
+        if not selectors:
+            raise ValueError("At least one selector is expected")
+        self.steps = tuple(_parse_selector(s) for s in selectors)
+        root = _Node()
+        for selector, steps in zip(selectors, self.steps):
+            _add(root, steps, selector)
+        self.schema = _to_schema(root)
+        self.prefix = _get_flat_prefix(self.steps) if flat else 0
+
+
+@lru_cache(maxsize=256)
+def _compile(selectors: Tuple[str, ...], flat: bool) -> _Projection:
+    return _Projection(selectors, flat)
+
+
+def _iter_prefix(value: Any, steps: Tuple[_Step, ...]) -> Iterator[Any]:
+    if not steps:
+        yield value
+        return
+    (op, arg), rest = steps[0], steps[1:]
+    children: Iterable[Any]
+    if op == "keys":
+        children = value.values() if isinstance(value, dict) else ()
+    elif op == "items":
+        children = value if isinstance(value, list) else ()
+    else:
+        children = (_get(value, op, arg),)
+    for child in children:
+        if child is not None:
+            yield from _iter_prefix(child, rest)
+
+
+def _get(value: Any, op: str, arg: Any) -> Any:
+    if op == "key":
+        return value.get(arg) if isinstance(value, dict) else None
+    # Arrays selected by index are sliced down to that item
+    return value[0] if isinstance(value, list) and value else None
+
+
+def _get_suffix(value: Any, steps: Tuple[_Step, ...]) -> Any:
+    for op, arg in steps:
+        value = _get(value, op, arg)
+        if value is None:
+            return None
+    return value
+
+
+def _flatten(res: Any, projection: _Projection) -> List[Tuple[Any, ...]]:
+    prefix = projection.prefix
+    suffixes = [steps[prefix:] for steps in projection.steps]
+    return [
+        tuple(_get_suffix(item, suffix) for suffix in suffixes)
+        for item in _iter_prefix(res, projection.steps[0][:prefix])
+    ]
+
+
+def project(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    paths: Sequence[str],
+    flat: bool = False,
+    parser: Optional[Parser] = None,
+) -> Any:
+    # Extracts only the selected values, e.g., paths=["data.items[*].id"], as
+    # the nested structure or as a list of tuples (flat=True) of the values
+    # for each item at the shared wildcards (missing values are None)
+    projection = _compile(tuple(paths), flat)
+    res = loads(data, schema=projection.schema, parser=parser)
+    if not flat:
+        return res
+    return _flatten(res, projection)
+
+
+def project_bytes(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    paths: Sequence[str],
+    parser: Optional[Parser] = None,
+) -> bytes:
+    # Same as project, but the nested structure is written out as minified JSON
+    projection = _compile(tuple(paths), False)
+    return loads_json(data, schema=projection.schema, parser=parser)
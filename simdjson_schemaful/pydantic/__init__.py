@@ -1,18 +1,40 @@
 from importlib.util import find_spec
+from typing import Tuple
 
 from pydantic import BaseModel
 
 if find_spec("pydantic.v1"):
-    from .v2 import TypeAdapter
+    from .v2 import (
+        IncrementalSession,
+        TypeAdapter,
+        set_plan_cache,
+        validate_simdjson_multi,
+        warmup,
+    )
 
-    __all__ = (
+    __all__: Tuple[str, ...] = (
         "BaseModel",
+        "IncrementalSession",
         "TypeAdapter",
+        "set_plan_cache",
+        "validate_simdjson_multi",
+        "warmup",
     )
 else:
-    from .v1 import parse_raw_simdjson_as
+    # Same names as in v2, with the signatures of v1
+    from .v1 import (  # type: ignore[assignment, unused-ignore]
+        IncrementalSession,
+        iter_parse_raw_simdjson_as,
+        parse_raw_simdjson_as,
+        parse_raw_simdjson_multi,
+        warmup,
+    )
 
     __all__ = (
         "BaseModel",
+        "IncrementalSession",
+        "iter_parse_raw_simdjson_as",
         "parse_raw_simdjson_as",
+        "parse_raw_simdjson_multi",
+        "warmup",
     )
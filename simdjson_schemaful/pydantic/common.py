@@ -0,0 +1,22 @@
+import collections.abc
+from typing import Any, get_args, get_origin
+
+# Helpers shared by both pydantic versions
+_SEQUENCE_ORIGINS = (
+    list,
+    tuple,
+    collections.abc.Iterable,
+    collections.abc.Sequence,
+    collections.abc.MutableSequence,
+)
+
+
+def _get_item_type(type_: Any) -> Any:
+    if type_ in (list, tuple):
+        return Any
+    args = get_args(type_)
+    if get_origin(type_) not in _SEQUENCE_ORIGINS or len(args) > 2:
+        raise TypeError(f"Expected a homogeneous sequence type, got {type_}")
+    if len(args) == 2 and args[1] is not Ellipsis:
+        raise TypeError(f"Expected a homogeneous sequence type, got {type_}")
+    return args[0] if args else Any
@@ -1,14 +1,43 @@
-from typing import TYPE_CHECKING, Any, Dict, Optional, Type, TypeVar, Union
+import copy
+import weakref
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+    get_origin,
+)
 
 import pydantic
-from pydantic import schema_of
 from pydantic.error_wrappers import ErrorWrapper, ValidationError
 from pydantic.main import ROOT_KEY
-from pydantic.tools import NameFactory, parse_obj_as
+from pydantic.schema import get_flat_models_from_model, get_model_name_map
+from pydantic.tools import NameFactory, _get_parsing_type, parse_obj_as
 from simdjson import Parser
 
-from simdjson_schemaful import loads
-from simdjson_schemaful.parser import Schema
+from simdjson_schemaful import iter_loads, loads
+from simdjson_schemaful.cache import ResultCache
+from simdjson_schemaful.filters import FilterSpec
+from simdjson_schemaful.incremental import IncrementalSession as _Session
+from simdjson_schemaful.incremental import SessionInfo
+from simdjson_schemaful.multi import _MultiLoader
+from simdjson_schemaful.parser import (
+    EMBEDDED_MEDIA_TYPE,
+    Schema,
+    SchemaValidationError,
+    _get_plan,
+)
+from simdjson_schemaful.pydantic.common import _get_item_type
+from simdjson_schemaful.slices import SliceLike
 
 if TYPE_CHECKING:
     Model = TypeVar("Model", bound="BaseModel")
@@ -17,12 +46,58 @@ if TYPE_CHECKING:
 class ModelMetaclass(pydantic.main.ModelMetaclass):
     def __new__(cls, *args: Any, **kwargs: Any) -> type:
         ret = super().__new__(cls, *args, **kwargs)
-        _REGISTRY[ret] = ret.schema()
+        # Schemas are generated on the first use (or by warmup)
+        _MODELS.add(ret)
         return ret
 
 
 T = TypeVar("T")
-_REGISTRY: Dict[ModelMetaclass, Schema] = {}
+_MODELS: "weakref.WeakSet[Any]" = weakref.WeakSet()
+# Models and the parsing models of other types
+_REGISTRY: Dict[Any, Schema] = {}
+
+
+def _mark_embedded(model: Any, schema: Schema) -> Schema:
+    # Json[...] fields are rendered as their inner schemas, so are marked as
+    # strings holding JSON documents (as in pydantic v2)
+    models = get_flat_models_from_model(model)
+    fields = [(m, f) for m in models for f in m.__fields__.values() if f.parse_json]
+    if not fields:
+        return schema
+    schema = copy.deepcopy(schema)  # Cached by pydantic
+    names = get_model_name_map(models)
+    definitions = schema.get("definitions", {})
+    for m, field in fields:
+        target = schema if m is model else definitions.get(names[m], {})
+        properties = target.get("properties", {})
+        prop = properties.get(field.alias)
+        # Untyped ones have no schema to select with
+        if prop is None or prop.get("format") == "json-string":
+            continue
+        properties[field.alias] = {
+            "type": "string",
+            "contentMediaType": EMBEDDED_MEDIA_TYPE,
+            "contentSchema": prop,
+        }
+    return schema
+
+
+def _get_schema(cls: Any) -> Schema:
+    schema = _REGISTRY.get(cls)
+    if schema is None:
+        schema = _REGISTRY[cls] = _mark_embedded(cls, cls.schema())
+    return schema
+
+
+def _schema_of(type_: Any) -> Schema:
+    # Parsing models are cached by pydantic
+    return _get_schema(_get_parsing_type(type_))
+
+
+def _get_error_loc(exc: Exception) -> Any:
+    if isinstance(exc, SchemaValidationError) and exc.loc:
+        return exc.loc
+    return ROOT_KEY
 
 
 class BaseModel(pydantic.BaseModel, metaclass=ModelMetaclass):
@@ -31,11 +106,40 @@ class BaseModel(pydantic.BaseModel, metaclass=ModelMetaclass):
         cls: Type["Model"],
         b: Union[str, bytes],
         parser: Optional[Parser] = None,
+        cache: Optional[ResultCache] = None,
+        fail_fast: bool = False,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+    ) -> "Model":
+        load = partial(cls._parse_raw_simdjson, b, parser, fail_fast, slices, filters)
+        if cache is not None:
+            if isinstance(b, str):
+                b = b.encode()
+            return cache.get_or_load(b, cls, load, fail_fast, slices, filters)
+        return load()
+
+    @classmethod
+    def _parse_raw_simdjson(
+        cls: Type["Model"],
+        b: Union[str, bytes],
+        parser: Optional[Parser],
+        fail_fast: bool,
+        slices: Optional[Dict[str, SliceLike]],
+        filters: Optional[Dict[str, FilterSpec]],
     ) -> "Model":
         try:
-            obj = loads(b, schema=_REGISTRY[cls], parser=parser)
+            obj = loads(
+                b,
+                schema=_get_schema(cls),
+                parser=parser,
+                fail_fast=fail_fast,
+                # Scalars are coerced by pydantic (e.g., "1" to 1), so are left to it
+                strict=False,
+                slices=slices,
+                filters=filters,
+            )
         except (ValueError, TypeError, UnicodeDecodeError) as e:
-            raise ValidationError([ErrorWrapper(e, loc=ROOT_KEY)], cls)
+            raise ValidationError([ErrorWrapper(e, loc=_get_error_loc(e))], cls)
         return cls.parse_obj(obj)
 
 
@@ -45,8 +149,240 @@ def parse_raw_simdjson_as(
     *,
     parser: Optional[Parser] = None,
     type_name: Optional[NameFactory] = None,
+    cache: Optional[ResultCache] = None,
+    fail_fast: bool = False,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
     **_: Any,
 ) -> T:
-    schema = schema_of(type_)  # already cached in pydantic
-    obj = loads(b, schema=schema, parser=parser)
+    load = partial(
+        _parse_raw_simdjson_as,
+        type_,
+        b,
+        parser,
+        type_name,
+        fail_fast,
+        slices,
+        filters,
+    )
+    if cache is not None:
+        if isinstance(b, str):
+            b = b.encode()
+        return cache.get_or_load(b, type_, load, fail_fast, slices, filters)
+    return load()
+
+
+def _parse_raw_simdjson_as(
+    type_: Type[T],
+    b: Union[str, bytes],
+    parser: Optional[Parser],
+    type_name: Optional[NameFactory],
+    fail_fast: bool,
+    slices: Optional[Dict[str, SliceLike]],
+    filters: Optional[Dict[str, FilterSpec]],
+) -> T:
+    schema = _schema_of(type_)
+    try:
+        obj = loads(
+            b,
+            schema=schema,
+            parser=parser,
+            fail_fast=fail_fast,
+            strict=False,
+            slices=slices,
+            filters=filters,
+        )
+    except SchemaValidationError as e:
+        model_type = _get_parsing_type(type_, type_name=type_name)
+        raise ValidationError([ErrorWrapper(e, loc=(ROOT_KEY, *e.loc))], model_type)
     return parse_obj_as(type_, obj, type_name=type_name)
+
+
+def parse_raw_simdjson_multi(
+    b: Union[str, bytes],
+    types: Dict[str, Any],
+    *,
+    parser: Optional[Parser] = None,
+    fail_fast: bool = False,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+) -> Dict[str, Any]:
+    # Parses as several models and/or types from a single parse of the data
+    schemas = {
+        name: _get_schema(type_)
+        if isinstance(type_, ModelMetaclass)
+        else _schema_of(type_)
+        for name, type_ in types.items()
+    }
+    loader = _MultiLoader(
+        b,
+        schemas=schemas,
+        parser=parser,
+        fail_fast=fail_fast,
+        strict=False,
+        slices=slices,
+        filters=filters,
+    )
+    res = {}
+    for name, type_ in types.items():
+        if isinstance(type_, ModelMetaclass):
+            try:
+                obj = loader.load(name)
+            except (ValueError, TypeError, UnicodeDecodeError) as e:
+                raise ValidationError([ErrorWrapper(e, loc=_get_error_loc(e))], type_)
+            res[name] = type_.parse_obj(obj)
+            continue
+        try:
+            obj = loader.load(name)
+        except SchemaValidationError as e:
+            model_type = _get_parsing_type(type_)
+            raise ValidationError([ErrorWrapper(e, loc=(ROOT_KEY, *e.loc))], model_type)
+        res[name] = parse_obj_as(type_, obj)
+    return res
+
+
+def _prefix_loc(errors: Sequence[Any], index: int) -> List[Any]:
+    res: List[Any] = []
+    for error in errors:
+        if isinstance(error, ErrorWrapper):
+            loc = error.loc_tuple()
+            res.append(ErrorWrapper(error.exc, loc=(loc[0], index, *loc[1:])))
+        else:
+            res.append(_prefix_loc(error, index))
+    return res
+
+
+def iter_parse_raw_simdjson_as(
+    type_: Type[T],
+    b: Union[str, bytes],
+    *,
+    batch_size: Optional[int] = None,
+    parser: Optional[Parser] = None,
+    type_name: Optional[NameFactory] = None,
+    fail_fast: bool = False,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+    **_: Any,
+) -> Iterator[Any]:
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    model_type = _get_parsing_type(_get_item_type(type_), type_name=type_name)
+    schema = _schema_of(type_)
+    items = iter_loads(
+        b,
+        schema=schema,
+        parser=parser,
+        fail_fast=fail_fast,
+        strict=False,
+        slices=slices,
+        filters=filters,
+    )
+    return _iter_parse(items, model_type=model_type, batch_size=batch_size)
+
+
+def _iter_parse(
+    items: Iterator[Any],
+    *,
+    model_type: Type[pydantic.BaseModel],
+    batch_size: Optional[int],
+) -> Iterator[Any]:
+    batch: List[Any] = []
+    index = 0
+    while True:
+        try:
+            obj = next(items)
+        except StopIteration:
+            break
+        except SchemaValidationError as e:
+            raise ValidationError([ErrorWrapper(e, loc=(ROOT_KEY, *e.loc))], model_type)
+        try:
+            item = model_type(__root__=obj).__root__  # type: ignore
+        except ValidationError as e:
+            raise ValidationError(_prefix_loc(e.raw_errors, index), e.model)
+        index += 1
+        if batch_size is None:
+            yield item
+            continue
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def warmup(types: Optional[Iterable[Any]] = None) -> List[Any]:
+    # Generates the schemas and compiles their extraction plans in advance (of
+    # all the models defined so far by default), e.g., in the master process, so
+    # that the forked workers inherit them instead of doing so on the first
+    # request. Types the schemas of which can not be generated (e.g., arbitrary
+    # ones) are skipped and returned
+    if types is None:
+        types = list(_MODELS)
+    skipped = []
+    for type_ in types:
+        try:
+            if isinstance(type_, ModelMetaclass):
+                schema = _get_schema(type_)
+            else:
+                schema = _schema_of(type_)
+        except (TypeError, ValueError, RuntimeError):
+            skipped.append(type_)
+            continue
+        _get_plan(schema).get(schema)
+    return skipped
+
+
+class IncrementalSession(Generic[T]):
+    # Parses polled arrays re-validating only the new or changed items, the
+    # unchanged ones are the same objects as before and must not be mutated
+    __slots__ = ("_type", "_model_type", "_session")
+
+    def __init__(
+        self,
+        type_: Type[T],
+        *,
+        type_name: Optional[NameFactory] = None,
+        maxsize: Optional[int] = 100_000,
+        maxbytes: Optional[int] = None,
+        parser: Optional[Parser] = None,
+        fail_fast: bool = False,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+    ) -> None:
+        self._type = type_
+        self._model_type = _get_parsing_type(_get_item_type(type_), type_name=type_name)
+        self._session = _Session(
+            schema=_schema_of(type_),
+            transform=self._parse_item,
+            maxsize=maxsize,
+            maxbytes=maxbytes,
+            parser=parser,
+            fail_fast=fail_fast,
+            strict=False,
+            slices=slices,
+            filters=filters,
+        )
+
+    def _parse_item(self, obj: Any, index: int) -> Any:
+        try:
+            return self._model_type(__root__=obj).__root__
+        except ValidationError as e:
+            raise ValidationError(_prefix_loc(e.raw_errors, index), e.model)
+
+    def parse_raw_simdjson(self, b: Union[str, bytes]) -> T:
+        try:
+            items = self._session.loads(b)
+        except SchemaValidationError as e:
+            raise ValidationError(
+                [ErrorWrapper(e, loc=(ROOT_KEY, *e.loc))], self._model_type
+            )
+        if self._type is tuple or get_origin(self._type) is tuple:
+            return tuple(items)  # type: ignore
+        return items  # type: ignore
+
+    def cache_info(self) -> SessionInfo:
+        return self._session.cache_info()
+
+    def cache_clear(self) -> None:
+        self._session.cache_clear()
@@ -1,13 +1,44 @@
 import json
-from typing import TYPE_CHECKING, Any, Dict, Generic, Optional, Type, TypeVar, Union
+import re
+import weakref
+from functools import partial
+from types import CodeType, FunctionType, MethodType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_origin,
+)
 
 import pydantic
 from pydantic import ValidationError
+from pydantic.json_schema import DEFAULT_REF_TEMPLATE, GenerateJsonSchema
 from pydantic_core import InitErrorDetails, PydanticCustomError
 from simdjson import Parser
 
-from simdjson_schemaful import loads
-from simdjson_schemaful.parser import Schema
+from simdjson_schemaful import iter_loads, loads, loads_json
+from simdjson_schemaful.cache import ResultCache
+from simdjson_schemaful.filters import FilterSpec
+from simdjson_schemaful.incremental import IncrementalSession as _Session
+from simdjson_schemaful.incremental import SessionInfo
+from simdjson_schemaful.multi import _MultiLoader
+from simdjson_schemaful.parser import Schema, SchemaValidationError, _get_plan
+from simdjson_schemaful.plans import PlanCache
+from simdjson_schemaful.pydantic.common import _get_item_type
+from simdjson_schemaful.slices import SliceLike
 
 if TYPE_CHECKING:
     Model = TypeVar("Model", bound="BaseModel")
@@ -16,58 +47,313 @@ if TYPE_CHECKING:
 class ModelMetaclass(pydantic._internal._model_construction.ModelMetaclass):
     def __new__(cls, *args: Any, **kwargs: Any) -> type:
         ret = super().__new__(cls, *args, **kwargs)
-        _REGISTRY[ret] = ret.model_json_schema()  # type: ignore
+        # Schemas are generated on the first use (or by warmup)
+        _MODELS.add(ret)
         return ret
 
 
 T = TypeVar("T")
+_MODELS: "weakref.WeakSet[Any]" = weakref.WeakSet()
 _REGISTRY: Dict[ModelMetaclass, Schema] = {}
+_DEDUPE_REGISTRY: Dict[ModelMetaclass, Tuple[Schema, Dict[str, Any]]] = {}
+_PLAN_CACHE: Optional[PlanCache] = None
+# Marks the schemas of the models, so that the deduplicated ones are validated once
+_MODEL_KEY = "x-simdjson-model"
+# Addresses of the objects (e.g., in the references) differ between processes
+_ADDRESS_RE = re.compile(r"(?<=[\w.]):\d+(?=')| at 0x[0-9a-fA-F]+")
+# Selected values are passed to pydantic as python objects or as JSON bytes
+STRATEGIES = ("python", "json")
+
+
+def _get_strategy(strategy: Optional[str], type_: Any) -> str:
+    if strategy is None:
+        strategy = getattr(type_, "__simdjson_strategy__", STRATEGIES[0])
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Invalid strategy {strategy}, expected one of {STRATEGIES}")
+    return strategy
+
+
+def set_plan_cache(cache: Optional[PlanCache]) -> None:
+    # Schemas generated from then on are looked up in (and stored to) the cache
+    global _PLAN_CACHE
+    _PLAN_CACHE = cache
+
+
+def _describe_const(const: Any) -> str:
+    if isinstance(const, CodeType):
+        return _describe_code(const)
+    if isinstance(const, frozenset):
+        # Ordered by the hashes of the strings, which differ between processes
+        return repr(sorted(map(_describe_const, const)))
+    return repr(const)
+
+
+def _describe_code(code: CodeType) -> str:
+    # Bytecode along with the constants (e.g., the keys set) and the names used
+    consts = tuple(map(_describe_const, code.co_consts))
+    return f"{code.co_code.hex()}{consts}{code.co_names}"
+
+
+def _describe_callables(obj: Any, parts: List[str], seen: Set[int]) -> None:
+    # Callables shaping the JSON schemas (e.g., json_schema_extra functions and
+    # __get_pydantic_json_schema__ overrides) are only named by repr
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    children: Iterable[Any] = ()
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        children = obj
+    elif isinstance(obj, partial):
+        children = (obj.func, obj.args, obj.keywords)
+    elif isinstance(obj, type):
+        # Model configs are not a part of the core schemas
+        config = getattr(obj, "model_config", None)
+        config = config or getattr(obj, "__pydantic_config__", None) or {}
+        parts.append(_ADDRESS_RE.sub("", repr(config)))
+        children = (config,)
+    elif isinstance(obj, MethodType):
+        children = (obj.__func__,)
+    elif isinstance(obj, FunctionType):
+        parts.append(_describe_code(obj.__code__))
+        parts.append(_ADDRESS_RE.sub("", repr(obj.__defaults__)))
+        children = [cell.cell_contents for cell in obj.__closure__ or ()]
+        parts.extend(
+            _ADDRESS_RE.sub("", repr(child))
+            for child in children
+            if not callable(child)
+        )
+    for child in children:
+        _describe_callables(child, parts, seen)
+
+
+def _fingerprint(core_schema: Any) -> str:
+    parts = [f"pydantic {pydantic.VERSION}", _ADDRESS_RE.sub("", repr(core_schema))]
+    _describe_callables(core_schema, parts, set())
+    return "\0".join(parts)
+
+
+def _generate_schema(core_schema: Any, generate: Callable[[], Schema]) -> Schema:
+    if _PLAN_CACHE is None:
+        return generate()
+    return _PLAN_CACHE.get_or_create(_fingerprint(core_schema), generate)
+
+
+def _get_schema(cls: Any) -> Schema:
+    schema = _REGISTRY.get(cls)
+    if schema is None:
+        schema = _REGISTRY[cls] = _generate_schema(
+            cls.__pydantic_core_schema__,
+            cls.model_json_schema,
+        )
+    return schema
+
+
+class _DedupeSchemaGenerator(GenerateJsonSchema):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.models: Dict[str, Any] = {}
+
+    def model_schema(self, schema: Any) -> Dict[str, Any]:
+        json_schema = super().model_schema(schema)
+        if json_schema.get("type") == "object":
+            cls = schema["cls"]
+            key = f"{cls.__module__}.{cls.__qualname__}:{id(cls)}"
+            json_schema[_MODEL_KEY] = key
+            self.models[key] = cls
+        return json_schema
+
+
+def _generate_dedupe_schema(core_schema: Any) -> Tuple[Schema, Dict[str, Any]]:
+    generator = _DedupeSchemaGenerator(by_alias=True, ref_template=DEFAULT_REF_TEMPLATE)
+    schema = generator.generate(core_schema, mode="validation")
+    return schema, generator.models
+
+
+def _get_dedupe_schema(cls: Any) -> Tuple[Schema, Dict[str, Any]]:
+    res = _DEDUPE_REGISTRY.get(cls)
+    if res is None:
+        res = _DEDUPE_REGISTRY[cls] = _generate_dedupe_schema(
+            cls.__pydantic_core_schema__
+        )
+    return res
+
+
+def _canonicalize(
+    models: Dict[str, Any],
+    strict: Optional[bool],
+    context: Optional[Dict[str, Any]],
+    schema: Schema,
+    value: Any,
+) -> Any:
+    # Instances of the exact field types are taken by pydantic as is
+    cls = models.get(schema.get(_MODEL_KEY))  # type: ignore[arg-type]
+    if cls is None:
+        return value
+    try:
+        return cls.model_validate(value, strict=strict, context=context)
+    except ValidationError:
+        # Reported at its location by the validation of the whole
+        return value
+
+
+def _check_dedupe(dedupe: Union[bool, Sequence[str]], strategy: str) -> None:
+    if dedupe and strategy == "json":
+        raise ValueError("dedupe is not supported by the json strategy")
 
 
 class BaseModel(pydantic.BaseModel, metaclass=ModelMetaclass):
+    __simdjson_strategy__: ClassVar[str] = "python"
+
     @classmethod
     def model_validate_simdjson(
         cls: Type["Model"],
         json_data: Union[str, bytes, bytearray],
         parser: Optional[Parser] = None,
+        cache: Optional[ResultCache] = None,
+        fail_fast: bool = False,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+        strategy: Optional[str] = None,
+        dedupe: Union[bool, Sequence[str]] = False,
+    ) -> "Model":
+        strategy = _get_strategy(strategy, cls)
+        _check_dedupe(dedupe, strategy)
+        load = partial(
+            cls._model_validate_simdjson,
+            json_data,
+            parser,
+            fail_fast,
+            slices,
+            filters,
+            strategy,
+            dedupe,
+        )
+        if cache is not None:
+            if isinstance(json_data, str):
+                json_data = json_data.encode()
+            return cache.get_or_load(
+                json_data, cls, load, fail_fast, slices, filters, strategy, dedupe
+            )
+        return load()
+
+    @classmethod
+    def _model_validate_simdjson(
+        cls: Type["Model"],
+        json_data: Union[str, bytes, bytearray],
+        parser: Optional[Parser],
+        fail_fast: bool,
+        slices: Optional[Dict[str, SliceLike]],
+        filters: Optional[Dict[str, FilterSpec]],
+        strategy: str,
+        dedupe: Union[bool, Sequence[str]],
     ) -> "Model":
+        schema = _get_schema(cls)
+        canonicalize = None
+        if dedupe:
+            schema, models = _get_dedupe_schema(cls)
+            canonicalize = partial(_canonicalize, models, None, None)
         try:
-            obj = loads(json_data, schema=_REGISTRY[cls], parser=parser)
+            obj: Any = (loads_json if strategy == "json" else loads)(
+                json_data,
+                schema=schema,
+                parser=parser,
+                fail_fast=fail_fast,
+                # Fail-fast type checks are only as strict as the validation
+                strict=bool(cls.model_config.get("strict")),
+                slices=slices,
+                filters=filters,
+                dedupe=dedupe,
+                canonicalize=canonicalize,
+            )
         except (ValueError, TypeError, UnicodeDecodeError) as e:
-            raise ValidationError(e)
+            raise _build_error(cls.__name__, e, json_data)
+        if strategy == "json":
+            return cls.model_validate_json(obj)
         return cls.model_validate(obj)
 
 
+def _build_error(
+    title: str,
+    exc: Exception,
+    data: Union[str, bytes, bytearray],
+) -> ValidationError:
+    if isinstance(exc, SchemaValidationError):
+        details: InitErrorDetails = {
+            "type": PydanticCustomError(exc.kind, exc.msg),
+            "loc": exc.loc,
+            "input": exc.input,
+        }
+        return ValidationError.from_exception_data(title, [details])
+
+    if isinstance(exc, UnicodeDecodeError):
+        type_str = "value_error.unicodedecode"
+    elif isinstance(exc, json.JSONDecodeError):
+        type_str = "value_error.jsondecode"
+    elif isinstance(exc, ValueError):
+        type_str = "value_error"
+    else:
+        type_str = "type_error"
+
+    details = {
+        "type": PydanticCustomError(type_str, str(exc)),
+        "loc": ("__root__",),
+        "input": data,
+    }
+    return ValidationError.from_exception_data(title, [details])
+
+
+def _prefix_loc(exc: ValidationError, index: int) -> ValidationError:
+    details = []
+    for error in exc.errors(include_url=False):
+        detail: InitErrorDetails = {
+            "type": error["type"],
+            "loc": (index, *error["loc"]),
+            "input": error["input"],
+        }
+        if "ctx" in error:
+            detail["ctx"] = error["ctx"]
+        details.append(detail)
+    try:
+        return ValidationError.from_exception_data(exc.title, details)
+    except KeyError:
+        # Custom error types are unknown to pydantic-core, keep them as is
+        for detail, error in zip(details, exc.errors(include_url=False)):
+            detail["type"] = PydanticCustomError(error["type"], error["msg"])
+            detail.pop("ctx", None)
+        return ValidationError.from_exception_data(exc.title, details)
+
+
 class TypeAdapter(Generic[T]):
-    __slots__ = ("_ta", "_simdjson_schema")
+    __slots__ = ("_ta", "_simdjson_schema", "_dedupe_schema", "_type", "_item_ta")
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self._ta = pydantic.TypeAdapter[T](*args, **kwargs)
-        self._simdjson_schema = self._ta.json_schema()
+        self._simdjson_schema: Optional[Schema] = None
+        self._dedupe_schema: Optional[Tuple[Schema, Dict[str, Any]]] = None
+        self._type = args[0] if args else kwargs["type"]
+        self._item_ta: Optional[pydantic.TypeAdapter[Any]] = None
 
     @property
     def pydantic_type_adapter(self) -> pydantic.TypeAdapter[T]:
         return self._ta
 
-    def _build_error(self, exc: Exception, data: Union[str, bytes]) -> ValidationError:
-        if isinstance(exc, UnicodeDecodeError):
-            type_str = "value_error.unicodedecode"
-        elif isinstance(exc, json.JSONDecodeError):
-            type_str = "value_error.jsondecode"
-        elif isinstance(exc, ValueError):
-            type_str = "value_error"
-        else:
-            type_str = "type_error"
+    def _get_schema(self) -> Schema:
+        if self._simdjson_schema is None:
+            self._simdjson_schema = _generate_schema(
+                self._ta.core_schema,
+                self._ta.json_schema,
+            )
+        return self._simdjson_schema
 
-        details: InitErrorDetails = {
-            "type": PydanticCustomError(type_str, str(exc)),
-            "loc": ("__root__",),
-            "input": data,
-        }
-        return ValidationError.from_exception_data(
-            self._ta.core_schema["type"],
-            [details],
-        )
+    def _get_dedupe_schema(self) -> Tuple[Schema, Dict[str, Any]]:
+        if self._dedupe_schema is None:
+            self._dedupe_schema = _generate_dedupe_schema(self._ta.core_schema)
+        return self._dedupe_schema
+
+    def _build_error(self, exc: Exception, data: Union[str, bytes]) -> ValidationError:
+        return _build_error(self._ta.core_schema["type"], exc, data)
 
     def validate_simdjson(
         self,
@@ -76,9 +362,269 @@ class TypeAdapter(Generic[T]):
         strict: Optional[bool] = None,
         context: Optional[Dict[str, Any]] = None,
         parser: Optional[Parser] = None,
+        cache: Optional[ResultCache] = None,
+        fail_fast: bool = False,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+        strategy: Optional[str] = None,
+        dedupe: Union[bool, Sequence[str]] = False,
     ) -> T:
+        strategy = _get_strategy(strategy, self._type)
+        _check_dedupe(dedupe, strategy)
+        load = partial(
+            self._validate_simdjson,
+            data,
+            strict,
+            context,
+            parser,
+            fail_fast,
+            slices,
+            filters,
+            strategy,
+            dedupe,
+        )
+        # Context may alter validation arbitrarily, so its results are not cached
+        if cache is not None and context is None:
+            if isinstance(data, str):
+                data = data.encode()
+            return cache.get_or_load(
+                data, self, load, strict, fail_fast, slices, filters, strategy, dedupe
+            )
+        return load()
+
+    def _validate_simdjson(
+        self,
+        data: Union[str, bytes],
+        strict: Optional[bool],
+        context: Optional[Dict[str, Any]],
+        parser: Optional[Parser],
+        fail_fast: bool,
+        slices: Optional[Dict[str, SliceLike]],
+        filters: Optional[Dict[str, FilterSpec]],
+        strategy: str,
+        dedupe: Union[bool, Sequence[str]],
+    ) -> T:
+        schema = self._get_schema()
+        canonicalize = None
+        if dedupe:
+            schema, models = self._get_dedupe_schema()
+            canonicalize = partial(_canonicalize, models, strict, context)
         try:
-            obj = loads(data, schema=self._simdjson_schema, parser=parser)
+            obj: Any = (loads_json if strategy == "json" else loads)(
+                data,
+                schema=schema,
+                parser=parser,
+                fail_fast=fail_fast,
+                strict=bool(strict),
+                slices=slices,
+                filters=filters,
+                dedupe=dedupe,
+                canonicalize=canonicalize,
+            )
         except (ValueError, TypeError, UnicodeDecodeError) as e:
             raise self._build_error(e, data)
+        if strategy == "json":
+            return self._ta.validate_json(obj, strict=strict, context=context)
         return self._ta.validate_python(obj, strict=strict, context=context)
+
+    def _get_item_adapter(self) -> pydantic.TypeAdapter[Any]:
+        if self._item_ta is None:
+            self._item_ta = pydantic.TypeAdapter(_get_item_type(self._type))
+        return self._item_ta
+
+    def iter_validate_simdjson(
+        self,
+        data: Union[str, bytes],
+        *,
+        batch_size: Optional[int] = None,
+        strict: Optional[bool] = None,
+        context: Optional[Dict[str, Any]] = None,
+        parser: Optional[Parser] = None,
+        fail_fast: bool = False,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+    ) -> Iterator[Any]:
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        item_ta = self._get_item_adapter()
+        try:
+            items = iter_loads(
+                data,
+                schema=self._get_schema(),
+                parser=parser,
+                fail_fast=fail_fast,
+                strict=bool(strict),
+                slices=slices,
+                filters=filters,
+            )
+        except (ValueError, TypeError, UnicodeDecodeError) as e:
+            raise self._build_error(e, data)
+        return self._iter_validate(
+            data,
+            items,
+            item_ta=item_ta,
+            batch_size=batch_size,
+            strict=strict,
+            context=context,
+        )
+
+    def _iter_validate(
+        self,
+        data: Union[str, bytes],
+        items: Iterator[Any],
+        *,
+        item_ta: pydantic.TypeAdapter[Any],
+        batch_size: Optional[int],
+        strict: Optional[bool],
+        context: Optional[Dict[str, Any]],
+    ) -> Iterator[Any]:
+        batch: List[Any] = []
+        index = 0
+        while True:
+            try:
+                obj = next(items)
+            except StopIteration:
+                break
+            except (ValueError, TypeError, UnicodeDecodeError) as e:
+                raise self._build_error(e, data)
+            try:
+                item = item_ta.validate_python(obj, strict=strict, context=context)
+            except ValidationError as e:
+                raise _prefix_loc(e, index)
+            index += 1
+            if batch_size is None:
+                yield item
+                continue
+            batch.append(item)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+class IncrementalSession(Generic[T]):
+    # Validates polled arrays re-validating only the new or changed items, the
+    # unchanged ones are the same objects as before and must not be mutated
+    __slots__ = ("_adapter", "_item_ta", "_strict", "_context", "_session")
+
+    def __init__(
+        self,
+        adapter: TypeAdapter[T],
+        *,
+        strict: Optional[bool] = None,
+        context: Optional[Dict[str, Any]] = None,
+        maxsize: Optional[int] = 100_000,
+        maxbytes: Optional[int] = None,
+        parser: Optional[Parser] = None,
+        fail_fast: bool = False,
+        slices: Optional[Dict[str, SliceLike]] = None,
+        filters: Optional[Dict[str, FilterSpec]] = None,
+    ) -> None:
+        self._adapter = adapter
+        self._item_ta = adapter._get_item_adapter()
+        self._strict = strict
+        self._context = context
+        self._session = _Session(
+            schema=adapter._get_schema(),
+            transform=self._validate_item,
+            maxsize=maxsize,
+            maxbytes=maxbytes,
+            parser=parser,
+            fail_fast=fail_fast,
+            strict=bool(strict),
+            slices=slices,
+            filters=filters,
+        )
+
+    def _validate_item(self, obj: Any, index: int) -> Any:
+        try:
+            return self._item_ta.validate_python(
+                obj,
+                strict=self._strict,
+                context=self._context,
+            )
+        except ValidationError as e:
+            raise _prefix_loc(e, index)
+
+    def validate_simdjson(self, data: Union[str, bytes]) -> T:
+        try:
+            items = self._session.loads(data)
+        except ValidationError:
+            raise
+        except (ValueError, TypeError, UnicodeDecodeError) as e:
+            raise self._adapter._build_error(e, data)
+        type_ = self._adapter._type
+        if type_ is tuple or get_origin(type_) is tuple:
+            return tuple(items)  # type: ignore[return-value]
+        return items  # type: ignore[return-value]
+
+    def cache_info(self) -> SessionInfo:
+        return self._session.cache_info()
+
+    def cache_clear(self) -> None:
+        self._session.cache_clear()
+
+
+def _get_validator(
+    validator: Union[Type[BaseModel], TypeAdapter[Any]],
+) -> Tuple[Schema, str, Callable[[Any], Any]]:
+    if isinstance(validator, TypeAdapter):
+        ta = validator.pydantic_type_adapter
+        return validator._get_schema(), ta.core_schema["type"], ta.validate_python
+    return _get_schema(validator), validator.__name__, validator.model_validate
+
+
+def validate_simdjson_multi(
+    data: Union[str, bytes],
+    validators: Dict[str, Union[Type[BaseModel], TypeAdapter[Any]]],
+    *,
+    parser: Optional[Parser] = None,
+    fail_fast: bool = False,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+) -> Dict[str, Any]:
+    # Validates with several models and/or type adapters from a single parse
+    prepared = [(name, *_get_validator(v)) for name, v in validators.items()]
+    # Parsing errors are reported for the first one
+    title = prepared[0][2] if prepared else "validate_simdjson_multi"
+    objs: Dict[str, Any] = {}
+    try:
+        loader = _MultiLoader(
+            data,
+            schemas={name: schema for name, schema, _, _ in prepared},
+            parser=parser,
+            fail_fast=fail_fast,
+            strict=False,
+            slices=slices,
+            filters=filters,
+        )
+        for name, _, title, _ in prepared:
+            objs[name] = loader.load(name)
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise _build_error(title, e, data)
+    return {name: validate(objs[name]) for name, _, _, validate in prepared}
+
+
+def warmup(
+    validators: Optional[Iterable[Union[Type[BaseModel], TypeAdapter[Any]]]] = None,
+) -> List[Any]:
+    # Generates the schemas and compiles their extraction plans in advance (of
+    # all the models defined so far by default), e.g., in the master process, so
+    # that the forked workers inherit them instead of doing so on the first
+    # request. Validators the schemas of which can not be generated (e.g., with
+    # arbitrary types) are skipped and returned
+    if validators is None:
+        validators = list(_MODELS)
+    skipped = []
+    for validator in validators:
+        try:
+            if isinstance(validator, TypeAdapter):
+                schema = validator._get_schema()
+            else:
+                schema = _get_schema(validator)
+        except pydantic.PydanticUserError:
+            skipped.append(validator)
+            continue
+        _get_plan(schema).get(schema)
+    return skipped
@@ -0,0 +1,122 @@
+import keyword
+from collections import namedtuple
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from .memo import IdentityMemo
+
+Schema = Dict[Any, Any]
+RowFactory = Callable[[List[Any]], Any]
+
+ROW_MODES = ("tuple", "namedtuple", "slots")
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+
+# Placeholder for the properties missing in the input
+MISSING: Any = _Missing()
+
+
+class Record:
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, *values: Any) -> None:
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, name) for name in self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{self.__class__.__name__}({values})"
+
+    def __reduce__(self) -> Any:
+        return self.__class__, tuple(self)
+
+
+def _get_field_names(properties: Schema) -> Tuple[str, ...]:
+    names: List[str] = []
+    for i, name in enumerate(properties):
+        if (
+            not name.isidentifier()
+            or keyword.iskeyword(name)
+            or name.startswith("_")
+            or name in names
+        ):
+            name = f"_{i}"
+        names.append(name)
+    return tuple(names)
+
+
+def _get_type_name(schema: Schema) -> str:
+    title = "".join(c for c in schema.get("title", "") if c.isalnum() or c == "_")
+    return title if title.isidentifier() else "Row"
+
+
+def _make_namedtuple(schema: Schema) -> RowFactory:
+    cls = namedtuple(  # type: ignore[misc]
+        _get_type_name(schema),
+        list(schema["properties"]),
+        rename=True,
+    )
+    return cls._make
+
+
+def _make_record(schema: Schema) -> RowFactory:
+    fields = _get_field_names(schema["properties"])
+    cls = type(
+        _get_type_name(schema),
+        (Record,),
+        {"__slots__": fields, "_fields": fields},
+    )
+    return lambda values: cls(*values)
+
+
+class RowLayout:
+    __slots__ = ("factory", "indices", "size")
+
+    def __init__(self, factory: RowFactory, properties: Schema) -> None:
+        self.factory = factory
+        self.indices = {name: i for i, name in enumerate(properties)}
+        self.size = len(properties)
+
+
+_LAYOUTS: IdentityMemo[RowLayout] = IdentityMemo()
+
+
+def get_row_layout(schema: Schema, mode: str) -> RowLayout:
+    return _LAYOUTS.get_or_create(
+        (schema,), partial(_make_row_layout, schema, mode), mode
+    )
+
+
+def _make_row_layout(schema: Schema, mode: str) -> RowLayout:
+    factory: RowFactory
+    if mode == "tuple":
+        factory = tuple
+    elif mode == "namedtuple":
+        factory = _make_namedtuple(schema)
+    elif mode == "slots":
+        factory = _make_record(schema)
+    else:
+        raise ValueError(f"Invalid rows mode {mode}, expected one of {ROW_MODES}")
+
+    return RowLayout(factory, schema["properties"])
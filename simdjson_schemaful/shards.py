@@ -0,0 +1,307 @@
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from simdjson import Array, Parser
+
+from .filters import FilterSpec
+from .parser import RAW_KEY, Schema, SchemaValidationError, _get_definition, loads
+from .paths import WILDCARD, compile_patterns
+from .slices import SLICE_KEY, SliceLike
+
+_Bounds = Tuple[int, int]
+# Change of the nesting depth over a range and whether it ends within a string
+_Delta = Tuple[int, bool]
+
+_OPEN_RE = re.compile(rb"\s*\[\s*")
+_WHITESPACE = b" \t\r\n"
+_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_STRING_END_RE = re.compile(rb'(?:[^"\\]|\\.)*"')
+# Quotes not followed by the rest of the string open the ones crossing the end
+_TOKEN_RE = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{},"]')
+_OPENING = frozenset(b"[{")
+_CLOSING = frozenset(b"]}")
+
+
+def _loads(
+    data: bytes,
+    schema: Schema,
+    parser: Optional[Parser],
+    options: Dict[str, Any],
+) -> List[Any]:
+    res = loads(data, schema=schema, parser=parser, **options)
+    assert isinstance(res, list)
+    return res
+
+
+def _scan(data: bytes, start: int, end: int) -> _Delta:
+    # Strings are removed (by the regex engine) before counting the brackets,
+    # a quote left opens the string crossing the end (along with the escaped
+    # quotes within it)
+    stripped = _STRING_RE.sub(b"", memoryview(data)[start:end])
+    quote = stripped.find(b'"')
+    if quote >= 0:
+        stripped = stripped[:quote]
+    depth = (
+        stripped.count(b"[")
+        + stripped.count(b"{")
+        - stripped.count(b"]")
+        - stripped.count(b"}")
+    )
+    return depth, quote >= 0
+
+
+class _Shards:
+    __slots__ = ("data", "schema", "options", "parser")
+
+    def __init__(
+        self,
+        data: bytes,
+        schema: Schema,
+        options: Dict[str, Any],
+        parser: Optional[Parser] = None,
+    ) -> None:
+        self.data = data
+        self.schema = schema
+        self.options = options
+        self.parser = parser or Parser()
+
+    def scan(self, bounds: _Bounds) -> Tuple[_Delta, _Delta]:
+        # For both of the states at the start (outside of and within a string),
+        # the actual one is known once the previous ranges are chained
+        data = self.data
+        start, end = bounds
+        match = _STRING_END_RE.match(data, start, end)
+        within = (0, True) if match is None else _scan(data, match.end(), end)
+        return _scan(data, start, end), within
+
+    def load(self, bounds: _Bounds) -> List[Any]:
+        start, end = bounds
+        return _loads(
+            b"[" + self.data[start:end] + b"]",
+            self.schema,
+            self.parser,
+            self.options,
+        )
+
+    def count(self, bounds: _Bounds) -> int:
+        # Counted on errors, while their tracebacks still reference the document
+        # of the shard parser, so that a parser of its own is used
+        start, end = bounds
+        parser = Parser()
+        array = parser.parse(b"[" + self.data[start:end] + b"]")
+        assert isinstance(array, Array)
+        return len(array)
+
+
+# Set in each of the worker processes (inherited without copying when forked)
+_SHARDS: Optional[_Shards] = None
+
+
+def _init_worker(data: bytes, schema: Schema, options: Dict[str, Any]) -> None:
+    global _SHARDS
+    _SHARDS = _Shards(data, schema, options)
+
+
+def _scan_shard(bounds: _Bounds) -> Tuple[_Delta, _Delta]:
+    assert _SHARDS is not None
+    return _SHARDS.scan(bounds)
+
+
+def _load_shard(bounds: _Bounds) -> List[Any]:
+    assert _SHARDS is not None
+    return _SHARDS.load(bounds)
+
+
+def _find_end(data: bytes, start: int) -> int:
+    # Position of the closing bracket of the top-level array (with the
+    # whitespace before it), -1 if none
+    end = len(data)
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    if end <= start or data[end - 1] != ord("]"):
+        return -1
+    end -= 1
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    return end
+
+
+def _find_comma(data: bytes, start: int, end: int, depth: int, quoted: bool) -> int:
+    # The first comma between the items of the top-level array (at the depth 1)
+    # after the position with the given state, -1 if none before the end
+    pos = start
+    if quoted:
+        match = _STRING_END_RE.match(data, pos, end)
+        if match is None:
+            return -1
+        pos = match.end()
+    for match in _TOKEN_RE.finditer(data, pos, end):
+        char = data[match.start()]
+        if char in _OPENING:
+            depth += 1
+        elif char in _CLOSING:
+            depth -= 1
+        elif char == 44:  # comma
+            if depth == 1:
+                return match.start()
+        elif match.end() - match.start() == 1:  # string crossing the end
+            return -1
+    return -1
+
+
+def _get_targets(data: bytes, start: int, end: int, count: int) -> List[int]:
+    targets = [start]
+    for i in range(1, count):
+        target = start + (end - start) * i // count
+        # Not within the escape sequences, i.e., after odd numbers of backslashes
+        backslashes = 0
+        while data[target - 1 - backslashes] == 92:  # backslash
+            backslashes += 1
+        target += backslashes % 2
+        if target > targets[-1]:
+            targets.append(target)
+    targets.append(end)
+    return targets
+
+
+def _split(
+    data: bytes,
+    targets: List[int],
+    deltas: Iterable[Tuple[_Delta, _Delta]],
+) -> List[_Bounds]:
+    # Shards end at the first top-level commas after the (evenly spaced)
+    # targets, which are found from the exact states at the targets, chained
+    # from the start of the array over the scanned ranges between them
+    bounds = []
+    pos = targets[0]
+    depth, quoted = 1, False
+    for i, (outside, within) in enumerate(deltas, 1):
+        delta, quoted = within if quoted else outside
+        depth += delta
+        target, end = targets[i], targets[i + 1]
+        if target < pos:
+            continue
+        comma = _find_comma(data, target, end, depth, quoted)
+        if comma >= 0:
+            bounds.append((pos, comma))
+            pos = comma + 1
+    bounds.append((pos, targets[-1]))
+    return bounds
+
+
+def _concat(
+    shards: _Shards,
+    bounds: List[_Bounds],
+    results: Iterable[List[Any]],
+) -> List[Any]:
+    res: List[Any] = []
+    loaded = iter(results)
+    for i in range(len(bounds)):
+        try:
+            res.extend(next(loaded))
+        except SchemaValidationError as e:
+            index = e.loc[0] if e.loc else None
+            if not isinstance(index, int):
+                raise
+            # Items are indexed within the shards, offset by the previous ones
+            index += sum(map(shards.count, bounds[:i]))
+            loc = (index, *e.loc[1:])
+            raise SchemaValidationError(e.msg, e.kind, loc, e.input) from None
+    return res
+
+
+def _is_shardable(
+    schema: Schema,
+    slices: Optional[Dict[str, SliceLike]],
+    filters: Optional[Dict[str, FilterSpec]],
+) -> bool:
+    # Slices of the top-level array and selections of specific items depend on
+    # the positions in the whole array, filters of the items do not
+    if SLICE_KEY in schema or schema.get(RAW_KEY):
+        return False
+    if any(pattern == () for pattern, _ in compile_patterns(slices)):
+        return False
+    return all(
+        not pattern or pattern[0] == WILDCARD
+        for pattern, _ in compile_patterns(slices) + compile_patterns(filters)
+    )
+
+
+def _load_shards(shards: _Shards, targets: List[int], workers: int) -> List[Any]:
+    # The last range is not needed to find the boundaries
+    ranges = list(zip(targets[:-2], targets[1:-1]))
+    if workers == 1:
+        bounds = _split(shards.data, targets, map(shards.scan, ranges))
+        return _concat(shards, bounds, map(shards.load, bounds))
+
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(shards.data, shards.schema, shards.options),
+    ) as executor:
+        bounds = _split(shards.data, targets, executor.map(_scan_shard, ranges))
+        return _concat(shards, bounds, executor.map(_load_shard, bounds))
+
+
+def loads_sharded(
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    schema: Schema,
+    workers: Optional[int] = None,
+    min_shard_size: int = 2**20,
+    max_shard_size: int = 2**26,
+    parser: Optional[Parser] = None,
+    fail_fast: bool = False,
+    slices: Optional[Dict[str, SliceLike]] = None,
+    filters: Optional[Dict[str, FilterSpec]] = None,
+) -> List[Any]:
+    # Same as loads for top-level arrays, but the array is split into shards of
+    # the raw data, which are parsed and extracted in the worker processes (or
+    # one by one in this one with a single worker, to limit the memory). Falls
+    # back to loads of the whole data whenever sharding is not applicable, the
+    # errors of the shards are raised (at the locations within the whole data).
+    if isinstance(data, str):
+        data = data.encode()
+    elif not isinstance(data, bytes):
+        data = bytes(data)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be positive")
+
+    definitions = schema.get("definitions", {}) or schema.get("$defs", {})
+    root = _get_definition(definitions, schema) if "$ref" in schema else schema
+    if root.get("type") != "array":
+        raise ValueError(f"Invalid schema type {root.get('type')}, expected array")
+
+    options: Dict[str, Any] = {
+        "fail_fast": fail_fast,
+        "slices": slices,
+        "filters": filters,
+    }
+    opened = _OPEN_RE.match(data)
+    start = -1 if opened is None else opened.end()
+    end = -1 if opened is None else _find_end(data, start)
+    count = min(
+        max(workers, math.ceil(len(data) / max_shard_size)),
+        len(data) // min_shard_size,
+    )
+    if (
+        count < 2
+        or end <= start
+        or (fail_fast and ("minItems" in root or "maxItems" in root))
+        or not _is_shardable(root, slices, filters)
+    ):
+        return _loads(data, schema, parser, options)
+
+    targets = _get_targets(data, start, end, count)
+    shards = _Shards(data, schema, options, parser)
+    return _load_shards(shards, targets, min(workers, len(targets) - 1))
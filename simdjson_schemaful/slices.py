@@ -0,0 +1,54 @@
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import simdjson
+
+SLICE_KEY = "x-simdjson-slice"
+
+# Random access to an array element walks over all the preceding elements,
+# which is several times cheaper per element than iterating in python
+_ITER_COST = 4
+
+SliceLike = Union[slice, Sequence[Optional[int]]]
+
+
+def to_slice(value: SliceLike) -> slice:
+    if isinstance(value, slice):
+        return _check_step(value)
+    if (
+        not isinstance(value, (list, tuple))
+        or len(value) not in (2, 3)
+        or not all(v is None or v.__class__ is int for v in value)
+    ):
+        raise ValueError(
+            f"Invalid slice {value!r}, expected [start, stop] or [start, stop, step]"
+        )
+    return _check_step(slice(*value))
+
+
+def _check_step(slc: slice) -> slice:
+    if slc.step == 0:
+        raise ValueError("Slice step can not be zero")
+    return slc
+
+
+def iter_slice(array: simdjson.Array, indices: range) -> Iterator[Tuple[int, Any]]:
+    if not indices:
+        return
+
+    first, last = min(indices[0], indices[-1]), max(indices[0], indices[-1])
+    if len(indices) * (first + last) // 2 <= _ITER_COST * last:
+        for i in indices:
+            yield i, array[i]
+        return
+
+    if indices.step < 0:
+        selected: List[Tuple[int, Any]] = list(iter_slice(array, indices[::-1]))
+        yield from reversed(selected)
+        return
+
+    start, step = indices.start, indices.step
+    for i, value in enumerate(array):
+        if i > last:
+            break
+        if i >= start and not (i - start) % step:
+            yield i, value
@@ -0,0 +1,381 @@
+import dataclasses
+import enum
+import sys
+from collections import abc
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+import simdjson
+from simdjson import Parser
+
+from .parser import SchemaValidationError, _materialize
+
+try:
+    import attr
+except ImportError:  # pragma: no cover
+    attr = None  # type: ignore[assignment]
+
+if sys.version_info >= (3, 10):
+    from types import NoneType, UnionType
+
+    _UNION_ORIGINS: Tuple[Any, ...] = (Union, UnionType)
+else:  # pragma: no cover
+    NoneType = type(None)
+    _UNION_ORIGINS = (Union,)
+
+T = TypeVar("T")
+_Loc = Tuple[Union[str, int], ...]
+Decoder = Callable[[Any, _Loc], Any]
+
+_SEQUENCE_ORIGINS = (
+    list,
+    abc.Sequence,
+    abc.MutableSequence,
+    abc.Iterable,
+    abc.Collection,
+)
+_SET_ORIGINS = (set, frozenset, abc.Set, abc.MutableSet)
+_MAPPING_ORIGINS = (dict, abc.Mapping, abc.MutableMapping)
+_MISSING = object()
+
+
+class _Field:
+    __slots__ = ("key", "arg", "decode", "required")
+
+    def __init__(self, key: str, arg: str, decode: Decoder, required: bool) -> None:
+        self.key = key  # in the input
+        self.arg = arg  # of the constructor
+        self.decode = decode
+        self.required = required
+
+
+def _error(msg: str, kind: str, loc: _Loc) -> SchemaValidationError:
+    return SchemaValidationError(msg, kind=kind, loc=loc)
+
+
+def _decode_any(value: Any, loc: _Loc) -> Any:
+    return _materialize(value)
+
+
+def _decode_int(value: Any, loc: _Loc) -> int:
+    if value.__class__ is int:
+        return value
+    if value.__class__ is float and value.is_integer():
+        return int(value)
+    raise _error("Input should be of type integer", "type", loc)
+
+
+def _decode_float(value: Any, loc: _Loc) -> float:
+    if value.__class__ in (int, float):
+        return float(value)
+    raise _error("Input should be of type number", "type", loc)
+
+
+def _decode_str(value: Any, loc: _Loc) -> str:
+    if value.__class__ is str:
+        return value
+    raise _error("Input should be of type string", "type", loc)
+
+
+def _decode_bool(value: Any, loc: _Loc) -> bool:
+    if value.__class__ is bool:
+        return value
+    raise _error("Input should be of type boolean", "type", loc)
+
+
+def _decode_none(value: Any, loc: _Loc) -> None:
+    if value is not None:
+        raise _error("Input should be null", "type", loc)
+
+
+_SCALARS: Dict[Any, Decoder] = {
+    Any: _decode_any,
+    object: _decode_any,
+    int: _decode_int,
+    float: _decode_float,
+    str: _decode_str,
+    bool: _decode_bool,
+    NoneType: _decode_none,
+    None: _decode_none,
+}
+
+
+def _check_array(value: Any, loc: _Loc) -> None:
+    if not isinstance(value, simdjson.Array):
+        raise _error("Input should be of type array", "type", loc)
+
+
+def _check_object(value: Any, loc: _Loc) -> None:
+    if not isinstance(value, simdjson.Object):
+        raise _error("Input should be of type object", "type", loc)
+
+
+def _make_union(decoders: List[Decoder]) -> Decoder:
+    def decode(value: Any, loc: _Loc) -> Any:
+        for decoder in decoders:
+            try:
+                return decoder(value, loc)
+            except SchemaValidationError:
+                continue
+        raise _error("Input does not match any of the types", "union", loc)
+
+    return decode
+
+
+def _make_optional(decoder: Decoder) -> Decoder:
+    def decode(value: Any, loc: _Loc) -> Any:
+        return None if value is None else decoder(value, loc)
+
+    return decode
+
+
+def _make_literal(choices: Tuple[Any, ...]) -> Decoder:
+    def decode(value: Any, loc: _Loc) -> Any:
+        # JSON booleans are not numbers, whereas True == 1 in python
+        for choice in choices:
+            if choice == value and (choice.__class__ is bool) == (
+                value.__class__ is bool
+            ):
+                return choice
+        raise _error(
+            f"Input should be one of {', '.join(map(repr, choices))}",
+            "enum",
+            loc,
+        )
+
+    return decode
+
+
+def _make_enum(cls: Type[enum.Enum]) -> Decoder:
+    decode_literal = _make_literal(tuple(member.value for member in cls))
+
+    def decode(value: Any, loc: _Loc) -> Any:
+        return cls(decode_literal(value, loc))
+
+    return decode
+
+
+def _make_list(decoder: Decoder, factory: Callable[[Any], Any] = list) -> Decoder:
+    def decode(value: Any, loc: _Loc) -> Any:
+        _check_array(value, loc)
+        if decoder is _decode_any:
+            return factory(value.as_list())
+        return factory([decoder(item, (*loc, i)) for i, item in enumerate(value)])
+
+    return decode
+
+
+def _make_tuple(decoders: List[Decoder]) -> Decoder:
+    def decode(value: Any, loc: _Loc) -> Any:
+        _check_array(value, loc)
+        if len(value) != len(decoders):
+            raise _error(
+                f"Array should have {len(decoders)} items",
+                "length",
+                loc,
+            )
+        return tuple(
+            decoder(item, (*loc, i))
+            for i, (decoder, item) in enumerate(zip(decoders, value))
+        )
+
+    return decode
+
+
+def _make_dict(decoder: Decoder) -> Decoder:
+    def decode(value: Any, loc: _Loc) -> Any:
+        _check_object(value, loc)
+        if decoder is _decode_any:
+            return value.as_dict()
+        return {key: decoder(value[key], (*loc, key)) for key in value.keys()}
+
+    return decode
+
+
+def _make_class(factory: Callable[..., Any], fields: List[_Field]) -> Decoder:
+    # Fields are filled in later to support recursive types
+    def decode(value: Any, loc: _Loc) -> Any:
+        _check_object(value, loc)
+        kwargs = {}
+        for field in fields:
+            item = value.get(field.key, _MISSING)
+            if item is _MISSING:
+                if field.required:
+                    raise _error("Field required", "missing", (*loc, field.key))
+                continue
+            kwargs[field.arg] = field.decode(item, (*loc, field.key))
+        return factory(**kwargs)
+
+    return decode
+
+
+def _dataclass_fields(cls: Any) -> List[Tuple[str, str, Any, bool]]:
+    hints = get_type_hints(cls)
+    return [
+        (
+            field.name,
+            field.name,
+            hints.get(field.name, Any),
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING,
+        )
+        for field in dataclasses.fields(cls)
+        if field.init
+    ]
+
+
+def _typeddict_fields(cls: Any) -> List[Tuple[str, str, Any, bool]]:
+    hints = get_type_hints(cls)
+    # Python 3.8 tells only the totality of the whole class
+    default = frozenset(hints) if cls.__total__ else frozenset()
+    required = getattr(cls, "__required_keys__", default)
+    return [(name, name, tp, name in required) for name, tp in hints.items()]
+
+
+def _namedtuple_fields(cls: Any) -> List[Tuple[str, str, Any, bool]]:
+    hints = get_type_hints(cls)
+    defaults = cls._field_defaults
+    return [
+        (name, name, hints.get(name, Any), name not in defaults) for name in cls._fields
+    ]
+
+
+def _attrs_fields(cls: Any) -> List[Tuple[str, str, Any, bool]]:
+    hints = get_type_hints(cls)
+    return [
+        (
+            field.name,
+            getattr(field, "alias", None) or field.name.lstrip("_"),
+            hints.get(field.name, field.type or Any),
+            field.default is attr.NOTHING,
+        )
+        for field in attr.fields(cls)
+        if field.init
+    ]
+
+
+def _is_typeddict(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(tp, "__total__")
+
+
+def _is_namedtuple(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, tuple) and hasattr(tp, "_fields")
+
+
+# Decoders by type, published once built completely. Classes are registered
+# in the map of the build before their fields are built, so that recursive
+# types are supported, but other threads never see their partial decoders
+_DECODERS: Dict[Any, Decoder] = {}
+_Building = Dict[Any, Decoder]
+
+
+def _build_class(tp: Any, building: _Building) -> Optional[Decoder]:
+    fields: List[_Field] = []
+    factory: Callable[..., Any] = tp
+    decoder: Decoder
+    if dataclasses.is_dataclass(tp):
+        specs = _dataclass_fields(tp)
+        decoder = _make_class(factory, fields)
+    elif _is_typeddict(tp):
+        specs = _typeddict_fields(tp)
+        decoder = _make_class(dict, fields)
+    elif _is_namedtuple(tp):
+        specs = _namedtuple_fields(tp)
+        decoder = _make_class(factory, fields)
+    elif attr is not None and attr.has(tp):
+        specs = _attrs_fields(tp)
+        decoder = _make_class(factory, fields)
+    else:
+        return None
+
+    building[tp] = decoder
+    for key, arg, hint, required in specs:
+        fields.append(_Field(key, arg, _get_decoder(hint, building), required))
+    return decoder
+
+
+def _build(tp: Any, building: _Building) -> Decoder:  # noqa: C901
+    if tp in _SCALARS:
+        return _SCALARS[tp]
+
+    if isinstance(tp, type) and issubclass(tp, enum.Enum):
+        return _make_enum(tp)
+
+    if isinstance(tp, type) and (decoder := _build_class(tp, building)) is not None:
+        return decoder
+
+    origin, args = get_origin(tp), get_args(tp)
+    if origin in _UNION_ORIGINS:
+        decoders = [_get_decoder(arg, building) for arg in args if arg is not NoneType]
+        decoder = decoders[0] if len(decoders) == 1 else _make_union(decoders)
+        return _make_optional(decoder) if NoneType in args else decoder
+
+    if origin is Literal:
+        return _make_literal(args)
+
+    if tp in (list, tuple, set, frozenset, dict):
+        origin, args = tp, ()
+
+    if origin in _SEQUENCE_ORIGINS:
+        return _make_list(_get_decoder(args[0] if args else Any, building))
+    if origin in _SET_ORIGINS:
+        factory = frozenset if origin is frozenset else set
+        return _make_list(_get_decoder(args[0] if args else Any, building), factory)
+    if origin is tuple:
+        if not args or (len(args) == 2 and args[1] is Ellipsis):
+            return _make_list(_get_decoder(args[0] if args else Any, building), tuple)
+        return _make_tuple([_get_decoder(arg, building) for arg in args])
+    if origin in _MAPPING_ORIGINS:
+        if args and args[0] is not str:
+            raise TypeError(f"Unsupported mapping key type {args[0]}")
+        return _make_dict(_get_decoder(args[1] if args else Any, building))
+
+    raise TypeError(f"Unsupported type {tp}")
+
+
+def _get_decoder(tp: Any, building: Optional[_Building] = None) -> Decoder:
+    try:
+        return _DECODERS[tp]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable annotations are not cached
+        return _build(tp, {} if building is None else building)
+    if building is not None:
+        if (decoder := building.get(tp)) is None:
+            decoder = building[tp] = _build(tp, building)
+        return decoder
+
+    building = {}
+    decoder = building[tp] = _build(tp, building)
+    _DECODERS.update(building)
+    return decoder
+
+
+def loads_as(
+    type_: Type[T],
+    data: Union[str, bytes, bytearray, memoryview],
+    *,
+    parser: Optional[Parser] = None,
+) -> T:
+    # Decodes into dataclasses, TypedDicts, NamedTuples and attrs classes (and
+    # standard containers of them) without pydantic, only the declared fields
+    # are extracted
+    decoder = _get_decoder(type_)
+    if isinstance(data, str):
+        data = data.encode()
+    parser = parser or Parser()
+    return decoder(parser.parse(data), ())
@@ -1,9 +1,14 @@
 import re
 from json import dumps
+from typing import Any, List
 
 import pytest
-from pydantic import ValidationError
+from pydantic import Field, Json, ValidationError
 
+from simdjson_schemaful import ResultCache
+from simdjson_schemaful.parser import _get_plan
+from simdjson_schemaful.pydantic import v1
+from simdjson_schemaful.pydantic.v1 import BaseModel, parse_raw_simdjson_as
 from tests.pydantic.v1.conftest import ModelNested
 
 
@@ -93,3 +98,105 @@ def test_missing_required():
         ),
     ):
         ModelNested.parse_raw_simdjson(dumps(data))
+
+
+def test_cache():
+    cache = ResultCache()
+    data = dumps({"l1_list": [{"l2": {"s": "0", "i": 0, "f": 0.0}}]})
+    first = ModelNested.parse_raw_simdjson(data, cache=cache)
+    second = ModelNested.parse_raw_simdjson(data, cache=cache)
+    assert first == second
+    assert first is not second
+    assert cache.cache_info().hits == 1
+
+
+def test_fail_fast():
+    # Coerced by pydantic
+    data = {"l1_list": [{"l2": {"s": "0", "i": "0", "f": 0.0}}]}
+    model = ModelNested.parse_raw_simdjson(dumps(data), fail_fast=True)
+    assert model == ModelNested.parse_raw(dumps(data))
+
+    data = {"l1_list": [{"l2": {"s": "0", "i": 0}}]}
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ModelNested\nl1_list -> 0 -> l2 -> f\n  Field "
+            "required at '/l1_list/0/l2/f' (type=value_error.schemavalidation)"
+        ),
+    ):
+        ModelNested.parse_raw_simdjson(dumps(data), fail_fast=True)
+
+
+def test_slice():
+    class Model(BaseModel):
+        values: List[int] = Field(..., **{"x-simdjson-slice": [-2, None]})
+
+    data = dumps({"values": [0, 1, 2, 3]})
+    assert Model.parse_raw_simdjson(data).values == [2, 3]
+
+
+def test_raw():
+    raw = {"x-simdjson-raw": True}
+
+    class Model(BaseModel):
+        blob: bytes = Field(..., **raw)
+        doc: Json[Any] = Field(..., **raw)
+
+    data = dumps({"blob": {"a": [1, 2]}, "doc": {"b": None}})
+    model = Model.parse_raw_simdjson(data)
+    assert model.blob == b'{"a":[1,2]}'
+    assert isinstance(model.blob, bytes)
+    assert model.doc == {"b": None}
+
+
+def test_embedded():
+    class Inner(BaseModel):
+        value: int
+
+        class Config:
+            extra = "forbid"
+
+    class Model(BaseModel):
+        doc: Json[Inner]
+        docs: Json[List[Inner]]
+        untyped: Json
+
+    doc = dumps({"value": 1, "other": [2]})
+    data = dumps({"doc": doc, "docs": dumps([{"value": 2, "x": 3}]), "untyped": doc})
+    # Only the selected fields of the documents are passed to pydantic
+    model = Model.parse_raw_simdjson(data)
+    assert model.doc == Inner(value=1)
+    assert model.docs == [Inner(value=2)]
+    assert model.untyped == {"value": 1, "other": [2]}
+    assert parse_raw_simdjson_as(List[Model], f"[{data}]") == [model]
+    # Schemas of the models are left intact
+    assert Model.schema()["properties"]["doc"] == {"$ref": "#/definitions/Inner"}
+
+    data = dumps({"doc": dumps({"value": "a"}), "docs": "[", "untyped": "1"})
+    with pytest.raises(ValidationError) as exc_info:
+        Model.parse_raw_simdjson(data)
+    assert [e["loc"] for e in exc_info.value.errors()] == [("doc", "value"), ("docs",)]
+
+
+def test_warmup():
+    class Opaque:
+        pass
+
+    class Lazy(BaseModel):
+        value: int
+
+    class Arbitrary(BaseModel):
+        class Config:
+            arbitrary_types_allowed = True
+
+        value: Opaque
+
+    assert Lazy not in v1._REGISTRY
+    skipped = v1.warmup()
+    schema = v1._REGISTRY[Lazy]
+    assert schema == Lazy.schema()
+    # The extraction plans are compiled as well
+    assert id(schema) in _get_plan(schema).nodes
+    # Models the schemas of which can not be generated do not stop the others
+    assert Arbitrary in skipped and Lazy not in skipped
+    assert v1.warmup([Arbitrary, List[Lazy]]) == [Arbitrary]
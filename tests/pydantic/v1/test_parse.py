@@ -1,11 +1,17 @@
 import re
 from json import dumps
-from typing import Dict, List, Union
+from typing import Dict, List, Sequence, Tuple, Union
 
 import pytest
 from pydantic import ValidationError
 
-from simdjson_schemaful.pydantic.v1 import parse_raw_simdjson_as
+from simdjson_schemaful import ResultCache
+from simdjson_schemaful.pydantic.v1 import (
+    IncrementalSession,
+    iter_parse_raw_simdjson_as,
+    parse_raw_simdjson_as,
+    parse_raw_simdjson_multi,
+)
 from tests.pydantic.v1.conftest import Model, ModelNested
 
 
@@ -124,3 +130,129 @@ def test_raw_missing_required():
         ),
     ):
         parse_raw_simdjson_as(ModelNested, dumps(data))
+
+
+@pytest.mark.parametrize("model", (List[Model], Sequence[Model], Tuple[Model, ...]))
+def test_iter_parse(model):
+    data = dumps([{"value": 0}, {"value": 1}, {"value": 2}])
+    items = iter_parse_raw_simdjson_as(model, data)
+    assert next(items) == Model(value=0)
+    assert list(items) == [Model(value=1), Model(value=2)]
+
+
+def test_iter_parse_batches():
+    data = dumps([{"value": 0}, {"value": 1}, {"value": 2}])
+    batches = list(iter_parse_raw_simdjson_as(List[Model], data, batch_size=2))
+    assert batches == [[Model(value=0), Model(value=1)], [Model(value=2)]]
+
+
+def test_iter_parse_not_a_sequence():
+    with pytest.raises(
+        TypeError,
+        match=re.escape("Expected a homogeneous sequence type, got typing.Dict"),
+    ):
+        iter_parse_raw_simdjson_as(Dict[str, Model], dumps({}))
+
+
+def test_iter_parse_fail():
+    data = [{"l1_list": []}, {"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    items = iter_parse_raw_simdjson_as(List[ModelNested], dumps(data))
+    assert next(items)
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ParsingModel[ModelNested]\n__root__ -> 1 -> "
+            "l1_list -> 0 -> l2 -> f\n  field required (type=value_error.missing)"
+        ),
+    ):
+        next(items)
+
+
+def test_cache():
+    cache = ResultCache(copy=False)
+    model = List[Model]
+    data = dumps([{"value": 0}])
+    first = parse_raw_simdjson_as(model, data, cache=cache)
+    assert parse_raw_simdjson_as(model, data, cache=cache) is first
+    assert cache.cache_info().hits == 1
+
+
+def test_fail_fast():
+    data = [{"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ParsingModel[List[tests.pydantic.v1.conftest."
+            "ModelNested]]\n__root__ -> 0 -> l1_list -> 0 -> l2 -> f\n  Field "
+            "required at '/0/l1_list/0/l2/f'"
+        ),
+    ):
+        parse_raw_simdjson_as(List[ModelNested], dumps(data), fail_fast=True)
+
+
+def test_iter_parse_fail_fast():
+    data = [{"l1_list": []}, {"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    items = iter_parse_raw_simdjson_as(List[ModelNested], dumps(data), fail_fast=True)
+    assert next(items)
+    with pytest.raises(
+        ValidationError,
+        match=re.escape("__root__ -> 1 -> l1_list -> 0 -> l2 -> f\n  Field required"),
+    ):
+        next(items)
+
+
+def test_filters():
+    data = dumps(
+        [{"value": i, "status": "active" if i % 2 else None} for i in range(5)]
+    )
+    filters = {"": {"status": "active"}}
+    assert parse_raw_simdjson_as(List[Model], data, filters=filters) == [
+        Model(value=1),
+        Model(value=3),
+    ]
+    items = iter_parse_raw_simdjson_as(
+        List[Model],
+        data,
+        filters=filters,
+        slices={"": [2, None]},
+    )
+    assert list(items) == [Model(value=3)]
+
+
+def test_parse_multi():
+    data = dumps({"value": 1, "other": [1, 2]})
+    type_ = Dict[str, Union[int, List[int]]]
+    res = parse_raw_simdjson_multi(data, {"model": Model, "dict": type_})
+    assert res == {"model": Model(value=1), "dict": {"value": 1, "other": [1, 2]}}
+
+    with pytest.raises(
+        ValidationError, match=re.escape("1 validation error for Model")
+    ):
+        parse_raw_simdjson_multi(dumps({"value": "a"}), {"model": Model, "dict": type_})
+    with pytest.raises(ValidationError, match="Field required"):
+        parse_raw_simdjson_multi(dumps({}), {"model": Model}, fail_fast=True)
+
+
+def test_incremental():
+    session = IncrementalSession(List[ModelNested])
+    data = [{"l1_list": []}, {"l1_list": [{"l2": {"s": "0", "i": 0, "f": 0.0}}]}]
+    first = session.parse_raw_simdjson(dumps(data))
+    assert first == parse_raw_simdjson_as(List[ModelNested], dumps(data))
+    second = session.parse_raw_simdjson(dumps([data[1], {"l1_list": []}]))
+    assert second[0] is first[1]
+    assert session.cache_info().reuse_ratio == 0.5
+
+    data = [data[0], {"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ParsingModel[ModelNested]\n__root__ -> 1 -> "
+            "l1_list -> 0 -> l2 -> f\n  field required (type=value_error.missing)"
+        ),
+    ):
+        session.parse_raw_simdjson(dumps(data))
+
+    session = IncrementalSession(Tuple[Model, ...])
+    assert session.parse_raw_simdjson(dumps([{"value": 1}])) == (Model(value=1),)
+    session.cache_clear()
+    assert session.cache_info().misses == 0
@@ -1,9 +1,17 @@
 import re
+from datetime import datetime
+from enum import Enum
 from json import dumps
+from typing import Any, List
 
 import pytest
-from pydantic import ValidationError
+from pydantic import ConfigDict, Field, Json, ValidationError
+from typing_extensions import Annotated
 
+from simdjson_schemaful import PlanCache, PlanCacheInfo, ResultCache
+from simdjson_schemaful.parser import _get_plan
+from simdjson_schemaful.pydantic import v2
+from simdjson_schemaful.pydantic.v2 import BaseModel, TypeAdapter
 from tests.pydantic.v2.conftest import ModelNested
 
 
@@ -43,7 +51,8 @@ def test_nested_not_an_array():
         ModelNested.model_validate_json(data)
 
 
-def test_ok():
+@pytest.mark.parametrize("strategy", ["python", "json"])
+def test_ok(strategy):
     data = {
         "l1_list": [
             {
@@ -80,7 +89,7 @@ def test_ok():
             "l2": {"s": "2", "i": 2, "f": 2.0},
         },
     }
-    parsed = ModelNested.model_validate_simdjson(dumps(data))
+    parsed = ModelNested.model_validate_simdjson(dumps(data), strategy=strategy)
     assert parsed.model_dump(exclude_none=True) == expected
 
 
@@ -98,3 +107,252 @@ def test_missing_required():
         ),
     ):
         ModelNested.model_validate_simdjson(dumps(data))
+
+
+def test_cache():
+    cache = ResultCache()
+    data = dumps({"l1_list": [{"l2": {"s": "0", "i": 0, "f": 0.0}}]})
+    first = ModelNested.model_validate_simdjson(data, cache=cache)
+    second = ModelNested.model_validate_simdjson(data, cache=cache)
+    assert first == second
+    assert first is not second
+    assert cache.cache_info().hits == 1
+
+
+def test_fail_fast():
+    class Model(BaseModel):
+        i: int
+        b: bool
+        t: datetime
+
+    # Coerced by the validation in the lax mode
+    data = dumps({"i": "5", "b": 1, "t": 1700000000})
+    model = Model.model_validate_simdjson(data, fail_fast=True)
+    assert model == Model.model_validate_json(data)
+
+    class StrictModel(Model):
+        model_config = ConfigDict(strict=True)
+
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for StrictModel\ni\n  Input should be of type "
+            "integer [type=type,"
+        ),
+    ) as exc_info:
+        StrictModel.model_validate_simdjson(data, fail_fast=True)
+    assert exc_info.value.errors()[0]["input"] == "5"
+
+
+def test_fail_fast_missing():
+    data = {"l1_list": [{"l2": {"s": "0", "i": 0}}]}
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ModelNested\nl1_list.0.l2.f\n  Field required "
+            "[type=missing,"
+        ),
+    ) as exc_info:
+        ModelNested.model_validate_simdjson(dumps(data), fail_fast=True)
+    assert exc_info.value.errors()[0]["input"] == {"s": "0", "i": 0}
+
+
+def test_not_an_object_simdjson():
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ModelNested\n__root__\n  Supposed to be an "
+            "object, but in reality is a <class 'str'>"
+        ),
+    ):
+        ModelNested.model_validate_simdjson(dumps("abc"))
+
+
+def test_enum():
+    class Color(str, Enum):
+        red = "red"
+
+    class Model(BaseModel):
+        color: Color
+
+    assert Model.model_validate_simdjson(dumps({"color": "red"})).color is Color.red
+    with pytest.raises(
+        ValidationError,
+        match=re.escape("color\n  Input should be one of 'red' [type=enum,"),
+    ):
+        Model.model_validate_simdjson(dumps({"color": "blue"}), fail_fast=True)
+
+
+def test_slice():
+    class Model(BaseModel):
+        values: List[int] = Field(json_schema_extra={"x-simdjson-slice": [-2, None]})
+
+    data = dumps({"values": [0, 1, 2, 3]})
+    assert Model.model_validate_simdjson(data).values == [2, 3]
+
+
+@pytest.mark.parametrize("strategy", ("python", "json"))
+def test_raw(strategy):
+    raw = {"x-simdjson-raw": True}
+
+    class Model(BaseModel):
+        blob: bytes = Field(json_schema_extra=raw)
+        doc: Json[Any] = Field(json_schema_extra=raw)
+
+    data = dumps({"blob": {"a": [1, 2]}, "doc": {"b": None}})
+    model = Model.model_validate_simdjson(data, strategy=strategy)
+    assert model.blob == b'{"a":[1,2]}'
+    assert model.doc == {"b": None}
+    assert isinstance(model.blob, bytes)
+
+
+@pytest.mark.parametrize("strategy", ("python", "json"))
+def test_embedded(strategy):
+    class Inner(BaseModel):
+        model_config = ConfigDict(extra="forbid")
+
+        value: int
+
+    class Model(BaseModel):
+        doc: Json[Inner]
+        docs: Json[List[Inner]]
+        untyped: Json[Any]
+
+    doc = dumps({"value": 1, "other": [2]})
+    data = dumps({"doc": doc, "docs": dumps([{"value": 2, "x": 3}]), "untyped": doc})
+    # Only the selected fields of the documents are passed to pydantic
+    model = Model.model_validate_simdjson(data, strategy=strategy)
+    assert model.doc == Inner(value=1)
+    assert model.docs == [Inner(value=2)]
+    assert model.untyped == {"value": 1, "other": [2]}
+
+    data = dumps({"doc": dumps({"value": "a"}), "docs": "[", "untyped": "1"})
+    with pytest.raises(ValidationError) as exc_info:
+        Model.model_validate_simdjson(data, strategy=strategy)
+    assert [e["loc"] for e in exc_info.value.errors()] == [("doc", "value"), ("docs",)]
+
+
+def test_strategy():
+    class Model(BaseModel):
+        __simdjson_strategy__ = "json"
+
+        values: List[int]
+
+    data = dumps({"values": [0, "1"], "other": 1})
+    assert Model.model_validate_simdjson(data).values == [0, 1]
+    with pytest.raises(
+        ValidationError,
+        match=re.escape("values.1\n  Input should be a valid integer"),
+    ):
+        Model.model_validate_simdjson(dumps({"values": [0, "a"]}))
+    with pytest.raises(ValueError, match="Invalid strategy"):
+        Model.model_validate_simdjson(data, strategy="other")
+
+
+def test_strategy_cache():
+    cache = ResultCache()
+    data = dumps({"l1_list": [{"l2": {"s": "0", "i": 0, "f": 0.0}}]})
+    for strategy in ("python", "json", "json"):
+        ModelNested.model_validate_simdjson(data, cache=cache, strategy=strategy)
+    assert cache.cache_info().hits == 1
+
+
+def _define():
+    # The same definitions as in another process
+    class Plan(BaseModel):
+        value: int
+        nested: List[ModelNested]
+
+    return Plan
+
+
+def test_warmup():
+    class Opaque:
+        pass
+
+    class Lazy(BaseModel):
+        value: int
+
+    class Arbitrary(BaseModel):
+        model_config = ConfigDict(arbitrary_types_allowed=True)
+        value: Opaque
+
+    assert Lazy not in v2._REGISTRY
+    skipped = v2.warmup()
+    schema = v2._REGISTRY[Lazy]
+    assert schema == Lazy.model_json_schema()
+    # The extraction plans are compiled as well
+    assert id(schema) in _get_plan(schema).nodes
+    # Models the schemas of which can not be generated do not stop the others
+    assert Arbitrary in skipped and Lazy not in skipped
+    assert v2.warmup([Arbitrary, TypeAdapter(List[Lazy])]) == [Arbitrary]
+
+
+def test_plan_cache(tmp_path):
+    cache = PlanCache(tmp_path)
+    v2.set_plan_cache(cache)
+    try:
+        first, second = _define(), _define()
+        v2.warmup([first, TypeAdapter(List[first])])
+        assert cache.cache_info() == PlanCacheInfo(hits=0, misses=2, errors=0)
+        data = dumps({"value": 1, "nested": []})
+        assert second.model_validate_simdjson(data) == second(value=1, nested=[])
+        assert cache.cache_info() == PlanCacheInfo(hits=1, misses=2, errors=0)
+        assert v2._REGISTRY[second] == second.model_json_schema()
+    finally:
+        v2.set_plan_cache(None)
+
+
+def _define_extra(value):
+    class Inner(BaseModel):
+        @classmethod
+        def __get_pydantic_json_schema__(cls, core_schema, handler):
+            return {**handler(core_schema), "x-inner": value}
+
+    class Model(BaseModel):
+        model_config = ConfigDict(json_schema_extra={"x-config": value})
+        inner: Inner
+
+    return Model
+
+
+def test_plan_cache_callables():
+    # Same repr, but the JSON schemas differ
+    fingerprint = v2._fingerprint(_define_extra(1).__pydantic_core_schema__)
+    assert fingerprint == v2._fingerprint(_define_extra(1).__pydantic_core_schema__)
+    assert fingerprint != v2._fingerprint(_define_extra(2).__pydantic_core_schema__)
+
+    def extra(schema):
+        schema["x-extra"] = 1
+
+    def other(schema):
+        schema["x-extra"] = 2
+
+    core_schema = TypeAdapter(
+        Annotated[int, Field(json_schema_extra=extra)]
+    ).pydantic_type_adapter.core_schema
+    fingerprint = v2._fingerprint(core_schema)
+    # E.g., changed between the processes
+    extra.__code__ = other.__code__
+    assert fingerprint != v2._fingerprint(core_schema)
+
+
+def test_dedupe():
+    l1 = {"l2": {"s": "0", "i": 0, "f": 0.0}}
+    data = dumps({"l1_list": [l1, l1, {**l1, "other": 1}], "l1_dict": l1})
+    obj = ModelNested.model_validate_simdjson(data, dedupe=True)
+    assert obj == ModelNested.model_validate_json(data)
+    # Validated once, the instances are shared
+    assert obj.l1_list[0] is obj.l1_list[1]
+    assert obj.l1_list[0] is not obj.l1_list[2]
+    # Optional ones (anyOf) are loaded as a whole
+    assert obj.l1_list[0] is not obj.l1_dict
+    assert obj.l1_list[0].l2 is obj.l1_list[2].l2
+
+    cache = ResultCache()
+    ModelNested.model_validate_simdjson(data, cache=cache, dedupe=["/l1_list/*"])
+    ModelNested.model_validate_simdjson(data, cache=cache)
+    assert cache.cache_info().misses == 2
+
+    with pytest.raises(ValueError, match="not supported by the json strategy"):
+        ModelNested.model_validate_simdjson(data, strategy="json", dedupe=True)
@@ -1,11 +1,16 @@
 import re
 from json import dumps
-from typing import Dict, List, Union
+from typing import Dict, List, Sequence, Tuple, Union
 
 import pytest
 from pydantic import ValidationError
 
-from simdjson_schemaful.pydantic.v2 import TypeAdapter
+from simdjson_schemaful import ResultCache
+from simdjson_schemaful.pydantic.v2 import (
+    IncrementalSession,
+    TypeAdapter,
+    validate_simdjson_multi,
+)
 from tests.pydantic.v2.conftest import Model, ModelNested
 
 
@@ -87,7 +92,8 @@ def test_nested_not_an_array():
         adapter.validate_simdjson(data)
 
 
-def test_ok():
+@pytest.mark.parametrize("strategy", ["python", "json"])
+def test_ok(strategy):
     data = [
         {
             "l1_list": [
@@ -117,7 +123,7 @@ def test_ok():
         }
     ]
     adapter = TypeAdapter(List[ModelNested])
-    (parsed,) = adapter.validate_simdjson(dumps(data))
+    (parsed,) = adapter.validate_simdjson(dumps(data), strategy=strategy)
     assert [parsed.model_dump(exclude_none=True)] == expected
 
 
@@ -136,3 +142,188 @@ def test_raw_missing_required():
     ):
         adapter = TypeAdapter(ModelNested)
         adapter.validate_simdjson(dumps(data))
+
+
+@pytest.mark.parametrize("type_", (List[Model], Sequence[Model], Tuple[Model, ...]))
+def test_iter_validate(type_):
+    adapter = TypeAdapter(type_)
+    data = dumps([{"value": 0, "some": 0}, {"value": 1}, {"value": 2}])
+    items = adapter.iter_validate_simdjson(data)
+    assert next(items) == Model(value=0)
+    assert list(items) == [Model(value=1), Model(value=2)]
+
+
+def test_iter_validate_batches():
+    adapter = TypeAdapter(List[Model])
+    data = dumps([{"value": 0}, {"value": 1}, {"value": 2}])
+    batches = list(adapter.iter_validate_simdjson(data, batch_size=2))
+    assert batches == [[Model(value=0), Model(value=1)], [Model(value=2)]]
+
+
+def test_iter_validate_not_a_sequence():
+    adapter = TypeAdapter(Dict[str, Model])
+    with pytest.raises(
+        TypeError,
+        match=re.escape("Expected a homogeneous sequence type, got typing.Dict"),
+    ):
+        adapter.iter_validate_simdjson(dumps({}))
+
+
+def test_iter_validate_not_an_array():
+    adapter = TypeAdapter(List[Model])
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for list\n__root__\n  Supposed to be an array, but "
+            "in reality is a <class 'str'>"
+        ),
+    ):
+        list(adapter.iter_validate_simdjson(dumps("abc")))
+
+
+def test_iter_validate_fail():
+    adapter = TypeAdapter(List[ModelNested])
+    data = [{"l1_list": []}, {"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    items = adapter.iter_validate_simdjson(dumps(data))
+    assert next(items)
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ModelNested\n1.l1_list.0.l2.f\n  Field required "
+            "[type=missing, input_value={'s': '0', 'i': 0}, input_type=dict]"
+        ),
+    ):
+        next(items)
+
+
+def test_cache():
+    cache = ResultCache(copy=False)
+    adapter = TypeAdapter(List[Model])
+    data = dumps([{"value": 0}])
+    first = adapter.validate_simdjson(data, cache=cache)
+    assert adapter.validate_simdjson(data, cache=cache) is first
+    assert adapter.validate_simdjson(data, strict=True, cache=cache) is not first
+    assert adapter.validate_simdjson(data, context={}, cache=cache) is not first
+    assert cache.cache_info().hits == 1
+    assert cache.cache_info().misses == 2
+
+
+def test_fail_fast():
+    adapter = TypeAdapter(List[ModelNested])
+    data = [{"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for definitions\n0.l1_list.0.l2.f\n  Field required "
+            "[type=missing,"
+        ),
+    ):
+        adapter.validate_simdjson(dumps(data), fail_fast=True)
+
+
+def test_iter_validate_fail_fast():
+    adapter = TypeAdapter(List[ModelNested])
+    data = [{"l1_list": []}, {"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    items = adapter.iter_validate_simdjson(dumps(data), fail_fast=True)
+    assert next(items)
+    with pytest.raises(
+        ValidationError,
+        match=re.escape("1.l1_list.0.l2.f\n  Field required [type=missing,"),
+    ):
+        next(items)
+
+
+def test_filters():
+    adapter = TypeAdapter(List[Model])
+    data = dumps(
+        [{"value": i, "status": "active" if i % 2 else None} for i in range(5)]
+    )
+    filters = {"": {"status": "active"}}
+    assert adapter.validate_simdjson(data, filters=filters) == [
+        Model(value=1),
+        Model(value=3),
+    ]
+    items = adapter.iter_validate_simdjson(
+        data, filters=filters, slices={"": [2, None]}
+    )
+    assert list(items) == [Model(value=3)]
+
+
+def test_strategy_json_fail_fast():
+    adapter = TypeAdapter(List[Model])
+    data = dumps([{"value": 0}, {"value": "1"}])
+    assert adapter.validate_simdjson(data, strategy="json") == [
+        Model(value=0),
+        Model(value=1),
+    ]
+    # Lax as the validation, unless strict
+    assert adapter.validate_simdjson(data, strategy="json", fail_fast=True) == [
+        Model(value=0),
+        Model(value=1),
+    ]
+    with pytest.raises(
+        ValidationError,
+        match=re.escape("1.value\n  Input should be of type integer [type=type,"),
+    ) as exc_info:
+        adapter.validate_simdjson(data, strategy="json", fail_fast=True, strict=True)
+    assert exc_info.value.errors()[0]["input"] == "1"
+
+
+def test_validate_multi():
+    data = dumps({"value": 1, "other": [1, 2]})
+    adapter = TypeAdapter(Dict[str, Union[int, List[int]]])
+    res = validate_simdjson_multi(data, {"model": Model, "dict": adapter})
+    assert res == {"model": Model(value=1), "dict": {"value": 1, "other": [1, 2]}}
+
+    with pytest.raises(
+        ValidationError, match=re.escape("1 validation error for Model")
+    ):
+        validate_simdjson_multi(
+            dumps({"value": "a"}), {"model": Model, "dict": adapter}
+        )
+    with pytest.raises(ValidationError, match="Field required"):
+        validate_simdjson_multi(dumps({}), {"model": Model}, fail_fast=True)
+
+
+def test_incremental():
+    session = IncrementalSession(TypeAdapter(List[ModelNested]))
+    data = [{"l1_list": []}, {"l1_list": [{"l2": {"s": "0", "i": 0, "f": 0.0}}]}]
+    first = session.validate_simdjson(dumps(data))
+    assert first == TypeAdapter(List[ModelNested]).validate_simdjson(dumps(data))
+    second = session.validate_simdjson(dumps([data[1], {"l1_list": []}]))
+    assert second[0] is first[1]
+    assert session.cache_info().reuse_ratio == 0.5
+
+    data = [data[0], {"l1_list": [{"l2": {"s": "0", "i": 0}}]}]
+    with pytest.raises(
+        ValidationError,
+        match=re.escape(
+            "1 validation error for ModelNested\n1.l1_list.0.l2.f\n  Field required "
+            "[type=missing, input_value={'s': '0', 'i': 0}, input_type=dict]"
+        ),
+    ):
+        session.validate_simdjson(dumps(data))
+    with pytest.raises(ValidationError, match="Supposed to be an array"):
+        session.validate_simdjson(dumps({}))
+
+    session = IncrementalSession(TypeAdapter(Tuple[Model, ...]))
+    assert session.validate_simdjson(dumps([{"value": 1}])) == (Model(value=1),)
+    session.cache_clear()
+    assert session.cache_info().misses == 0
+
+
+def test_dedupe():
+    adapter = TypeAdapter(List[ModelNested])
+    item = {"l1_list": [{"l2": {"s": "0", "i": 0, "f": 0.0}}]}
+    res = adapter.validate_simdjson(dumps([item, item]), dedupe=True, strict=True)
+    assert res == adapter.validate_simdjson(dumps([item, item]))
+    assert res[0] is res[1]
+
+    # Invalid duplicates are reported at all of their locations
+    item = {"l1_list": [{"l2": {"s": "0", "i": 0}}] * 2}
+    with pytest.raises(ValidationError) as exc_info:
+        adapter.validate_simdjson(dumps([item]), dedupe=True)
+    assert [e["loc"] for e in exc_info.value.errors()] == [
+        (0, "l1_list", 0, "l2", "f"),
+        (0, "l1_list", 1, "l2", "f"),
+    ]
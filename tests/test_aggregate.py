@@ -0,0 +1,154 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import (
+    MISSING,
+    Aggregate,
+    Count,
+    GroupCount,
+    Max,
+    Min,
+    Sum,
+    aggregate,
+)
+
+DATA = [
+    {"type": "a", "amount": 1, "meta": {"score": 0.5}},
+    {"type": "b", "amount": 2.5, "meta": {"score": 3}},
+    {"type": "a", "amount": None},
+    {"type": None, "amount": 3},
+    {"amount": -1, "meta": {"score": "high"}},
+]
+AGGREGATES = {
+    "count": Count(),
+    "count_type": Count("type"),
+    "sum": Sum("amount"),
+    "min": Min("amount"),
+    "max": Max("amount"),
+    "types": GroupCount("type"),
+}
+
+
+def test_aggregate():
+    assert aggregate(dumps(DATA), aggregates=AGGREGATES) == {
+        "count": 5,
+        "count_type": 3,
+        "sum": 5.5,
+        "min": -1,
+        "max": 3,
+        "types": [("a", 2), ("b", 1), (None, 1)],
+    }
+
+
+def test_empty():
+    assert aggregate(dumps([]), aggregates=AGGREGATES) == {
+        "count": 0,
+        "count_type": 0,
+        "sum": 0,
+        "min": None,
+        "max": None,
+        "types": [],
+    }
+
+
+def test_path():
+    data = {"pages": [{"items": DATA}, {"items": DATA[:2]}, {}, {"items": None}]}
+    res = aggregate(
+        dumps(data),
+        path="/pages/*/items",
+        aggregates={"count": Count(), "score": Max("/meta/score")},
+        where={"/meta/score": {"lt": 5}},
+    )
+    assert res == {"count": 4, "score": 3}
+
+    res = aggregate(dumps(data), path="/pages/1/items", aggregates={"n": Count()})
+    assert res == {"n": 2}
+    res = aggregate(dumps(data), path="/pages/9/items", aggregates={"n": Count()})
+    assert res == {"n": 0}
+
+
+def test_group_count_types():
+    data = [{"a": 1}, {"a": 1.0}, {"a": "1"}, {"a": 0.5}, {"a": 1}]
+    res = aggregate(dumps(data), aggregates={"n": GroupCount("a")})
+    assert res == {"n": [(1, 3), ("1", 1), (0.5, 1)]}
+    assert res["n"][0][0].__class__ is int
+
+    # Booleans and the equal numbers are grouped apart
+    data = [{"a": True}, {"a": 1}, {"a": None}, {"a": True}, {"a": 0.0}]
+    data += [{"a": False}, {"a": 1.0}]
+    res = aggregate(dumps(data), aggregates={"n": GroupCount("a")})
+    assert res == {"n": [(True, 2), (1, 2), (None, 1), (0.0, 1), (False, 1)]}
+    assert [value.__class__ for value, _ in res["n"]] == [
+        bool,
+        int,
+        type(None),
+        float,
+        bool,
+    ]
+
+
+def test_custom():
+    with pytest.raises(TypeError, match="abstract"):
+        Aggregate()
+
+    class Distinct(Aggregate):
+        __slots__ = ()
+
+        def initial(self):
+            return set()
+
+        def update(self, state, value):
+            if value is not MISSING:
+                state.add(value)
+            return state
+
+        def result(self, state):
+            return len(state)
+
+    res = aggregate(dumps(DATA), aggregates={"n": Distinct("type")})
+    assert res == {"n": 3}
+
+
+def test_where():
+    res = aggregate(
+        dumps(DATA),
+        aggregates={"sum": Sum("amount")},
+        where={"type": "a"},
+    )
+    assert res == {"sum": 1}
+
+
+def test_scalar_items():
+    res = aggregate(
+        dumps({"values": [3, 1, 2]}),
+        path="/values",
+        aggregates={"sum": Sum(), "min": Min(), "max": Max()},
+    )
+    assert res == {"sum": 6, "min": 1, "max": 3}
+
+
+def test_strings():
+    res = aggregate(dumps(["b", "a", "c"]), aggregates={"min": Min(), "max": Max()})
+    assert res == {"min": "a", "max": "c"}
+
+
+@pytest.mark.parametrize(
+    "data, agg, match",
+    [
+        ([{"a": "1"}], Sum("a"), "Can not sum '1' of 'a'"),
+        ([{"a": True}], Sum("a"), "Can not sum True of 'a'"),
+        ([{"a": 1}, {"a": "1"}], Min("a"), "Can not compare '1' of 'a'"),
+        ([{"a": "1"}, {"a": 1}], Max("a"), "Can not compare 1 of 'a'"),
+        ([{"a": [1]}], Max("a"), "Can not compare"),
+        ([{"a": {}}], GroupCount("a"), "Can not group by"),
+    ],
+)
+def test_invalid_values(data, agg, match):
+    with pytest.raises(ValueError, match=match):
+        aggregate(dumps(data), aggregates={"agg": agg})
+
+
+def test_not_an_array():
+    with pytest.raises(ValueError, match="Supposed to be an array"):
+        aggregate(dumps({"a": 1}), aggregates={"count": Count()})
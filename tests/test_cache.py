@@ -0,0 +1,111 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import CacheInfo, ResultCache, loads
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"value": {"type": "integer"}},
+}
+
+
+def test_hit():
+    cache = ResultCache()
+    data = dumps({"value": 1, "other": 2})
+    assert loads(data, schema=SCHEMA, cache=cache) == {"value": 1}
+    assert loads(data, schema=SCHEMA, cache=cache) == {"value": 1}
+    assert cache.cache_info() == CacheInfo(
+        hits=1,
+        misses=1,
+        maxsize=128,
+        maxbytes=None,
+        currsize=1,
+        currbytes=len(data),
+    )
+
+
+def test_namespace():
+    cache = ResultCache()
+    data = dumps({"value": 1, "other": 2})
+    assert loads(data, schema=SCHEMA, cache=cache) == {"value": 1}
+    assert loads(data, schema=dict(SCHEMA), cache=cache) == {"value": 1}
+    assert loads(data, schema={"type": "object"}, cache=cache) == {
+        "value": 1,
+        "other": 2,
+    }
+    assert cache.cache_info().misses == 3
+
+
+def test_copy():
+    cache = ResultCache()
+    data = dumps({"value": 1})
+    loads(data, schema=SCHEMA, cache=cache)["value"] = 2
+    assert loads(data, schema=SCHEMA, cache=cache) == {"value": 1}
+
+
+def test_no_copy():
+    cache = ResultCache(copy=False)
+    data = dumps({"value": 1})
+    first = loads(data, schema=SCHEMA, cache=cache)
+    assert loads(data, schema=SCHEMA, cache=cache) is first
+
+
+def test_maxsize():
+    cache = ResultCache(maxsize=2)
+    values = [dumps({"value": i}) for i in range(3)]
+    for data in values:
+        loads(data, schema=SCHEMA, cache=cache)
+    loads(values[1], schema=SCHEMA, cache=cache)
+    loads(values[0], schema=SCHEMA, cache=cache)
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 4, 2)
+
+
+def test_maxbytes():
+    values = [dumps({"value": i}) for i in range(3)]
+    cache = ResultCache(maxbytes=2 * len(values[0]))
+    for data in values:
+        loads(data, schema=SCHEMA, cache=cache)
+    assert cache.cache_info().currsize == 2
+    assert cache.cache_info().currbytes == 2 * len(values[0])
+
+    loads(dumps({"value": 1, "too": "large"}), schema=SCHEMA, cache=cache)
+    assert cache.cache_info().currsize == 2
+
+
+def test_ttl(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("simdjson_schemaful.cache.time.monotonic", lambda: now)
+    cache = ResultCache(ttl=10)
+    data = dumps({"value": 1})
+    loads(data, schema=SCHEMA, cache=cache)
+    now = 10.0
+    loads(data, schema=SCHEMA, cache=cache)
+    now = 10.1
+    loads(data, schema=SCHEMA, cache=cache)
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 1)
+
+
+def test_error_not_cached():
+    cache = ResultCache()
+    with pytest.raises(ValueError):
+        loads(dumps("abc"), schema=SCHEMA, cache=cache)
+    assert cache.cache_info().currsize == 0
+
+
+def test_clear():
+    cache = ResultCache()
+    loads(dumps({"value": 1}), schema=SCHEMA, cache=cache)
+    cache.cache_clear()
+    assert cache.cache_info() == CacheInfo(0, 0, 128, None, 0, 0)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    ({"maxsize": -1}, {"maxbytes": -1}, {"ttl": 0}),
+)
+def test_invalid(kwargs):
+    with pytest.raises(ValueError):
+        ResultCache(**kwargs)
@@ -0,0 +1,139 @@
+import io
+import json
+import sys
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from simdjson_schemaful.cli import main
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"id": {"type": "integer"}},
+}
+
+
+class Item(BaseModel):
+    id: int
+    tags: List[str]
+
+
+def _documents(start, stop):
+    return [{"id": i, "tags": ["a"], "other": "x" * i} for i in range(start, stop)]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    path = tmp_path / "inputs"
+    (path / "nested").mkdir(parents=True)
+    (path / "a.json").write_text(json.dumps({"id": -1, "other": 0}))
+    lines = [json.dumps(document) for document in _documents(0, 10)]
+    (path / "nested" / "b.ndjson").write_text("\n".join(lines[:5] + [""] + lines[5:]))
+    (path / "skipped.txt").write_text("{")
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    return path, schema
+
+
+def _lines(capsysbinary):
+    return [json.loads(line) for line in capsysbinary.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_directory(inputs, capsysbinary, workers):
+    path, schema = inputs
+    argv = ["-s", str(schema), str(path), "-w", str(workers), "--batch-size", "3"]
+    assert main(argv) == 0
+    expected = [{"id": -1}] + [{"id": i} for i in range(10)]
+    assert _lines(capsysbinary) == expected
+
+    assert main([*argv, "--unordered"]) == 0
+    assert sorted(_lines(capsysbinary), key=lambda x: x["id"]) == expected
+
+
+def test_model(inputs, tmp_path, capsysbinary):
+    path, _ = inputs
+    output = tmp_path / "output.json"
+    argv = ["-m", f"{__name__}:Item", str(path / "nested"), "-o", str(output)]
+    assert main([*argv, "-f", "json"]) == 0
+    assert json.loads(output.read_bytes()) == [
+        {"id": i, "tags": ["a"]} for i in range(10)
+    ]
+
+
+def test_stdin(inputs, monkeypatch, capsysbinary):
+    _, schema = inputs
+    data = "\n".join(json.dumps(document) for document in _documents(0, 2))
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data.encode())))
+    assert main(["-s", str(schema), "--ndjson", "-f", "json"]) == 0
+    assert json.loads(capsysbinary.readouterr().out) == [{"id": 0}, {"id": 1}]
+
+
+@pytest.mark.parametrize(
+    "on_error, code, expected, err",
+    (
+        ("fail", 1, [{"id": 0}], "b.ndjson:2: Supposed to be an object"),
+        ("skip", 0, [{"id": 0}, {"id": 2}], "skipped: 1, kept: 0"),
+        ("keep", 0, [{"id": 0}, [1], {"id": 2}], "skipped: 0, kept: 1"),
+    ),
+)
+def test_errors(tmp_path, capsysbinary, on_error, code, expected, err):
+    path = tmp_path / "b.ndjson"
+    path.write_text('{"id": 0}\n[1]\n{"id": 2}\n')
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    argv = ["-s", str(schema), str(path), "--on-error", on_error, "--stats"]
+    assert main(argv) == code
+    out, stderr = capsysbinary.readouterr()
+    assert [json.loads(line) for line in out.splitlines()] == expected
+    assert err in stderr.decode()
+
+
+@pytest.mark.parametrize("output_format", ("ndjson", "json"))
+def test_keep(tmp_path, capsysbinary, output_format):
+    # Kept documents are minified, invalid JSON is skipped with a warning
+    path = tmp_path / "inputs"
+    path.mkdir()
+    for name, text in (
+        ("a.json", '{"id": 0}'),
+        ("b.json", json.dumps([{"id": 1}, "x"], indent=2)),
+        ("c.json", "not json\n"),
+        ("d.json", json.dumps({"id": "a", "other": [1]}, indent=2)),
+    ):
+        (path / name).write_text(text)
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    argv = ["-s", str(schema), str(path), "--on-error", "keep", "--fail-fast"]
+    assert main([*argv, "-f", output_format, "--stats"]) == 0
+    out, stderr = capsysbinary.readouterr()
+    expected = [{"id": 0}, [{"id": 1}, "x"], {"id": "a", "other": [1]}]
+    if output_format == "json":
+        assert json.loads(out) == expected
+    else:
+        lines = [
+            json.dumps(value, separators=(",", ":")).encode() for value in expected
+        ]
+        assert out.splitlines() == lines
+    assert b"c.json: not kept" in stderr
+    assert b"documents: 4, skipped: 1, kept: 2" in stderr
+
+
+def test_fail_stats(tmp_path, capsysbinary):
+    path = tmp_path / "b.ndjson"
+    path.write_text('{"id": 0}\n{"id": 1}\n[1]\n{"id": 3}\n')
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    assert main(["-s", str(schema), str(path), "--stats"]) == 1
+    out, stderr = capsysbinary.readouterr()
+    assert len(out.splitlines()) == 2
+    assert b"documents: 2, skipped: 0, kept: 0" in stderr
+
+
+def test_invalid(tmp_path, capsysbinary):
+    assert main(["-s", str(tmp_path / "missing.json")]) == 1
+    assert main(["-m", "tests.test_cli:Missing"]) == 1
+    assert main(["-m", "tests.test_cli:Item", str(tmp_path / "missing.json")]) == 1
+    assert "error:" in capsysbinary.readouterr().err.decode()
+    with pytest.raises(SystemExit):
+        main(["-s", "schema.json", "-w", "0"])
@@ -0,0 +1,160 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import ResultCache, SchemaValidationError, iter_loads, loads
+from simdjson_schemaful.filters import _COMPILED
+
+ITEM = {
+    "type": "object",
+    "properties": {"i": {"type": "integer"}},
+    "required": ["i"],
+}
+DATA = [
+    {"i": 0, "status": "active", "region": "eu", "score": 0.5},
+    {"i": 1, "status": "inactive", "region": "us", "score": 1},
+    {"i": 2, "status": "active", "region": "us", "meta": {"score": 2}},
+    {"i": 3, "status": True, "region": None, "score": "3"},
+    {"i": 4, "status": "active", "score": [1]},
+]
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ({}, [0, 1, 2, 3, 4]),
+        ({"status": "active"}, [0, 2, 4]),
+        ({"status": {"eq": "active"}, "region": "us"}, [2]),
+        ({"region": {"in": ["eu", "us"]}}, [0, 1, 2]),
+        ({"region": None}, [3]),
+        ({"region": {"exists": False}}, [4]),
+        ({"region": {"exists": True}}, [0, 1, 2, 3]),
+        ({"score": {"gte": 0.5, "lt": 1}}, [0]),
+        ({"score": {"gt": 0}}, [0, 1]),
+        ({"score": {"lte": "3"}}, [3]),
+        ({"/meta/score": {"gte": 2}}, [2]),
+        ({"/meta/other": {"exists": True}}, []),
+        # Pointers through the values of other types do not match
+        ({"/score/0": {"exists": True}}, [4]),
+        ({"/meta/score/x": {"exists": True}}, []),
+        ({"/score/x": {"exists": True}}, []),
+        ({"i": 1}, [1]),
+        ({"i": True}, []),
+        ({"status": {"in": [True]}}, [3]),
+        ({"status": 1}, []),
+    ],
+)
+def test_schema_filter(spec, expected):
+    schema = {"type": "array", "items": ITEM, "x-simdjson-filter": spec}
+    assert [item["i"] for item in loads(dumps(DATA), schema=schema)] == expected
+    items = iter_loads(dumps(DATA), schema=schema)
+    assert [item["i"] for item in items] == expected
+
+
+def test_scalar_items():
+    schema = {
+        "type": "object",
+        "properties": {
+            "tags": {
+                "type": "array",
+                "items": {"type": "string"},
+                "x-simdjson-filter": {"": {"in": ["a", "c"]}},
+            },
+        },
+    }
+    data = {"tags": ["a", "b", "c", 1]}
+    assert loads(dumps(data), schema=schema) == {"tags": ["a", "c"]}
+
+
+def test_call_filters():
+    schema = {
+        "type": "object",
+        "properties": {
+            "pages": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"items": {"type": "array", "items": ITEM}},
+                },
+            },
+        },
+    }
+    data = dumps({"pages": [{"items": DATA}] * 2})
+    loaded = loads(data, schema=schema, filters={"/pages/*/items": {"region": "us"}})
+    assert loaded == {"pages": [{"items": [{"i": 1}, {"i": 2}]}] * 2}
+
+
+def test_call_filters_precedence():
+    schema = {"type": "array", "items": ITEM, "x-simdjson-filter": {"i": 0}}
+    loaded = loads(dumps(DATA), schema=schema, filters={"": {"i": 1}})
+    assert loaded == [{"i": 1}]
+
+
+def test_compiled_bounded():
+    for i in range(_COMPILED._maxsize + 10):
+        spec = {"i": {"gte": i}}
+        schema = {"type": "array", "items": ITEM, "x-simdjson-filter": spec}
+        assert len(loads(dumps(DATA), schema=schema)) == max(len(DATA) - i, 0)
+    assert len(_COMPILED) == _COMPILED._maxsize
+
+
+def test_with_slice():
+    schema = {
+        "type": "array",
+        "items": ITEM,
+        "x-simdjson-slice": [1, None],
+        "x-simdjson-filter": {"status": "active"},
+    }
+    assert loads(dumps(DATA), schema=schema) == [{"i": 2}, {"i": 4}]
+
+
+def test_fail_fast():
+    schema = {
+        "type": "array",
+        "items": ITEM,
+        "x-simdjson-filter": {"status": "active"},
+        "maxItems": 2,
+    }
+    data = [{"status": "inactive"}, {"i": 1, "status": "active"}, {"status": "active"}]
+    with pytest.raises(SchemaValidationError) as e:
+        loads(dumps(data), schema=schema, fail_fast=True)
+    assert e.value.loc == (2, "i")
+
+    data = [{"i": i, "status": "active"} for i in range(3)]
+    with pytest.raises(SchemaValidationError, match="at most 2 items"):
+        loads(dumps(data), schema=schema, fail_fast=True)
+    with pytest.raises(SchemaValidationError, match="at most 2 items"):
+        list(iter_loads(dumps(data), schema=schema, fail_fast=True))
+
+
+def test_cache_key():
+    cache = ResultCache()
+    schema = {"type": "array", "items": ITEM}
+    data = dumps(DATA)
+    for _ in range(2):
+        for region in ("eu", "us"):
+            filters = {"": {"region": {"in": [region]}}}
+            loads(data, schema=schema, cache=cache, filters=filters)
+    assert cache.cache_info().hits == 2
+    assert cache.cache_info().misses == 2
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        [],
+        {"i": {"unknown": 1}},
+        {"i": {"in": 1}},
+        {"i": {"in": [[1]]}},
+        {"i": {"eq": {}}},
+        {"i": {"gt": None}},
+        {"i": {"gt": True}},
+        {"i": {"exists": 1}},
+    ],
+)
+def test_invalid_filter(spec):
+    schema = {"type": "array", "items": ITEM}
+    with pytest.raises(ValueError):
+        loads(dumps(DATA), schema=schema, filters={"": spec})
+    with pytest.raises(ValueError):
+        loads(dumps(DATA), schema={**schema, "x-simdjson-filter": spec})
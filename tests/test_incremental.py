@@ -0,0 +1,102 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import (
+    IncrementalSession,
+    SchemaValidationError,
+    SessionInfo,
+    loads,
+)
+
+SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, "tags": {"type": "array"}},
+    },
+}
+DATA = [{"id": i, "tags": ["a"], "other": i} for i in range(10)]
+
+
+def _size(item):
+    return len(dumps(item, separators=(",", ":")))
+
+
+def test_reuse():
+    session = IncrementalSession(schema=SCHEMA)
+    first = session.loads(dumps(DATA))
+    assert first == loads(dumps(DATA), schema=SCHEMA)
+
+    changed = [*DATA[:5], {**DATA[5], "id": -5}, *DATA[6:], {"id": 10}]
+    # Formatting does not matter
+    second = session.loads(dumps(changed, indent=2))
+    assert second == loads(dumps(changed), schema=SCHEMA)
+    assert second[0] is first[0]
+    assert second[5] is not first[5]
+    assert session.cache_info() == SessionInfo(
+        hits=9,
+        misses=12,
+        maxsize=100_000,
+        maxbytes=None,
+        currsize=12,
+        currbytes=sum(map(_size, [*DATA, changed[5], changed[-1]])),
+    )
+    assert session.cache_info().reuse_ratio == 9 / 21
+
+    session.cache_clear()
+    assert session.cache_info() == SessionInfo(0, 0, 100_000, None, 0, 0)
+    assert SessionInfo(0, 0, None, None, 0, 0).reuse_ratio == 0.0
+
+
+def test_bounded():
+    session = IncrementalSession(schema=SCHEMA, maxsize=5)
+    session.loads(dumps(DATA))
+    session.loads(dumps(DATA[5:]))
+    assert session.cache_info()[:2] == (5, 10)
+    # The least recently seen ones are evicted
+    session.loads(dumps(DATA[:5]))
+    assert session.cache_info()[:2] == (5, 15)
+
+    size = _size(DATA[0])
+    session = IncrementalSession(schema=SCHEMA, maxsize=None, maxbytes=2 * size)
+    session.loads(dumps(DATA[:3]))
+    assert session.cache_info().currsize == 2
+    session = IncrementalSession(schema=SCHEMA, maxbytes=size - 1)
+    session.loads(dumps(DATA[:3]))
+    assert session.cache_info().currsize == 0
+
+
+def test_options():
+    schema = {"$ref": "#/definitions/Items", "definitions": {"Items": SCHEMA}}
+    session = IncrementalSession(
+        schema=schema,
+        transform=lambda item, index: (index, item[0]),
+        rows="tuple",
+        slices={"": [1, None], "/*/tags": [0, 0]},
+        filters={"": {"id": {"lt": 5}}},
+    )
+    assert session.loads(dumps(DATA)) == [(0, 1), (1, 2), (2, 3), (3, 4)]
+    # Cached along with the positions they were transformed at
+    assert session.loads(dumps([DATA[2], DATA[1], DATA[1]])) == [(0, 1), (0, 1)]
+    assert session.cache_info()[:2] == (2, 4)
+
+    scalars = IncrementalSession(schema={"type": "array", "items": {}})
+    assert scalars.loads("[1, null, [2], null]") == [1, None, [2], None]
+    assert scalars.cache_info()[:2] == (1, 3)
+
+
+def test_errors():
+    session = IncrementalSession(schema=SCHEMA, fail_fast=True)
+    session.loads(dumps(DATA))
+    with pytest.raises(SchemaValidationError) as exc_info:
+        session.loads(dumps([*DATA, {"id": "a"}]))
+    assert exc_info.value.loc == (10, "id")
+    with pytest.raises(ValueError, match="Supposed to be an array"):
+        session.loads("{}")
+    with pytest.raises(ValueError, match="expected array"):
+        IncrementalSession(schema=SCHEMA["items"])
+    with pytest.raises(ValueError, match="the same selection for all the items"):
+        IncrementalSession(schema=SCHEMA, slices={"/1/tags": [0, 1]})
+    with pytest.raises(ValueError, match="maxsize must be non-negative"):
+        IncrementalSession(schema=SCHEMA, maxsize=-1)
@@ -0,0 +1,116 @@
+import json
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import SchemaValidationError, loads, loads_json, project_bytes
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "s": {"type": "string"},
+        "n": {"type": "number"},
+        "b": {"type": "boolean"},
+        "any": {},
+        "obj": {"type": "object"},
+        "values": {"type": "array", "items": {"type": "integer"}},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}},
+            },
+            "x-simdjson-filter": {"active": True},
+        },
+        "map": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "properties": {"x": {"type": "integer"}},
+            },
+        },
+    },
+}
+DATA = {
+    "s": 'a "quoted"\nstring é  ',
+    "n": 1.5e300,
+    "b": False,
+    "any": [1, {"a": None}],
+    "obj": {"a": [1, 2], "b": {"c": "d"}},
+    "values": [1, 2, 3],
+    "items": [{"id": 0, "active": True}, {"id": 1, "active": False}],
+    "map": {"k1": {"x": 1, "y": 2}, "k/2": {"y": 3}},
+    "other": {"x": 1},
+}
+
+
+def test_loads_json():
+    expected = loads(dumps(DATA), schema=SCHEMA)
+    assert (
+        loads_json(dumps(DATA), schema=SCHEMA)
+        == dumps(
+            expected,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode()
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [None, 1, -1, 0.1, 1e-7, True, "s", [1, None], {"a": {"b": [None]}}],
+)
+def test_values(data):
+    schema = {"type": "object", "properties": {"a": {}, "b": {"type": "integer"}}}
+    res = loads_json(dumps({"a": data, "b": None}), schema=schema)
+    assert json.loads(res) == {"a": data, "b": None}
+
+
+def test_untyped_root():
+    assert loads_json(dumps({"a": [1, 2]}), schema={}) == b'{"a":[1,2]}'
+
+
+def test_options():
+    schema = {"type": "array", "items": {"type": "integer"}}
+    res = loads_json(
+        dumps(list(range(10))),
+        schema=schema,
+        slices={"": [2, None]},
+        filters={"": {"": {"lt": 5}}},
+    )
+    assert res == b"[2,3,4]"
+
+
+def test_fail_fast():
+    schema = {
+        "type": "object",
+        "properties": {"items": SCHEMA["properties"]["items"]},
+    }
+    data = {"items": [{"id": "0", "active": True}]}
+    assert loads_json(dumps(data), schema=schema) == b'{"items":[{"id":"0"}]}'
+    with pytest.raises(SchemaValidationError) as e:
+        loads_json(dumps(data), schema=schema, fail_fast=True)
+    assert e.value.loc == ("items", 0, "id")
+
+
+def test_not_an_object():
+    with pytest.raises(ValueError, match="Supposed to be an object"):
+        loads_json(dumps({"obj": [1]}), schema=SCHEMA)
+
+
+def test_project_bytes():
+    res = project_bytes(dumps(DATA), paths=["items[*].id", "map.*.x", "n"])
+    assert (
+        res
+        == b'{"items":[{"id":0},{"id":1}],"map":{"k1":{"x":1},"k/2":{}},"n":1.5e+300}'
+    )
+
+
+def test_raw():
+    schema = {
+        "type": "object",
+        "properties": {"doc": {"type": "object", "x-simdjson-raw": True}},
+    }
+    data = dumps({"doc": {"a": [1, "b"]}, "other": 1})
+    expected = {"doc": '{"a":[1,"b"]}'}
+    assert json.loads(loads_json(data, schema=schema)) == expected
@@ -0,0 +1,31 @@
+import pytest
+
+from simdjson_schemaful.memo import IdentityMemo
+
+
+def test_identity():
+    memo = IdentityMemo()
+    schema = {"type": "object"}
+    assert memo.get_or_create((schema,), lambda: 1) == 1
+    assert memo.get_or_create((schema,), lambda: 2) == 1
+    # Equal, but not the same
+    assert memo.get_or_create(({"type": "object"},), lambda: 3) == 3
+    assert memo.get_or_create((schema,), lambda: 4, "extra") == 4
+    memo.clear()
+    assert memo.get_or_create((schema,), lambda: 5) == 5
+
+
+def test_bounded():
+    memo = IdentityMemo(maxsize=2)
+    first, second, third = {}, {}, {}
+    memo.get_or_create((first,), lambda: 1)
+    memo.get_or_create((second,), lambda: 2)
+    # The least recently used one is evicted
+    memo.get_or_create((first,), lambda: 0)
+    memo.get_or_create((third,), lambda: 3)
+    assert len(memo) == 2
+    assert memo.get_or_create((first,), lambda: 0) == 1
+    assert memo.get_or_create((second,), lambda: 0) == 0
+
+    with pytest.raises(ValueError, match="maxsize must be positive"):
+        IdentityMemo(maxsize=0)
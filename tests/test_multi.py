@@ -0,0 +1,161 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import SchemaValidationError, loads, loads_multi
+from simdjson_schemaful.multi import _PLANS, _get_plan, _MultiLoader
+
+
+def _object(**properties):
+    return {"type": "object", "properties": properties}
+
+
+def _array(items, **kwargs):
+    return {"type": "array", "items": items, **kwargs}
+
+
+INTEGER = {"type": "integer"}
+STRING = {"type": "string"}
+ITEMS = _array(_object(id=INTEGER))
+METAS = _array(_object(meta={"type": "object"}, name=STRING))
+TAGS = _array(_object(tags=_array(_object(name=STRING)), id=INTEGER))
+DATA = [
+    {"id": 0, "name": "a", "meta": {"a": [1]}, "tags": [{"name": "x", "y": 1}]},
+    {"id": 1, "meta": {"b": None}, "tags": []},
+    {"id": 2, "name": None, "meta": None, "tags": None, "other": 1},
+]
+MAPPING = {"a": {"x": 1}, "b": {"y": [1]}}
+
+# Same definition names, but different definitions (as of pydantic models)
+REF_IDS = {
+    "type": "array",
+    "items": {"$ref": "#/$defs/Item"},
+    "$defs": {"Item": _object(id=INTEGER)},
+}
+REF_TAGS = {
+    "type": "array",
+    "items": {"$ref": "#/definitions/Item"},
+    "definitions": {
+        "Item": _object(tags={"type": "array", "items": {"$ref": "#/definitions/Tag"}}),
+        "Tag": _object(name=STRING),
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "schemas, data",
+    (
+        ({"ids": ITEMS, "metas": METAS, "tags": TAGS}, DATA),
+        ({"ids": REF_IDS, "tags": REF_TAGS, "metas": METAS}, DATA),
+        # Whole values along with selective ones
+        ({"all": {}, "ids": ITEMS}, DATA),
+        ({"all": _array({}), "tags": TAGS}, DATA),
+        ({"all": _array({"type": "object"}), "tags": REF_TAGS}, DATA),
+        ({"tags": _array(_object(tags={})), "names": TAGS}, DATA),
+        # Values of different types
+        ({"ids": ITEMS, "names": _array(_object(id=STRING))}, DATA),
+        ({"a": _object(a={}), "b": _object(a=_object(x=INTEGER))}, MAPPING),
+        # Mappings
+        (
+            {
+                "a": {"type": "object", "additionalProperties": _object(x=INTEGER)},
+                "b": {"type": "object", "additionalProperties": {}},
+                "c": _object(b=_object(y=_array(INTEGER))),
+            },
+            MAPPING,
+        ),
+        # Conflicting ones are loaded separately
+        ({"ids": ITEMS, "sliced": {**ITEMS, "x-simdjson-slice": [1, None]}}, DATA),
+        ({"ids": ITEMS, "raw": _array({"x-simdjson-raw": True})}, DATA),
+        ({"ids": ITEMS, "all": _array(_object(tags={"x-simdjson-raw": True}))}, DATA),
+        ({"ids": ITEMS, "scalar": INTEGER}, DATA),
+    ),
+)
+@pytest.mark.parametrize("rows", (None, "tuple", "slots"))
+def test_loads_multi(schemas, data, rows):
+    data = dumps(data)
+    expected = {
+        name: loads(data, schema=schema, rows=rows) for name, schema in schemas.items()
+    }
+    assert loads_multi(data, schemas=schemas, rows=rows) == expected
+
+
+def test_plan():
+    plan = _get_plan({"ids": ITEMS, "metas": METAS, "tags": TAGS})
+    assert plan.names == ["ids", "metas", "tags"]
+    assert plan.schema == _array(
+        _object(
+            id=INTEGER,
+            meta={"type": "object"},
+            name=STRING,
+            tags=_array(_object(name=STRING)),
+        )
+    )
+    assert _get_plan({"ids": ITEMS, "metas": METAS, "tags": TAGS}) is plan
+
+    plan = _get_plan({"all": {}, "ids": ITEMS, "names": _array(_object(id=STRING))})
+    assert plan.names == ["ids", "names"]
+    assert plan.schema == _array(_object(id={}))
+
+    other = _get_plan({"other": ITEMS, "metas": METAS, "tags": TAGS})
+    assert other is not _get_plan({"ids": ITEMS, "metas": METAS, "tags": TAGS})
+
+
+def test_plans_bounded():
+    for _ in range(_PLANS._maxsize + 10):
+        _get_plan({"ids": dict(ITEMS), "tags": TAGS})
+    assert len(_PLANS) == _PLANS._maxsize
+
+
+def test_recursive():
+    schema = {
+        "$ref": "#/$defs/Node",
+        "$defs": {
+            "Node": _object(
+                value=INTEGER,
+                children={"type": "array", "items": {"$ref": "#/$defs/Node"}},
+            ),
+        },
+    }
+    data = dumps({"value": 0, "children": [{"value": 1, "children": []}]})
+    assert _get_plan({"a": schema, "b": schema}).names == []
+    assert loads_multi(data, schemas={"a": schema, "b": schema}) == {
+        "a": loads(data, schema=schema),
+        "b": loads(data, schema=schema),
+    }
+
+
+def test_shared():
+    schema = _array(_object(meta={"type": "object"}))
+    res = loads_multi(dumps(DATA), schemas={"a": schema, "b": schema})
+    assert res["a"][0]["meta"] is res["b"][0]["meta"]
+    assert res["a"][0] is not res["b"][0]
+
+    # Shared between the separately loaded ones as well
+    res = loads_multi(dumps(DATA), schemas={"a": schema, "b": schema}, fail_fast=True)
+    assert res["a"][0]["meta"] is res["b"][0]["meta"]
+
+
+def test_errors():
+    schemas = {"ids": ITEMS, "metas": _array(_object(meta=_object(a={})))}
+    data = dumps([{"id": 0, "meta": [1]}])
+    with pytest.raises(ValueError, match="Supposed to be an object"):
+        loads_multi(data, schemas=schemas)
+
+    # The failed merged one falls back to loading the schemas one by one
+    loader = _MultiLoader(data, schemas=schemas)
+    assert loader.load("ids") == [{"id": 0}]
+    with pytest.raises(ValueError, match="Supposed to be an object"):
+        loader.load("metas")
+
+
+def test_options():
+    schema = {"type": "array", "items": INTEGER, "minItems": 3}
+    data = dumps([0, 1, 2])
+    slices = {"": [1, None]}
+    res = loads_multi(data, schemas={"a": schema, "b": {}}, slices=slices)
+    assert res == {"a": [1, 2], "b": [0, 1, 2]}
+    with pytest.raises(SchemaValidationError, match="at least 3 items"):
+        loads_multi(data, schemas={"a": schema}, fail_fast=True, slices=slices)
+    with pytest.raises(ValueError, match="Invalid rows mode"):
+        loads_multi(data, schemas={"a": schema}, rows="other")
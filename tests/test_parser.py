@@ -3,7 +3,8 @@ from json import dumps
 
 import pytest
 
-from simdjson_schemaful import loads
+from simdjson_schemaful import iter_loads, loads, loads_json
+from simdjson_schemaful.parser import SchemaValidationError, _get_plan
 
 
 def test_any_of_fail():
@@ -76,6 +77,31 @@ def test_nested_dict_value_additional_properties_ok():
     assert loaded == [{"key": {"value": 1}}]
 
 
+def test_additional_properties_any():
+    schema = {
+        "type": "array",
+        "items": {"type": "object", "additionalProperties": True},
+    }
+    data = dumps([{"a": 1, "b": [1]}])
+    assert loads(data, schema=schema) == [{"a": 1, "b": [1]}]
+    assert loads_json(data, schema=schema) == data.replace(" ", "").encode()
+
+
+def test_plan_reused():
+    schema = {
+        "type": "array",
+        "items": {"$ref": "#/definitions/Model"},
+        "definitions": {"Model": {"type": "object", "properties": {"a": {}}}},
+    }
+    plan = _get_plan(schema)
+    assert _get_plan(schema) is plan
+    node = plan.get(schema["items"])
+    assert node.schema is schema["definitions"]["Model"]
+    assert plan.get(schema["definitions"]["Model"]) is node
+    assert loads(dumps([{"a": 1, "b": 2}]), schema=schema) == [{"a": 1}]
+    assert _get_plan(schema) is plan
+
+
 @pytest.mark.parametrize(
     "keyword",
     ("definitions", "$defs"),
@@ -243,3 +269,436 @@ def test_complex(parser, data, expected):
     data = dumps(data)
     loaded = loads(data, schema=schema, parser=parser)
     assert loaded == expected
+    assert (
+        loads_json(data, schema=schema, parser=parser)
+        == dumps(
+            expected,
+            separators=(",", ":"),
+        ).encode()
+    )
+
+
+def test_iter_loads():
+    schema = {
+        "type": "array",
+        "items": {"$ref": "#/definitions/Model"},
+        "definitions": {
+            "Model": {
+                "type": "object",
+                "properties": {"value": {"type": "integer"}},
+            }
+        },
+    }
+    data = dumps([{"some": 0, "value": 1}, {"value": 2}, {}])
+    items = iter_loads(data, schema=schema)
+    assert next(items) == {"value": 1}
+    assert list(items) == [{"value": 2}, {}]
+
+
+@pytest.mark.parametrize(
+    "items,data",
+    [
+        ({}, [{"key": 0}, [1], "s", 1, None]),
+        ({"type": "integer"}, [0, 1]),
+        ({"type": "array", "items": {}}, [[0], [1, 2]]),
+    ],
+)
+def test_iter_loads_items(items, data):
+    schema = {"type": "array", "items": items}
+    assert list(iter_loads(dumps(data), schema=schema)) == data
+
+
+def test_iter_loads_not_an_array_schema():
+    schema = {"type": "object"}
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Invalid schema type object, expected array"),
+    ):
+        iter_loads(dumps([]), schema=schema)
+
+
+def test_iter_loads_not_an_array():
+    schema = {"type": "array", "items": {}}
+    data = dumps("abc")
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Supposed to be an array, but in reality is a <class 'str'>"),
+    ):
+        list(iter_loads(data, schema=schema))
+
+
+def test_ref_to_scalar():
+    schema = {
+        "type": "object",
+        "properties": {"color": {"$ref": "#/$defs/Color"}},
+        "$defs": {"Color": {"enum": ["red", "green"], "type": "string"}},
+    }
+    data = dumps({"color": "red", "other": 0})
+    assert loads(data, schema=schema) == {"color": "red"}
+
+
+FAIL_FAST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {"$ref": "#/definitions/Model"},
+            "minItems": 1,
+            "maxItems": 2,
+        },
+        "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+        "a/b": {"type": "number"},
+    },
+    "required": ["items"],
+    "definitions": {
+        "Model": {
+            "type": "object",
+            "properties": {
+                "i": {"type": "integer"},
+                "s": {"type": ["string", "null"]},
+                "kind": {"enum": ["a", "b"]},
+                "version": {"const": 1},
+            },
+            "required": ["i"],
+        }
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"items": [{"i": 1}]},
+        {"items": [{"i": 1.0, "s": None, "kind": "a", "version": 1}, {"i": 2}]},
+        {"items": [{"i": 1}], "tags": ["a", "b"], "a/b": 1},
+    ],
+)
+def test_fail_fast_ok(data):
+    assert loads(dumps(data), schema=FAIL_FAST_SCHEMA, fail_fast=True) == data
+
+
+@pytest.mark.parametrize(
+    "data,kind,loc,msg",
+    [
+        ({}, "missing", ("items",), "Field required at '/items'"),
+        ({"items": []}, "min_items", ("items",), "at least 1 items at '/items'"),
+        (
+            {"items": [{"i": 0}] * 3},
+            "max_items",
+            ("items",),
+            "at most 2 items at '/items'",
+        ),
+        ({"items": [{"i": 0}, {}]}, "missing", ("items", 1, "i"), "'/items/1/i'"),
+        (
+            {"items": [{"i": 0.5}]},
+            "type",
+            ("items", 0, "i"),
+            "Input should be of type integer at '/items/0/i'",
+        ),
+        (
+            {"items": [{"i": 0, "s": 1}]},
+            "type",
+            ("items", 0, "s"),
+            "Input should be of type string or null",
+        ),
+        (
+            {"items": [{"i": 0, "kind": "c"}]},
+            "enum",
+            ("items", 0, "kind"),
+            "Input should be one of 'a', 'b'",
+        ),
+        (
+            {"items": [{"i": 0, "version": 2}]},
+            "const",
+            ("items", 0, "version"),
+            "Input should be 1",
+        ),
+        (
+            {"items": [{"i": 0}], "tags": ["a", 1]},
+            "type",
+            ("tags", 1),
+            "Input should be of type string at '/tags/1'",
+        ),
+        (
+            {"items": [{"i": 0}], "a/b": "1"},
+            "type",
+            ("a/b",),
+            "at '/a~1b'",
+        ),
+    ],
+)
+def test_fail_fast_error(data, kind, loc, msg):
+    with pytest.raises(SchemaValidationError, match=re.escape(msg)) as e:
+        loads(dumps(data), schema=FAIL_FAST_SCHEMA, fail_fast=True)
+    assert e.value.kind == kind
+    assert e.value.loc == loc
+
+
+@pytest.mark.parametrize(
+    "data,input_",
+    [
+        ({"items": [{"i": 0.5}]}, 0.5),
+        ({"items": [{"i": 0, "kind": "c"}]}, "c"),
+        ({"items": [{"i": 0}, {}]}, {}),
+        ({"items": [{"i": 0}] * 3}, [{"i": 0}] * 3),
+        ({"items": [{"i": 0}], "tags": ["a", 1]}, 1),
+    ],
+)
+def test_fail_fast_input(data, input_):
+    with pytest.raises(SchemaValidationError) as e:
+        loads(dumps(data), schema=FAIL_FAST_SCHEMA, fail_fast=True)
+    assert e.value.input == input_
+
+
+def test_fail_fast_lax():
+    # Other types are left to the validation, which may coerce them
+    data = {"items": [{"i": "1", "s": 1}], "tags": [1]}
+    with pytest.raises(SchemaValidationError, match="Input should be of type"):
+        loads(dumps(data), schema=FAIL_FAST_SCHEMA, fail_fast=True)
+    res = loads(dumps(data), schema=FAIL_FAST_SCHEMA, fail_fast=True, strict=False)
+    assert res == data
+    # The values of the same types are still checked
+    data = {"items": [{"i": "1", "kind": "c"}]}
+    with pytest.raises(SchemaValidationError, match="one of 'a', 'b'"):
+        loads(dumps(data), schema=FAIL_FAST_SCHEMA, fail_fast=True, strict=False)
+
+
+def test_fail_fast_disabled():
+    data = {"items": [{"i": 0.5}, {}]}
+    assert loads(dumps(data), schema=FAIL_FAST_SCHEMA) == data
+
+
+def test_iter_loads_fail_fast():
+    schema = {"type": "array", "items": FAIL_FAST_SCHEMA["definitions"]["Model"]}
+    items = iter_loads(dumps([{"i": 0}, {}]), schema=schema, fail_fast=True)
+    assert next(items) == {"i": 0}
+    with pytest.raises(SchemaValidationError, match=re.escape("at '/1/i'")):
+        next(items)
+
+
+def test_keys_shared():
+    schema = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "value": {"type": "integer"},
+                "values": {
+                    "type": "object",
+                    "additionalProperties": {"type": "object"},
+                },
+            },
+        },
+    }
+    data = dumps([{"value": 0, "values": {"key": {}}}] * 2)
+    first, second = loads(data, schema=schema)
+    assert [*first] == [*second] == ["value", "values"]
+    assert all(a is b for a, b in zip(first, second))
+    assert [*first["values"]][0] is [*second["values"]][0]
+
+
+def test_untyped_values():
+    schema = {
+        "type": "object",
+        "properties": {"a": {}, "b": {}, "c": {}, "d": {}},
+    }
+    data = {"a": 1, "b": "b", "c": [1, {"x": 1}], "d": {"x": [1]}, "e": 1}
+    assert loads(dumps(data), schema=schema) == {
+        "a": 1,
+        "b": "b",
+        "c": [1, {"x": 1}],
+        "d": {"x": [1]},
+    }
+
+
+def test_nested_arrays_selective():
+    schema = {
+        "type": "object",
+        "properties": {
+            "rows": {
+                "type": "array",
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "integer"}},
+                    },
+                },
+            },
+        },
+    }
+    data = {"rows": [[{"id": 0, "x": 0}], [{"id": 1, "x": 1}]]}
+    assert loads(dumps(data), schema=schema) == {"rows": [[{"id": 0}], [{"id": 1}]]}
+
+
+def test_raw():
+    raw = {"x-simdjson-raw": True}
+    schema = {
+        "type": "object",
+        "properties": {
+            "doc": {"type": "object", "properties": {"a": {}}, **raw},
+            "docs": {"type": "array", "items": raw},
+            "map": {"type": "object", "additionalProperties": raw},
+            "s": {"type": "string", **raw},
+            "none": raw,
+        },
+    }
+    data = {
+        "doc": {"a": 1, "b": [1, 2]},
+        "docs": [{"a": None}, [], 1.5],
+        "map": {"x": "y"},
+        "s": 'a "b"',
+        "none": None,
+    }
+    expected = {
+        "doc": b'{"a":1,"b":[1,2]}',
+        "docs": [b'{"a":null}', b"[]", b"1.5"],
+        "map": {"x": b'"y"'},
+        "s": b'"a \\"b\\""',
+        "none": None,
+    }
+    res = loads(dumps(data), schema=schema)
+    assert res == expected
+    # Minified JSON bytes with any version of pysimdjson
+    raws = [res["doc"], *res["docs"], res["map"]["x"], res["s"]]
+    assert all(isinstance(value, bytes) for value in raws)
+
+    docs, doc = schema["properties"]["docs"], schema["properties"]["doc"]
+    items = list(iter_loads(dumps(data["docs"]), schema=docs))
+    assert items == expected["docs"]
+    assert all(isinstance(value, bytes) for value in items)
+    res = loads(dumps(data["doc"]), schema=doc)
+    assert res == expected["doc"]
+    assert isinstance(res, bytes)
+
+
+def test_dedupe():
+    author = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "tags": {"type": "array"}},
+    }
+    schema = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"id": {"type": "integer"}, "author": {"$ref": "#/$defs/A"}},
+        },
+        "$defs": {"A": author},
+    }
+    data = [{"id": i, "author": {"name": "x", "tags": ["a"]}} for i in range(3)]
+    data.append({"id": 3, "author": {"name": "y", "tags": ["a"]}})
+
+    res = loads(dumps(data), schema=schema, dedupe=True)
+    assert res == loads(dumps(data), schema=schema)
+    assert res[0]["author"] is res[2]["author"]
+    assert res[0]["author"] is not res[3]["author"]
+    assert res[0]["author"]["tags"] is res[3]["author"]["tags"]
+    # Within a single call only
+    assert res[0]["author"] is not loads(dumps(data), schema=schema, dedupe=True)[0]
+
+    res = loads(dumps(data), schema=schema, dedupe=["/*/author"], rows="tuple")
+    assert res[0][1] is res[1][1]
+    assert res[0][1][1] is not res[3][1][1]
+
+    # Subtrees selected differently are not shared
+    res = loads(
+        dumps(data),
+        schema=schema,
+        dedupe=["/*/author"],
+        slices={"/0/author/tags": [0, 0]},
+    )
+    assert res[0]["author"] == {"name": "x", "tags": []}
+    assert res[1]["author"] is res[2]["author"]
+
+    calls = []
+
+    def canonicalize(schema, value):
+        calls.append(schema)
+        return tuple(value.values())
+
+    items = iter_loads(
+        dumps(data),
+        schema=schema,
+        dedupe=["/*/author"],
+        canonicalize=canonicalize,
+    )
+    assert [item["author"] for item in items] == [("x", ["a"])] * 3 + [("y", ["a"])]
+    assert calls == [author, author]
+
+
+def test_dedupe_errors():
+    item = {"type": "object", "properties": {"a": {"type": "integer"}}}
+    schema = {"type": "array", "items": item}
+    data = [{"a": 1}, {"a": 1}, {"a": "1"}]
+    with pytest.raises(SchemaValidationError) as exc_info:
+        loads(dumps(data), schema=schema, dedupe=True, fail_fast=True)
+    assert exc_info.value.loc == (2, "a")
+    with pytest.raises(ValueError, match="expected a list of paths"):
+        loads("[]", schema=schema, dedupe="/*")
+    with pytest.raises(ValueError, match="canonicalize requires dedupe"):
+        loads("[]", schema=schema, canonicalize=lambda schema, value: value)
+
+
+def test_embedded():
+    inner = {
+        "type": "object",
+        "properties": {
+            "a": {"type": "integer"},
+            "items": {"type": "array", "items": {"$ref": "#/$defs/Item"}},
+        },
+    }
+    embedded = {"type": "string", "contentMediaType": "application/json"}
+    schema = {
+        "type": "object",
+        "properties": {
+            "doc": {**embedded, "contentSchema": {"$ref": "#/$defs/Inner"}},
+            "docs": {"type": "array", "items": {**embedded, "contentSchema": inner}},
+            "untyped": {**embedded, "contentSchema": {}},
+            "raw": {**embedded, "contentSchema": inner, "x-simdjson-raw": True},
+        },
+        "$defs": {
+            "Inner": inner,
+            "Item": {"type": "object", "properties": {"id": {"type": "integer"}}},
+        },
+    }
+    doc = dumps({"a": 1, "b": "x", "items": [{"id": 0, "x": 1}, {"id": 1}]})
+    data = {"doc": doc, "docs": [doc, "{invalid"], "untyped": doc, "raw": "{}"}
+    expected = {
+        "doc": '{"a":1,"items":[{"id":0},{"id":1}]}',
+        # Invalid documents are left as is
+        "docs": ['{"a":1,"items":[{"id":0},{"id":1}]}', "{invalid"],
+        "untyped": doc,
+        "raw": b'"{}"',
+    }
+    assert loads(dumps(data), schema=schema) == expected
+    json_expected = {**expected, "raw": '"{}"'}
+    assert (
+        loads_json(dumps(data), schema=schema)
+        == dumps(json_expected, separators=(",", ":")).encode()
+    )
+
+    # Locations continue into the documents
+    res = loads(dumps(data), schema=schema, slices={"/doc/items": [1, None]})
+    assert res["doc"] == '{"a":1,"items":[{"id":1}]}'
+    data["doc"] = dumps({"a": 1, "items": [{"id": "0"}]})
+    for load in (loads, loads_json):
+        with pytest.raises(SchemaValidationError) as exc_info:
+            load(dumps(data), schema=schema, fail_fast=True)
+        assert exc_info.value.loc == ("doc", "items", 0, "id")
+
+    # Embedded into the embedded ones
+    outer = {**embedded, "contentSchema": {"$ref": "#/$defs/Outer"}}
+    nested = {
+        "type": "array",
+        "items": outer,
+        "$defs": {
+            "Outer": {
+                "type": "object",
+                "properties": {"doc": schema["properties"]["doc"]},
+            },
+            **schema["$defs"],
+        },
+    }
+    data = dumps([dumps({"doc": doc, "other": 1})])
+    expected = [dumps({"doc": expected["doc"]}, separators=(",", ":"))]
+    assert list(iter_loads(data, schema=nested)) == expected
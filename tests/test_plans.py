@@ -0,0 +1,74 @@
+import os
+
+from simdjson_schemaful import PlanCache, PlanCacheInfo
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"value": {"type": "integer"}},
+}
+
+
+def _create(calls):
+    def create():
+        calls.append(1)
+        return SCHEMA
+
+    return create
+
+
+def test_hit(tmp_path):
+    calls = []
+    cache = PlanCache(tmp_path / "plans")
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.get_or_create("b", _create(calls)) == SCHEMA
+    assert len(calls) == 2
+    assert cache.cache_info() == PlanCacheInfo(hits=1, misses=2, errors=0)
+
+    # Shared between the instances (i.e., processes)
+    other = PlanCache(cache.path)
+    assert other.get_or_create("a", _create(calls)) == SCHEMA
+    assert len(calls) == 2
+
+
+def test_invalid(tmp_path):
+    calls = []
+    cache = PlanCache(tmp_path)
+    cache.get_or_create("a", _create(calls))
+    (file,) = tmp_path.iterdir()
+
+    file.write_text("{")
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.cache_info() == PlanCacheInfo(hits=0, misses=2, errors=1)
+
+    # Entries of other keys (e.g., on collisions) are never reused
+    file.write_text('{"key": "other", "schema": {}}')
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.cache_info() == PlanCacheInfo(hits=1, misses=3, errors=1)
+
+
+def test_unwritable(tmp_path):
+    calls = []
+    path = tmp_path / "file"
+    path.write_text("")
+    cache = PlanCache(path)
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.get_or_create("a", _create(calls)) == SCHEMA
+    assert cache.cache_info() == PlanCacheInfo(hits=0, misses=2, errors=4)
+
+    cache = PlanCache(tmp_path)
+    assert cache.get_or_create("a", lambda: {"default": object()}) is not None
+    assert cache.cache_info().errors == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["file"]
+
+
+def test_clear(tmp_path):
+    cache = PlanCache(tmp_path)
+    cache.get_or_create("a", lambda: SCHEMA)
+    cache.get_or_create("a", lambda: SCHEMA)
+    (tmp_path / "other.json").write_text("")
+    cache.cache_clear()
+    assert cache.cache_info() == PlanCacheInfo(hits=0, misses=0, errors=0)
+    assert os.listdir(tmp_path) == ["other.json"]
+    PlanCache(tmp_path / "missing").cache_clear()
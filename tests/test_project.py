@@ -0,0 +1,125 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import project
+
+DATA = {
+    "data": {
+        "items": [
+            {"id": 0, "price": 1.5, "tags": ["a"], "other": {"x": 1}},
+            {"id": 1, "price": None, "meta": {"a.b": 2}},
+            {"id": 2},
+        ],
+        "users": {
+            "u1": {"name": "a", "age": 1},
+            "u2": {"name": "b", "age": 2},
+        },
+        "total": 3,
+    },
+    "other": [1, 2, 3],
+}
+
+
+@pytest.mark.parametrize(
+    "paths, expected",
+    [
+        (
+            ["data.items[*].id", "data.items[*].price"],
+            {
+                "data": {
+                    "items": [
+                        {"id": 0, "price": 1.5},
+                        {"id": 1, "price": None},
+                        {"id": 2},
+                    ]
+                }
+            },
+        ),
+        (
+            ["$.data.total", "data.users.*.name"],
+            {"data": {"total": 3, "users": {"u1": {"name": "a"}, "u2": {"name": "b"}}}},
+        ),
+        (
+            ["data.items[-1].id", "data.items[-1]"],
+            {"data": {"items": [{"id": 2}]}},
+        ),
+        (
+            ["data.items[0].tags", "data.items[0].other.x"],
+            {"data": {"items": [{"tags": ["a"], "other": {"x": 1}}]}},
+        ),
+        (
+            ['data.items[*].meta["a.b"]'],
+            {"data": {"items": [{}, {"meta": {"a.b": 2}}, {}]}},
+        ),
+        (["other"], {"other": [1, 2, 3]}),
+        (["other[1]"], {"other": [2]}),
+        ([""], DATA),
+    ],
+)
+def test_project(paths, expected):
+    assert project(dumps(DATA), paths=paths) == expected
+
+
+def test_project_array():
+    data = [{"id": 0, "other": 0}, {"id": 1, "other": 1}]
+    assert project(dumps(data), paths=["[*].id"]) == [{"id": 0}, {"id": 1}]
+
+
+@pytest.mark.parametrize(
+    "paths, expected",
+    [
+        (
+            ["data.items[*].id", "data.items[*].price", "data.items[*].meta.x"],
+            [(0, 1.5, None), (1, None, None), (2, None, None)],
+        ),
+        (["data.users.*.name", "data.users.*.age"], [("a", 1), ("b", 2)]),
+        (["data.total", "data.items[0].id"], [(3, 0)]),
+    ],
+)
+def test_project_flat(paths, expected):
+    assert project(dumps(DATA), paths=paths, flat=True) == expected
+
+
+def test_project_nested_arrays():
+    data = {"rows": [[{"id": 0, "x": 0}], [{"id": 1, "x": 1}, {"id": 2}]]}
+    assert project(dumps(data), paths=["rows[*][*].id"]) == {
+        "rows": [[{"id": 0}], [{"id": 1}, {"id": 2}]]
+    }
+    assert project(dumps(data), paths=["rows[*][*].id"], flat=True) == [
+        (0,),
+        (1,),
+        (2,),
+    ]
+
+
+@pytest.mark.parametrize(
+    "paths, match",
+    [
+        ([], "At least one selector"),
+        (["a..b"], "Invalid selector"),
+        (["a[*]b"], "Invalid selector"),
+        (["a[x]"], "Invalid selector"),
+        (["a.*.b", "a.c"], "conflicts"),
+        (["a[*].b", "a[0].c"], "conflicts"),
+        (["a[0].b", "a[1].c"], "conflicts"),
+        (["a[0].id", "a[1].id"], "only one index of an array"),
+        (["items[*].id", "items[-1].name"], "only one index of an array"),
+        (["a.b", "a[0]"], "conflicts"),
+    ],
+)
+def test_invalid_selectors(paths, match):
+    with pytest.raises(ValueError, match=match):
+        project(dumps(DATA), paths=paths)
+
+
+@pytest.mark.parametrize(
+    "paths",
+    [
+        ["data.items[*].id", "data.total"],
+        ["data.items[*].id", "data.users.*.name"],
+    ],
+)
+def test_invalid_flat(paths):
+    with pytest.raises(ValueError, match="share the wildcards"):
+        project(dumps(DATA), paths=paths, flat=True)
@@ -0,0 +1,97 @@
+import pickle
+from copy import deepcopy
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import MISSING, Record, iter_loads, loads
+from simdjson_schemaful.rows import _LAYOUTS
+
+SCHEMA = {
+    "type": "array",
+    "items": {"$ref": "#/definitions/Model"},
+    "definitions": {
+        "Model": {
+            "title": "Model",
+            "type": "object",
+            "properties": {
+                "i": {"type": "integer"},
+                "nested": {"$ref": "#/definitions/Nested"},
+                "values": {"type": "object", "additionalProperties": {}},
+                "not-an-identifier": {"type": "string"},
+            },
+        },
+        "Nested": {
+            "title": "Nested",
+            "type": "object",
+            "properties": {"s": {"type": "string"}},
+        },
+    },
+}
+
+DATA = [
+    {"i": 0, "nested": {"s": "0", "other": 0}, "values": {"a": 1}, "other": 0},
+    {"not-an-identifier": "1", "nested": None},
+]
+
+
+def test_tuple():
+    assert loads(dumps(DATA), schema=SCHEMA, rows="tuple") == [
+        (0, ("0",), {"a": 1}, MISSING),
+        (MISSING, None, MISSING, "1"),
+    ]
+
+
+def test_namedtuple():
+    first, second = loads(dumps(DATA), schema=SCHEMA, rows="namedtuple")
+    assert first._fields == ("i", "nested", "values", "_3")
+    assert first.nested.s == "0"
+    assert type(first).__name__ == "Model"
+    assert type(first.nested).__name__ == "Nested"
+    assert tuple(second) == (MISSING, None, MISSING, "1")
+
+
+def test_slots():
+    first, second = loads(dumps(DATA), schema=SCHEMA, rows="slots")
+    assert isinstance(first, Record)
+    assert not hasattr(first, "__dict__")
+    assert first._fields == ("i", "nested", "values", "_3")
+    assert first.i == 0
+    assert first.nested.s == "0"
+    assert tuple(second) == (MISSING, None, MISSING, "1")
+    assert repr(second) == "Model(i=MISSING, nested=None, values=MISSING, _3='1')"
+
+
+@pytest.mark.parametrize("rows", ("tuple", "namedtuple", "slots"))
+def test_types_reused(rows):
+    first = loads(dumps(DATA), schema=SCHEMA, rows=rows)
+    second = loads(dumps(DATA), schema=SCHEMA, rows=rows)
+    assert first == second
+    assert first[0].__class__ is second[0].__class__
+
+
+def test_root():
+    schema = SCHEMA["definitions"]["Nested"]
+    assert loads(dumps({"s": "0"}), schema=schema, rows="tuple") == ("0",)
+
+
+def test_iter_loads():
+    items = iter_loads(dumps(DATA), schema=SCHEMA, rows="tuple")
+    assert next(items) == (0, ("0",), {"a": 1}, MISSING)
+
+
+def test_missing():
+    assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+    assert repr(MISSING) == "MISSING"
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match="Invalid rows mode dict"):
+        loads(dumps(DATA), schema=SCHEMA, rows="dict")
+
+
+def test_layouts_bounded():
+    for _ in range(_LAYOUTS._maxsize + 10):
+        schema = deepcopy(SCHEMA["definitions"]["Nested"])
+        assert loads(dumps({"s": "0"}), schema=schema, rows="tuple") == ("0",)
+    assert len(_LAYOUTS) == _LAYOUTS._maxsize
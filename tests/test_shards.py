@@ -0,0 +1,151 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import SchemaValidationError, loads, loads_sharded, shards
+from simdjson_schemaful.shards import _find_end, _get_targets, _Shards, _split
+
+ITEM = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "nested": {
+            "type": "array",
+            "items": {"type": "object", "properties": {"id": {"type": "integer"}}},
+        },
+    },
+}
+SCHEMA = {"type": "array", "items": ITEM}
+REF_SCHEMA = {"$ref": "#/$defs/Items", "$defs": {"Items": SCHEMA}}
+DATA = [
+    {
+        "id": i,
+        # Separators within the strings and the nested arrays
+        "text": '[{"id": 1}, {"id": 2}]' * (i % 3),
+        "nested": [{"id": i}, {"id": -i}],
+    }
+    for i in range(300)
+]
+# Unbalanced brackets and escaped quotes within the strings
+INVALID_BOUNDS = [{"id": i, "text": ']}, {"id": [\\"' * (i % 2)} for i in range(300)]
+UNBALANCED = [
+    {"id": i, "text": ("oops [", "oops ]", "{[", "}")[i % 4]} for i in range(300)
+]
+# Escaped backslashes and quotes at the targets
+ESCAPES = [{"id": i, "text": "\\" * (i % 7) + '"' * (i % 2)} for i in range(300)]
+
+
+def _bounds(data, count):
+    shards = _Shards(data, {}, {})
+    start = data.index(b"[") + 1
+    targets = _get_targets(data, start, _find_end(data, start), count)
+    return _split(data, targets, map(shards.scan, zip(targets[:-2], targets[1:-1])))
+
+
+@pytest.mark.parametrize("items", (DATA, INVALID_BOUNDS, UNBALANCED, ESCAPES))
+@pytest.mark.parametrize("indent", (None, 2))
+@pytest.mark.parametrize("count", (8, 61))
+def test_split(items, indent, count):
+    data = dumps(items, indent=indent).encode()
+    bounds = _bounds(data, count)
+    assert len(bounds) == count
+    shards = _Shards(data, SCHEMA, {})
+    assert sum((shards.load(b) for b in bounds), []) == loads(data, schema=SCHEMA)
+    assert sum(map(shards.count, bounds)) == len(items)
+
+
+def test_shards_used(monkeypatch):
+    sizes = []
+    _loads = shards._loads
+
+    def spy(data, *args):
+        sizes.append(len(data))
+        return _loads(data, *args)
+
+    monkeypatch.setattr(shards, "_loads", spy)
+    data = dumps(UNBALANCED)
+    res = loads_sharded(
+        data, schema=SCHEMA, workers=1, min_shard_size=256, max_shard_size=1024
+    )
+    assert res == loads(data, schema=SCHEMA)
+    assert len(sizes) == -(-len(data) // 1024)
+    assert max(sizes) < 1100
+
+
+@pytest.mark.parametrize(
+    "schema, data",
+    (
+        (SCHEMA, DATA),
+        (REF_SCHEMA, DATA),
+        (SCHEMA, INVALID_BOUNDS),
+        (SCHEMA, UNBALANCED),
+        (SCHEMA, ESCAPES),
+        ({"type": "array", "items": {}}, list(range(1000))),
+        ({"type": "array", "items": {"type": "string"}}, ['a,"]'] * 1000),
+        ({"type": "array", "items": {}}, [[i, [i]] for i in range(1000)]),
+        (SCHEMA, []),
+    ),
+)
+@pytest.mark.parametrize("workers", (1, 3))
+def test_loads_sharded(schema, data, workers):
+    data = dumps(data)
+    res = loads_sharded(data, schema=schema, workers=workers, min_shard_size=256)
+    assert res == loads(data, schema=schema)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    (
+        {"filters": {"/*/nested": {"id": {"gt": 0}}}},
+        {"filters": {"": {"id": {"lt": 10}}}},
+        # Selections of the top-level array and specific items are loaded as a
+        # whole
+        {"slices": {"": [5, 10]}},
+        {"slices": {"/3/nested": [1, None]}},
+    ),
+)
+def test_selections(kwargs):
+    data = dumps(DATA)
+    res = loads_sharded(data, schema=SCHEMA, workers=2, min_shard_size=256, **kwargs)
+    assert res == loads(data, schema=SCHEMA, **kwargs)
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_errors(workers):
+    data = dumps([*DATA, {"id": "a"}, *DATA])
+    with pytest.raises(SchemaValidationError) as exc_info:
+        loads_sharded(
+            data,
+            schema=SCHEMA,
+            workers=workers,
+            min_shard_size=256,
+            max_shard_size=4096,
+            fail_fast=True,
+        )
+    assert exc_info.value.loc == (300, "id")
+
+    # Locations in the input, including the items filtered out
+    skipped = [{"id": -1, "text": "oops ["}] * 50
+    data = dumps([*skipped, *DATA, {"id": 1, "nested": [{"id": "a"}]}])
+    with pytest.raises(SchemaValidationError) as exc_info:
+        loads_sharded(
+            data,
+            schema=SCHEMA,
+            workers=workers,
+            min_shard_size=256,
+            max_shard_size=4096,
+            fail_fast=True,
+            filters={"": {"id": {"gte": 0}}},
+        )
+    assert exc_info.value.loc == (350, "nested", 0, "id")
+    assert exc_info.value.input == "a"
+
+    # Messages of the parse errors differ between the versions of pysimdjson
+    with pytest.raises(ValueError):
+        loads_sharded(
+            dumps(DATA)[:-1], schema=SCHEMA, workers=workers, min_shard_size=256
+        )
+    with pytest.raises(ValueError, match="expected array"):
+        loads_sharded("{}", schema=ITEM)
+    with pytest.raises(ValueError, match="workers must be positive"):
+        loads_sharded("[]", schema=SCHEMA, workers=0)
@@ -0,0 +1,143 @@
+from json import dumps
+
+import pytest
+
+from simdjson_schemaful import ResultCache, SchemaValidationError, iter_loads, loads
+
+ITEM = {
+    "type": "object",
+    "properties": {"i": {"type": "integer"}},
+    "required": ["i"],
+}
+DATA = [{"i": i, "other": i} for i in range(100)]
+
+
+@pytest.mark.parametrize(
+    "slc",
+    [
+        [None, 3],
+        [-3, None],
+        [10, 20, 3],
+        [90, 10, -7],
+        [None, None, -1],
+        [-2, None, -1],
+        [5, 50],
+        [200, None],
+        [0, 0],
+    ],
+)
+def test_schema_slice(slc):
+    schema = {"type": "array", "items": ITEM, "x-simdjson-slice": slc}
+    expected = [{"i": item["i"]} for item in DATA[slice(*slc)]]
+    assert loads(dumps(DATA), schema=schema) == expected
+    assert list(iter_loads(dumps(DATA), schema=schema)) == expected
+
+
+def test_schema_slice_nested():
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {"type": "array", "items": ITEM, "x-simdjson-slice": [-2, None]},
+            "tags": {
+                "type": "array",
+                "items": {"type": "string"},
+                "x-simdjson-slice": [None, 1],
+            },
+            "values": {
+                "type": "array",
+                "items": {},
+                "x-simdjson-slice": [1, None],
+            },
+        },
+    }
+    data = {"items": DATA, "tags": ["a", "b"], "values": [[0], {"a": 1}]}
+    assert loads(dumps(data), schema=schema) == {
+        "items": [{"i": 98}, {"i": 99}],
+        "tags": ["a"],
+        "values": [{"a": 1}],
+    }
+
+
+def test_call_slices():
+    schema = {
+        "type": "object",
+        "properties": {
+            "pages": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "items": {
+                            "type": "array",
+                            "items": ITEM,
+                            "x-simdjson-slice": [None, 1],
+                        },
+                    },
+                },
+            },
+        },
+    }
+    data = dumps({"pages": [{"items": DATA}] * 3})
+    loaded = loads(data, schema=schema, slices={"/pages": slice(1, None)})
+    assert loaded == {"pages": [{"items": [{"i": 0}]}] * 2}
+
+    # Call-time slices take precedence over the schema ones
+    loaded = loads(data, schema=schema, slices={"/pages/*/items": [-1, None]})
+    assert loaded == {"pages": [{"items": [{"i": 99}]}] * 3}
+
+    loaded = loads(data, schema=schema, slices={"/pages/1/items": [-1, None]})
+    assert [page["items"] for page in loaded["pages"]] == [
+        [{"i": 0}],
+        [{"i": 99}],
+        [{"i": 0}],
+    ]
+
+
+def test_call_slices_root():
+    schema = {"type": "array", "items": ITEM}
+    expected = [{"i": 1}, {"i": 2}]
+    assert loads(dumps(DATA), schema=schema, slices={"": [1, 3]}) == expected
+    items = iter_loads(dumps(DATA), schema=schema, slices={"": [1, 3]})
+    assert list(items) == expected
+
+
+def test_fail_fast_loc():
+    schema = {"type": "array", "items": ITEM, "x-simdjson-slice": [-2, None]}
+    data = [{"i": 0}, {}, {"i": 2}, {"i": "3"}]
+    with pytest.raises(SchemaValidationError) as e:
+        loads(dumps(data), schema=schema, fail_fast=True)
+    assert e.value.loc == (3, "i")
+
+    # Bounds are checked against the selected items
+    schema = {**schema, "minItems": 3}
+    with pytest.raises(SchemaValidationError) as e:
+        loads(dumps(data), schema=schema, fail_fast=True)
+    assert e.value.kind == "min_items"
+
+
+def test_cache_key():
+    cache = ResultCache()
+    schema = {"type": "array", "items": ITEM}
+    data = dumps(DATA)
+    assert len(loads(data, schema=schema, cache=cache, slices={"": [1, 3]})) == 2
+    assert len(loads(data, schema=schema, cache=cache, slices={"": [1, 4]})) == 3
+    assert len(loads(data, schema=schema, cache=cache, slices={"": [1, 4]})) == 3
+    assert cache.cache_info().hits == 1
+
+
+@pytest.mark.parametrize(
+    "slc",
+    [[1], [1, 2, 3, 4], ["1", None], [True, None], [None, None, 0], slice(0, 1, 0)],
+)
+def test_invalid_slice(slc):
+    schema = {"type": "array", "items": ITEM}
+    with pytest.raises(ValueError):
+        loads(dumps(DATA), schema=schema, slices={"": slc})
+    with pytest.raises(ValueError):
+        loads(dumps(DATA), schema={**schema, "x-simdjson-slice": slc})
+
+
+def test_invalid_path():
+    schema = {"type": "array", "items": ITEM}
+    with pytest.raises(ValueError, match="expected a JSON pointer"):
+        loads(dumps(DATA), schema=schema, slices={"items": [1, 2]})
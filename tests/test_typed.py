@@ -0,0 +1,205 @@
+import dataclasses
+import enum
+from json import dumps
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    Union,
+)
+
+import attr
+import pytest
+
+from simdjson_schemaful import SchemaValidationError, loads_as, typed
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: float = 0.0
+
+
+@dataclasses.dataclass
+class Shape:
+    name: str
+    color: Color
+    points: List[Point]
+    tags: FrozenSet[str] = frozenset()
+    meta: Optional[Dict[str, Any]] = None
+
+
+@dataclasses.dataclass
+class Tree:
+    value: int
+    children: List["Tree"] = dataclasses.field(default_factory=list)
+
+
+class Movie(TypedDict):
+    title: str
+    year: int
+
+
+class PartialMovie(TypedDict, total=False):
+    title: str
+    year: int
+
+
+class Pair(NamedTuple):
+    key: str
+    value: Union[int, str] = 0
+
+
+@attr.define
+class User:
+    id: int
+    _secret: str = attr.field(default="")
+    kind: Literal["admin", "user"] = "user"
+
+
+def test_dataclass():
+    data = {
+        "name": "triangle",
+        "color": "red",
+        "points": [{"x": 0}, {"x": 1, "y": 1.5}, {"x": 2.0, "y": 0, "z": 9}],
+        "tags": ["a", "b", "a"],
+        "meta": {"a": [1, {"b": None}]},
+        "skipped": {"x": [1, 2, 3]},
+    }
+    assert loads_as(Shape, dumps(data)) == Shape(
+        name="triangle",
+        color=Color.RED,
+        points=[Point(x=0), Point(x=1, y=1.5), Point(x=2, y=0.0)],
+        tags=frozenset(["a", "b"]),
+        meta={"a": [1, {"b": None}]},
+    )
+
+
+def test_recursive():
+    data = {"value": 1, "children": [{"value": 2, "children": [{"value": 3}]}]}
+    assert loads_as(Tree, dumps(data)) == Tree(1, [Tree(2, [Tree(3)])])
+
+
+def test_typeddict():
+    data = [{"title": "a", "year": 1999, "extra": 1}]
+    assert loads_as(List[Movie], dumps(data)) == [{"title": "a", "year": 1999}]
+    assert loads_as(PartialMovie, dumps({"year": 1})) == {"year": 1}
+    with pytest.raises(SchemaValidationError, match="Field required"):
+        loads_as(Movie, dumps({"year": 1}))
+
+
+def test_namedtuple():
+    data = [{"key": "a", "value": "b"}, {"key": "c"}]
+    assert loads_as(Tuple[Pair, ...], dumps(data)) == (Pair("a", "b"), Pair("c"))
+
+
+def test_attrs():
+    data = {"id": 1, "_secret": "s", "kind": "admin"}
+    assert loads_as(User, dumps(data)) == User(id=1, secret="s", kind="admin")
+    assert loads_as(User, dumps({"id": 2})) == User(id=2)
+
+
+@pytest.mark.parametrize(
+    "type_, value, expected",
+    (
+        (int, 1, 1),
+        (int, 1.0, 1),
+        (float, 1, 1.0),
+        (bool, True, True),
+        (None, None, None),
+        (Any, [1, {"a": 2}], [1, {"a": 2}]),
+        (Optional[int], None, None),
+        (Union[int, str], "a", "a"),
+        (Literal[1, True], True, True),
+        (Tuple[int, str], [1, "a"], (1, "a")),
+        (Sequence[int], [1, 2], [1, 2]),
+        (Dict[str, Point], {"a": {"x": 1}}, {"a": Point(1)}),
+        (Dict[str, Any], {"a": {"x": 1}}, {"a": {"x": 1}}),
+        (list, [1, [2]], [1, [2]]),
+    ),
+)
+def test_types(type_, value, expected):
+    res = loads_as(type_, dumps(value))
+    assert res == expected
+    assert res.__class__ is expected.__class__
+
+
+@pytest.mark.parametrize(
+    "type_, value, kind, loc",
+    (
+        (int, 1.5, "type", ()),
+        (int, True, "type", ()),
+        (float, "1", "type", ()),
+        (str, None, "type", ()),
+        (bool, 1, "type", ()),
+        (None, 0, "type", ()),
+        (Literal[1], True, "enum", ()),
+        (Color, "blue", "enum", ()),
+        (Union[int, str], None, "union", ()),
+        (Tuple[int, str], [1], "length", ()),
+        (List[int], {"a": 1}, "type", ()),
+        (Dict[str, int], [1], "type", ()),
+        (Point, [], "type", ()),
+        (Point, {"y": 1}, "missing", ("x",)),
+        (List[Point], [{"x": 1}, {"x": "a"}], "type", (1, "x")),
+        (
+            Tree,
+            {"value": 1, "children": [{"value": None}]},
+            "type",
+            ("children", 0, "value"),
+        ),
+    ),
+)
+def test_errors(type_, value, kind, loc):
+    with pytest.raises(SchemaValidationError) as exc_info:
+        loads_as(type_, dumps(value))
+    assert exc_info.value.kind == kind
+    assert exc_info.value.loc == loc
+
+
+@pytest.mark.parametrize(
+    "type_",
+    (complex, Dict[int, int], List[complex]),
+)
+def test_unsupported(type_):
+    with pytest.raises(TypeError, match="Unsupported"):
+        loads_as(type_, "[]")
+
+
+def test_decoders_published_complete(monkeypatch):
+    @dataclasses.dataclass
+    class Broken:
+        tree: Tree
+        value: complex
+
+    monkeypatch.setattr(typed, "_DECODERS", {})
+    with pytest.raises(TypeError, match="Unsupported"):
+        loads_as(Broken, "{}")
+    assert typed._DECODERS == {}
+
+    # Class decoders are made before their fields are built, when nothing of
+    # the build may be published yet
+    published = []
+    make_class = typed._make_class
+
+    def spy(factory, fields):
+        published.append(set(typed._DECODERS))
+        return make_class(factory, fields)
+
+    monkeypatch.setattr(typed, "_make_class", spy)
+    data = {"value": 1, "children": [{"value": 2}]}
+    assert loads_as(Tree, dumps(data)) == Tree(1, [Tree(2)])
+    assert published == [set()]
+    assert set(typed._DECODERS) == {Tree, List[Tree], int}